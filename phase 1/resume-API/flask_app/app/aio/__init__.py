@@ -0,0 +1,5 @@
+"""Async (ASGI) serving path for the LLM-bound endpoints.
+
+Kept free of imports so synchronous code can use the async OpenAI client
+without loading the ASGI stack; see asgi.py for the server entry point.
+"""
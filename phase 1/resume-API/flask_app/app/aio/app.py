@@ -0,0 +1,60 @@
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Match
+from app.aio.database import init_engine, dispose_engine
+from app.aio.openai_service import close_async_openai_service
+from app.aio.routes import routes
+
+class PathDispatcher:
+    """Sends requests for the async routes to Starlette and everything else to Flask"""
+
+    def __init__(self, async_app: Starlette, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = wsgi_app
+
+    def _is_async(self, scope) -> bool:
+        # PARTIAL (method mismatch) still goes async so CORS preflights are answered there
+        return any(route.matches(scope)[0] != Match.NONE for route in self.async_app.routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or self._is_async(scope):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+
+def create_asgi_app(flask_app):
+    """Wrap the Flask app so LLM-bound endpoints are served natively async"""
+    config = flask_app.config
+
+    @asynccontextmanager
+    async def lifespan(app):
+        init_engine(
+            config['SQLALCHEMY_DATABASE_URI'],
+            pool_size=config['ASYNC_DB_POOL_SIZE'],
+            max_overflow=config['ASYNC_DB_MAX_OVERFLOW']
+        )
+        app.state.analysis_timeout = config.get('ANALYSIS_GENERATION_TIMEOUT', 180)
+        yield
+        await close_async_openai_service()
+        await dispose_engine()
+
+    async_app = Starlette(
+        routes=routes,
+        lifespan=lifespan,
+        middleware=[
+            # Same policy as the Flask-CORS setup in create_app
+            Middleware(
+                CORSMiddleware,
+                allow_origins=["http://localhost:3000"],
+                allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                allow_headers=["Content-Type", "Authorization"],
+                allow_credentials=True,
+                expose_headers=["Content-Type", "Authorization"],
+                max_age=3600
+            )
+        ]
+    )
+    return PathDispatcher(async_app, WSGIMiddleware(flask_app, workers=config['ASGI_WSGI_THREADS']))
@@ -0,0 +1,42 @@
+import asyncio
+from functools import wraps
+from firebase_admin import auth
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.services.llm_governor import llm_user
+
+def require_firebase_user(endpoint):
+    """Async counterpart of verify_firebase_token; sets request.state.user and user_id"""
+    @wraps(endpoint)
+    async def decorated_endpoint(request: Request):
+        auth_header = request.headers.get('Authorization')
+        
+        if not auth_header:
+            return JSONResponse({'error': 'No token provided'}, status_code=401)
+            
+        try:
+            # Remove 'Bearer ' prefix if present
+            token = auth_header[7:] if auth_header.startswith('Bearer ') else auth_header
+            
+            # Verification may fetch Google's signing keys, so keep it off the event loop
+            decoded_token = await asyncio.to_thread(auth.verify_id_token, token)
+            
+        except auth.ExpiredIdTokenError:
+            return JSONResponse({'error': 'Token has expired'}, status_code=401)
+        except auth.RevokedIdTokenError:
+            return JSONResponse({'error': 'Token has been revoked'}, status_code=401)
+        except auth.InvalidIdTokenError:
+            return JSONResponse({'error': 'Invalid token'}, status_code=401)
+        except Exception as e:
+            return JSONResponse({'error': str(e)}, status_code=401)
+            
+        request.state.user = {
+            'uid': decoded_token['uid'],
+            'email': decoded_token.get('email'),
+        }
+        request.state.user_id = decoded_token['uid']
+        # There is no flask.g here; the LLM governor queues this request's calls under this user
+        llm_user.set(decoded_token['uid'])
+        return await endpoint(request)
+        
+    return decorated_endpoint
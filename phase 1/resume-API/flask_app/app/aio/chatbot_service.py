@@ -0,0 +1,181 @@
+import asyncio
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.aio.openai_service import get_async_openai_service
+from app.models.resume import Resume, ChatHistory, ChatMemory, ResumeChunk, ResumeAnalysisResult
+from app.services.analysis_service import AnalysisService
+from app.services.answer_cache import answer_cache
+from app.services.chatbot_service import (
+    build_question_messages, build_analysis_messages, clean_answer, question_cache_key
+)
+from app.services.memory_service import MemoryService
+from app.services.retrieval_service import RetrievalService
+from app.utils.errors import APIError
+from app.utils.logger import resume_logger
+
+class AsyncChatbotService:
+    """Chat and analysis for the ASGI path.
+
+    Runs the same flows as ChatbotService and AnalysisService, using their
+    queries, prompts and state changes, but awaits the database and OpenAI
+    instead of blocking a worker thread.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.openai_service = get_async_openai_service()
+        self.retrieval_service = RetrievalService()
+        self.memory_service = MemoryService()
+        self.analysis_service = AnalysisService()
+
+    async def get_resume(self, resume_id: int, user_id: str) -> Optional[Resume]:
+        result = await self.session.execute(
+            select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _get_window(self, resume_id: int) -> List[ChatHistory]:
+        result = await self.session.execute(self.memory_service.window_query(resume_id))
+        return list(result.scalars())
+
+    async def get_memory_messages(self, resume) -> List[dict]:
+        window = await self._get_window(resume.id)
+        memory = await self.session.get(ChatMemory, resume.id)
+        return self.memory_service.format_messages(memory.summary if memory else None, window)
+
+    async def update_memory(self, resume):
+        """Fold turns that left the memory window into the summary; failures only delay it"""
+        try:
+            window = await self._get_window(resume.id)
+            memory = await self.session.get(ChatMemory, resume.id)
+            query = self.memory_service.overflow_query(resume.id, memory, window)
+            overflow = list((await self.session.execute(query)).scalars()) if query is not None else []
+            if not overflow:
+                return
+
+            summary = await self.openai_service.create_chat_completion(
+                self.memory_service.summary_messages(memory.summary if memory else None, overflow),
+                max_tokens=self.memory_service.summary_tokens, temperature=0.2
+            )
+            self.session.add(self.memory_service.fold(resume.id, memory, summary, overflow))
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            resume_logger.warning(f'Could not update chat memory for resume {resume.id}: {str(e)}')
+
+    async def _get_chunks(self, resume) -> List[ResumeChunk]:
+        query = self.retrieval_service.chunks_query(resume.id)
+        chunks = list((await self.session.execute(query)).scalars())
+        if chunks or not resume.extracted_text:
+            return chunks
+        # Resumes uploaded before chunking existed are chunked on their first question
+        chunks = self.retrieval_service.make_chunks(resume.extracted_text, resume.id)
+        self.session.add_all(chunks)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            # A concurrent question stored them first
+            await self.session.rollback()
+            await self.session.refresh(resume)
+            chunks = list((await self.session.execute(query)).scalars())
+        return chunks
+
+    async def _get_context(self, resume, question: str) -> Tuple[str, bool]:
+        text = resume.extracted_text or ''
+        if not self.retrieval_service.needs_excerpt(text):
+            return text, False
+        return self.retrieval_service.context_from_chunks(resume.id, text, await self._get_chunks(resume), question)
+
+    async def save_chat_history(self, resume_id: int, question: str, answer: str):
+        try:
+            self.session.add(ChatHistory(resume_id=resume_id, question=question, answer=clean_answer(answer)))
+            await self.session.commit()
+        except Exception as e:
+            resume_logger.error(f'Error saving chat history: {str(e)}', exc_info=True)
+            await self.session.rollback()
+            raise APIError('Error saving chat history', status_code=500)
+
+    async def get_response(self, resume, question: str, use_cache: bool = True) -> str:
+        """Answer a question about the resume; same behaviour as ChatbotService.get_response"""
+        if not resume.extracted_text:
+            raise APIError('No resume text available for analysis', status_code=400)
+
+        cache_key = question_cache_key(resume, question, self.openai_service.model) if use_cache else None
+        # The cache client is synchronous with short timeouts
+        answer = await asyncio.to_thread(answer_cache.get, cache_key) if cache_key else None
+
+        if answer is None:
+            # Cacheable questions are answered without memory, so the answer fits any conversation
+            history = None if cache_key else await self.get_memory_messages(resume)
+            context, is_excerpt = await self._get_context(resume, question)
+            messages = build_question_messages(question, context, is_excerpt, history)
+            answer = clean_answer(await self.openai_service.create_chat_completion(messages))
+            if cache_key:
+                await asyncio.to_thread(answer_cache.set, cache_key, answer)
+        else:
+            resume_logger.info(f'Answer cache hit for resume {resume.id}')
+
+        await self.save_chat_history(resume.id, question, answer)
+        await self.update_memory(resume)
+        return answer
+
+    async def _claim_analysis(self, resume, fingerprint, timeout: int) -> Tuple[Optional[ResumeAnalysisResult], bool]:
+        """Mark the analysis as processing for this fingerprint; returns (record, claimed)"""
+        result = await self.session.execute(self.analysis_service.claim_query(resume.id))
+        record = result.scalar_one_or_none()
+        if record is None:
+            record = self.analysis_service.mark_processing(None, resume.id, fingerprint)
+            self.session.add(record)
+            try:
+                await self.session.commit()
+            except IntegrityError:
+                # Another request created it first
+                await self.session.rollback()
+                return await self.session.get(ResumeAnalysisResult, resume.id, populate_existing=True), False
+            return record, True
+
+        if not self.analysis_service.should_generate(record, fingerprint, timeout):
+            await self.session.commit()
+            return record, False
+
+        self.analysis_service.mark_processing(record, resume.id, fingerprint)
+        await self.session.commit()
+        return record, True
+
+    async def _generate_analysis(self, resume, record: ResumeAnalysisResult, fingerprint) -> ResumeAnalysisResult:
+        try:
+            result = await self.session.execute(self.analysis_service.shared_query(resume.id, fingerprint))
+            analysis = result.scalar_one_or_none()
+            if not analysis:
+                analysis = await self.openai_service.create_chat_completion(
+                    build_analysis_messages(resume.extracted_text), max_tokens=1000
+                )
+
+            self.analysis_service.mark_completed(record, analysis)
+            await self.session.commit()
+            return record
+
+        except Exception as e:
+            await self.session.rollback()
+            # Rolled-back instances are expired and cannot lazy-load under asyncio
+            record = await self.session.get(ResumeAnalysisResult, resume.id, populate_existing=True)
+            if record:
+                self.analysis_service.mark_failed(record, e)
+                await self.session.commit()
+            raise
+
+    async def get_analysis(self, resume, timeout: int) -> dict:
+        """Serve the stored analysis, generating it only when it is stale and not already in progress"""
+        if not resume.extracted_text:
+            raise APIError('No resume text available for analysis', status_code=400)
+
+        fingerprint = self.analysis_service.fingerprint(resume, model=self.openai_service.model)
+        record = await self.session.get(ResumeAnalysisResult, resume.id)
+        if self.analysis_service.should_generate(record, fingerprint, timeout):
+            record, claimed = await self._claim_analysis(resume, fingerprint, timeout)
+            if claimed:
+                record = await self._generate_analysis(resume, record, fingerprint)
+
+        return self.analysis_service.to_dict(record, fingerprint)
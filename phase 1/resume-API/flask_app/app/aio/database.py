@@ -0,0 +1,33 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+def async_database_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver"""
+    for prefix in ('postgresql+psycopg2://', 'postgresql://', 'postgres://'):
+        if url.startswith(prefix):
+            return 'postgresql+asyncpg://' + url[len(prefix):]
+    return url
+
+def init_engine(database_url: str, pool_size: int = 20, max_overflow: int = 10):
+    """Create the process-wide async engine; call once per worker process"""
+    global _engine, _sessionmaker
+    _engine = create_async_engine(
+        async_database_url(database_url),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True
+    )
+    # Attributes stay loaded after commit: lazy refreshes are not possible under asyncio
+    _sessionmaker = async_sessionmaker(_engine, class_=AsyncSession, expire_on_commit=False)
+
+def get_session() -> AsyncSession:
+    if _sessionmaker is None:
+        raise RuntimeError('Async database engine is not initialised')
+    return _sessionmaker()
+
+async def dispose_engine():
+    if _engine is not None:
+        await _engine.dispose()
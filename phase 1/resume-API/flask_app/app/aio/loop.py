@@ -0,0 +1,41 @@
+import asyncio
+import contextvars
+import os
+import threading
+from typing import Optional
+
+class BackgroundLoop:
+    """An event loop on a daemon thread so synchronous code can await async clients.
+
+    Upload jobs run in worker threads; their LLM calls are scheduled here, where
+    they share one async connection pool instead of each occupying a thread.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        # Recreated after a fork: the parent's loop thread does not exist in the child
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='async-llm-loop', daemon=True).start()
+                    self._loop, self._pid = loop, os.getpid()
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the background loop and wait for its result"""
+        context = contextvars.copy_context()
+
+        async def in_caller_context():
+            # Context variables of the calling thread (e.g. the LLM user) carry over to the task
+            for var, value in context.items():
+                var.set(value)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(in_caller_context(), self._get_loop()).result(timeout)
+
+background_loop = BackgroundLoop()
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import threading
+import weakref
+import httpx
+from openai import AsyncOpenAI
+from app.services.chatbot_service import END_MARKER
+from app.services.single_flight import single_flight
+from app.services.llm_resilience import llm_resilience
+from app.services.llm_governor import llm_governor, estimate_request_tokens
+from app.utils.errors import APIError
+from app.utils.logger import resume_logger
+
+class AsyncOpenAIService:
+    """Async counterpart of OpenAIService for the ASGI path and the background loop.
+
+    Requests are awaited instead of holding a thread, so one process can keep
+    OPENAI_ASYNC_POOL_SIZE completions in flight.
+    """
+    def __init__(self):
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            resume_logger.error('OpenAI API key not configured')
+            raise APIError('OpenAI API key not configured', status_code=500)
+
+        self.model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+        self.max_tokens = int(os.getenv('MAX_TOKENS', '150'))
+        # Enrichment answers (experience lists, JSON) are longer than chat answers
+        self.extraction_max_tokens = int(os.getenv('OPENAI_EXTRACTION_MAX_TOKENS', '800'))
+        self.temperature = 0.7
+        pool_size = int(os.getenv('OPENAI_ASYNC_POOL_SIZE', '200'))
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+            ),
+            timeout=httpx.Timeout(
+                float(os.getenv('OPENAI_TIMEOUT', '60')),
+                connect=float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+            )
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=self.http_client,
+            # Retries are handled by llm_resilience within the call deadline
+            max_retries=0
+        )
+        resume_logger.info(f'Async OpenAI client initialized with a pool of {pool_size} connections')
+
+    async def _call(self, messages, cost: int, kind: str, **params):
+        """Send a completion request through the governor and the resilience policy"""
+        async def attempt(timeout):
+            async with llm_governor.slot_async(cost, max_wait=timeout):
+                return await self.client.chat.completions.create(
+                    model=self.model, messages=messages, timeout=timeout, **params
+                )
+        return await llm_resilience.call_async(attempt, kind=kind)
+
+    async def create_chat_completion(self, messages, max_tokens=None, temperature=None):
+        """Create a chat completion; identical concurrent requests share one upstream call"""
+        max_tokens = max_tokens or self.max_tokens
+        temperature = self.temperature if temperature is None else temperature
+        # Same key as OpenAIService, so sync and async callers coalesce across processes
+        key = single_flight.make_key(
+            model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
+        return await single_flight.do_async(key, lambda: self._create_chat_completion(messages, max_tokens, temperature))
+
+    async def _create_chat_completion(self, messages, max_tokens, temperature):
+        """Create a chat completion with error handling"""
+        try:
+            resume_logger.info(f'Sending async request to OpenAI API with {len(messages)} messages')
+            response = await self._call(
+                messages, estimate_request_tokens(messages, max_tokens), f'chat:{max_tokens}',
+                max_tokens=max_tokens, temperature=temperature, stop=[END_MARKER]
+            )
+
+            if not response.choices or not response.choices[0].message:
+                resume_logger.error('No message in OpenAI response')
+                raise APIError('No response from OpenAI', status_code=500)
+
+            answer = response.choices[0].message.content
+            if not answer:
+                resume_logger.error('Empty content in OpenAI response')
+                raise APIError('Empty response from OpenAI', status_code=500)
+
+            return answer.strip()
+
+        except Exception as e:
+            resume_logger.error(f"OpenAI API error: {str(e)}", exc_info=True)
+            if isinstance(e, APIError):
+                raise
+            raise APIError(f'Error communicating with OpenAI API: {str(e)}', status_code=503)
+
+    async def get_response_direct(self, context: str, query: str, max_tokens: int = None) -> str:
+        """Answer a question about a resume directly, without chat history"""
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant that analyzes resumes. Provide direct, concise answers."},
+            {"role": "user", "content": f"Here is a resume:\n\n{context}\n\nQuestion: {query}"}
+        ]
+        max_tokens = max_tokens or self.extraction_max_tokens
+        response = await self._call(
+            messages, estimate_request_tokens(messages, max_tokens), 'direct',
+            max_tokens=max_tokens, temperature=0.0
+        )
+        content = response.choices[0].message.content
+        if content is None:
+            raise Exception("Received null response from OpenAI")
+        return content
+
+    async def get_structured_response(self, context: str, query: str, schema: dict, max_tokens: int = None) -> dict:
+        """Get a JSON response constrained to a ``json_schema`` response format (structured outputs)"""
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant that extracts structured data from resumes."},
+            {"role": "user", "content": f"Here is a resume:\n\n{context}\n\nTask: {query}"}
+        ]
+        max_tokens = max_tokens or self.extraction_max_tokens
+        response = await self._call(
+            messages, estimate_request_tokens(messages, max_tokens), 'structured',
+            max_tokens=max_tokens, temperature=0.0,
+            response_format={"type": "json_schema", "json_schema": schema}
+        )
+        message = response.choices[0].message
+        if getattr(message, 'refusal', None):
+            raise Exception(f"Model refused structured extraction: {message.refusal}")
+        if message.content is None:
+            raise Exception("Received null response from OpenAI")
+        return json.loads(message.content)
+
+    async def close(self):
+        await self.http_client.aclose()
+
+# httpx async clients are bound to the event loop that first uses them
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+def get_async_openai_service() -> AsyncOpenAIService:
+    """Get the AsyncOpenAIService for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    with _services_lock:
+        service = _services.get(loop)
+        if service is None:
+            service = _services[loop] = AsyncOpenAIService()
+        return service
+
+async def close_async_openai_service():
+    with _services_lock:
+        service = _services.pop(asyncio.get_running_loop(), None)
+    if service is not None:
+        await service.close()
@@ -0,0 +1,90 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.aio.auth import require_firebase_user
+from app.aio.chatbot_service import AsyncChatbotService
+from app.aio.database import get_session
+from app.domain.resume.resume_entity import STATUS_PROCESSING
+from app.utils.errors import APIError
+from app.utils.logger import resume_logger
+
+@require_firebase_user
+async def ask_question(request: Request):
+    """Async /api/chat/ask; same request and response shape as the Flask view"""
+    try:
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not data:
+            return JSONResponse({'error': 'No data provided'}, status_code=400)
+            
+        resume_id = data.get('resume_id')
+        question = data.get('question')
+        use_cache = not data.get('no_cache', False)
+        
+        if not resume_id or not question:
+            return JSONResponse({'error': 'Resume ID and question are required'}, status_code=400)
+            
+        async with get_session() as session:
+            chatbot_service = AsyncChatbotService(session)
+            resume = await chatbot_service.get_resume(resume_id, request.state.user_id)
+            if not resume:
+                resume_logger.error(f"Resume not found: {resume_id} for user: {request.state.user_id}")
+                return JSONResponse({'error': 'Resume not found'}, status_code=404)
+                
+            if not resume.extracted_text:
+                return JSONResponse({'error': 'No text content available for this resume'}, status_code=400)
+                
+            answer = await chatbot_service.get_response(resume, question, use_cache=use_cache)
+            
+        return JSONResponse({
+            'resume_id': resume_id,
+            'question': question,
+            'answer': answer
+        })
+        
+    except APIError as api_error:
+        resume_logger.error(f"API Error in async chat: {api_error.message}")
+        return JSONResponse({'error': api_error.message}, status_code=api_error.status_code)
+    except Exception as e:
+        resume_logger.error(f"Unexpected error in async ask_question: {str(e)}", exc_info=True)
+        return JSONResponse({'error': 'An unexpected error occurred'}, status_code=500)
+
+@require_firebase_user
+async def analyze_resume(request: Request):
+    """Async /api/chat/analyze/<id>; same request and response shape as the Flask view"""
+    resume_id = request.path_params['resume_id']
+    try:
+        async with get_session() as session:
+            chatbot_service = AsyncChatbotService(session)
+            resume = await chatbot_service.get_resume(resume_id, request.state.user_id)
+            if not resume:
+                resume_logger.error(f"Resume not found: {resume_id} for user: {request.state.user_id}")
+                return JSONResponse({'error': 'Resume not found'}, status_code=404)
+                
+            if not resume.extracted_text:
+                return JSONResponse({'error': 'No text content available for this resume'}, status_code=400)
+                
+            result = await chatbot_service.get_analysis(resume, request.app.state.analysis_timeout)
+            
+        if result['status'] == STATUS_PROCESSING:
+            # Another request is generating it; serve the previous analysis if there is one
+            return JSONResponse({'resume_id': resume_id, **result}, status_code=202)
+            
+        if not result['analysis']:
+            return JSONResponse({'error': 'Failed to generate analysis'}, status_code=500)
+            
+        return JSONResponse({'resume_id': resume_id, **result})
+        
+    except APIError as api_error:
+        resume_logger.error(f"API Error in async analysis: {api_error.message}")
+        return JSONResponse({'error': api_error.message}, status_code=api_error.status_code)
+    except Exception as e:
+        resume_logger.error(f"Unexpected error in async analyze_resume: {str(e)}", exc_info=True)
+        return JSONResponse({'error': 'An unexpected error occurred'}, status_code=500)
+
+routes = [
+    Route('/api/chat/ask', ask_question, methods=['POST']),
+    Route('/api/chat/analyze/{resume_id:int}', analyze_resume, methods=['GET']),
+]
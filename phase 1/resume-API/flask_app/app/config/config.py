@@ -20,11 +20,73 @@ class Config:
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 10))
     
+    # Chat answer cache
+    CHAT_CACHE_ENABLED = os.getenv('CHAT_CACHE_ENABLED', 'true').lower() == 'true'
+    CHAT_CACHE_TTL = int(os.getenv('CHAT_CACHE_TTL', 86400))  # seconds
+    CHAT_CACHE_MAX_ENTRIES = int(os.getenv('CHAT_CACHE_MAX_ENTRIES', 1024))  # in-process LRU size
+    
+    # Coalescing of identical in-flight LLM requests
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    SINGLE_FLIGHT_LOCK_TTL = int(os.getenv('SINGLE_FLIGHT_LOCK_TTL', 120))  # seconds; also the longest wait for another process
+    SINGLE_FLIGHT_RESULT_TTL = int(os.getenv('SINGLE_FLIGHT_RESULT_TTL', 10))  # seconds a shared result stays readable
+    
+    # Cluster-wide LLM governor (Redis): concurrency, tokens per minute and per-user fair queueing
+    LLM_GOVERNOR_ENABLED = os.getenv('LLM_GOVERNOR_ENABLED', 'true').lower() == 'true'
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 16))  # OpenAI calls in flight across all processes
+    LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', 80000))  # Estimated prompt + completion tokens; 0 disables
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 30))  # seconds a call may wait for a slot
+    LLM_SLOT_LEASE = int(os.getenv('LLM_SLOT_LEASE', 120))  # seconds before a slot of a crashed process is reclaimed
+    LLM_USER_WEIGHTS = os.getenv('LLM_USER_WEIGHTS', '')  # e.g. "uid1=2,uid2=0.5"; everyone else has weight 1
+    
+    # Chat prompt retrieval
+    CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv('CHAT_CONTEXT_TOKEN_BUDGET', 1500))  # Resume tokens per question
+    CHAT_CHUNK_TOKENS = int(os.getenv('CHAT_CHUNK_TOKENS', 200))  # Target chunk size at upload
+    
+    # Chat conversation memory
+    CHAT_MEMORY_TURNS = int(os.getenv('CHAT_MEMORY_TURNS', 4))  # Recent turns sent verbatim
+    CHAT_MEMORY_TURN_TOKENS = int(os.getenv('CHAT_MEMORY_TURN_TOKENS', 250))  # Cap per verbatim question or answer
+    CHAT_MEMORY_SUMMARY_TOKENS = int(os.getenv('CHAT_MEMORY_SUMMARY_TOKENS', 200))  # Cap for the rolling summary
+    CHAT_MEMORY_FOLD_BATCH = int(os.getenv('CHAT_MEMORY_FOLD_BATCH', 10))  # Max turns folded into the summary per update
+    
     # File Upload
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
     UPLOAD_DIR = os.path.join(Path(__file__).parent.parent.parent, 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
     
+    # Text extraction worker processes
+    EXTRACTION_BACKENDS = {  # Backend per file format, see app/services/extraction_backends.py
+        'pdf': os.getenv('EXTRACTION_PDF_BACKEND', 'pymupdf'),
+        'docx': os.getenv('EXTRACTION_DOCX_BACKEND', 'python-docx')
+    }
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', 2))
+    EXTRACTION_CPU_SECONDS = float(os.getenv('EXTRACTION_CPU_SECONDS', 20))  # CPU budget per document
+    EXTRACTION_MEMORY_MB = int(os.getenv('EXTRACTION_MEMORY_MB', 512))  # RSS budget per worker
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', 60))  # Wall-clock seconds per document, queueing included
+    EXTRACTION_FANOUT_PAGES = int(os.getenv('EXTRACTION_FANOUT_PAGES', 40))  # Pages per task for long PDFs; 0 disables fan-out
+    EXTRACTION_MAX_TASKS_PER_WORKER = int(os.getenv('EXTRACTION_MAX_TASKS_PER_WORKER', 200))
+    
+    # Async (ASGI) path, see asgi.py
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 10))  # Threads serving the Flask routes under ASGI
+    
+    # Background Jobs
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))  # Upload pipeline threads per process
+    JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 1800))  # seconds without progress before a job counts as lost
+    JOB_SWEEP_INTERVAL = int(os.getenv('JOB_SWEEP_INTERVAL', 300))  # seconds between sweeps for lost jobs, per process
+    ANALYSIS_PRECOMPUTE = os.getenv('ANALYSIS_PRECOMPUTE', 'false').lower() == 'true'  # Analyze right after upload
+    ANALYSIS_GENERATION_TIMEOUT = int(os.getenv('ANALYSIS_GENERATION_TIMEOUT', 180))  # seconds before a stuck run is retried
+    
+    # Skill Taxonomy
+    SKILL_TAXONOMY_PATH = os.getenv('SKILL_TAXONOMY_PATH', os.path.join(Path(__file__).parent, 'skill_taxonomy.json'))
+    SKILL_CACHE_DIR = os.getenv('SKILL_CACHE_DIR', os.path.join(Path(__file__).parent.parent.parent, 'cache'))
+    SKILL_TAXONOMY_RELOAD_INTERVAL = float(os.getenv('SKILL_TAXONOMY_RELOAD_INTERVAL', 30))  # seconds
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))  # Rows per server-side cursor fetch
+    
     # Firebase
     FIREBASE_CREDENTIALS = os.getenv('FIREBASE_CREDENTIALS', 'firebase-credentials.json')
     
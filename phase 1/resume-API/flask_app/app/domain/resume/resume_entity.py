@@ -3,6 +3,13 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID, uuid4
 
+# Processing states shared by resumes and upload jobs
+STATUS_PENDING = 'pending'
+STATUS_PROCESSING = 'processing'
+STATUS_COMPLETED = 'completed'
+STATUS_ERROR = 'error'
+STATUSES = (STATUS_PENDING, STATUS_PROCESSING, STATUS_COMPLETED, STATUS_ERROR)
+
 @dataclass
 class ResumeAnalysis:
     skills: List[str]
@@ -26,7 +33,7 @@ class Resume:
     file_path: str
     content: str
     analysis: Optional[ResumeAnalysis] = None
-    status: str = 'pending'
+    status: str = STATUS_PENDING
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -47,23 +54,23 @@ class Resume:
             raise ValueError("File path is required")
         if not self.content:
             raise ValueError("Content is required")
-        if self.status not in ['pending', 'processing', 'completed', 'error']:
+        if self.status not in STATUSES:
             raise ValueError("Invalid status")
 
     def update_analysis(self, analysis: ResumeAnalysis):
         """Update resume analysis"""
         self.analysis = analysis
-        self.status = 'completed'
+        self.status = STATUS_COMPLETED
         self.updated_at = datetime.utcnow()
 
     def mark_as_processing(self):
         """Mark resume as processing"""
-        self.status = 'processing'
+        self.status = STATUS_PROCESSING
         self.updated_at = datetime.utcnow()
 
     def mark_as_error(self):
         """Mark resume as error"""
-        self.status = 'error'
+        self.status = STATUS_ERROR
         self.updated_at = datetime.utcnow()
 
     def to_dict(self) -> dict:
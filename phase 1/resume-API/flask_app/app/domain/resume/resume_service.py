@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional
 from uuid import UUID
 from .resume_entity import Resume, ResumeAnalysis
@@ -17,11 +18,18 @@ class ResumeService:
     async def upload_resume(self, user_id: str, file_name: str, file_content: bytes) -> Resume:
         """Upload and process a new resume"""
         try:
-            # Save file to storage
-            file_path = await self.file_storage.save(file_name, file_content)
-            
-            # Extract text content
-            content = await self.file_storage.extract_text(file_path)
+            # Save file to storage while the text is extracted from memory
+            saved, extracted = await asyncio.gather(
+                self.file_storage.save(file_name, file_content),
+                self.file_storage.extract_text_from_bytes(file_name, file_content),
+                return_exceptions=True
+            )
+            if isinstance(saved, Exception):
+                raise saved
+            file_path = saved
+            if isinstance(extracted, Exception):
+                raise extracted
+            content = extracted
             
             # Create resume entity
             resume = Resume(
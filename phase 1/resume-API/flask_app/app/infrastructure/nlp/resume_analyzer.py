@@ -20,13 +20,9 @@ class ResumeAnalyzer:
     
     def _load_skill_patterns(self) -> List[Dict]:
         """Load skill patterns for entity ruler"""
-        # This is a simplified version. In production, you'd load from a comprehensive database
-        skills = [
-            "Python", "JavaScript", "Java", "C++", "SQL", "React", "Angular", "Vue",
-            "Node.js", "Express", "Django", "Flask", "FastAPI", "Docker", "Kubernetes",
-            "AWS", "Azure", "GCP", "Machine Learning", "Deep Learning", "NLP",
-            "Data Science", "Data Analysis", "Data Engineering", "DevOps", "CI/CD"
-        ]
+        # Share the taxonomy with SkillService so the two lists cannot drift apart
+        from ...services.skill_taxonomy import get_skill_taxonomy
+        skills = get_skill_taxonomy().all_skills()
         
         patterns = []
         for skill in skills:
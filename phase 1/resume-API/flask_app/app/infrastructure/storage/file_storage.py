@@ -1,10 +1,10 @@
 import os
+import asyncio
 from typing import Optional
 from uuid import uuid4
 import aiofiles
-from PyPDF2 import PdfReader
-from docx import Document
 from ...config.config import Config
+from ...services.extraction_pool import extraction_pool
 
 class FileStorage:
     """Service for handling file storage operations"""
@@ -33,47 +33,35 @@ class FileStorage:
     async def delete(self, file_path: str) -> bool:
         """Delete file from storage"""
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                return True
+            await asyncio.to_thread(os.remove, file_path)
+            return True
+        except FileNotFoundError:
             return False
         except Exception as e:
             raise ValueError(f"Failed to delete file: {str(e)}")
     
     async def extract_text(self, file_path: str) -> str:
-        """Extract text content from file"""
+        """Extract text content from file with the shared extraction pool (see FileService)"""
         try:
-            ext = os.path.splitext(file_path)[1].lower()
-            
-            if ext == '.pdf':
-                return await self._extract_from_pdf(file_path)
-            elif ext == '.docx':
-                return await self._extract_from_docx(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {ext}")
+            file_format = os.path.splitext(file_path)[1].lower().lstrip('.')
+            if file_format not in extraction_pool.formats:
+                raise ValueError(f"Unsupported file type: .{file_format}")
+            # The pool call blocks until a worker process has parsed the file
+            return await asyncio.to_thread(extraction_pool.extract, file_path, file_format)
                 
         except Exception as e:
             raise ValueError(f"Failed to extract text: {str(e)}")
     
-    async def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file"""
-        try:
-            with open(file_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
-        except Exception as e:
-            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
-    
-    async def _extract_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file"""
+    async def extract_text_from_bytes(self, filename: str, content: bytes) -> str:
+        """Extract text content from file content in memory, without a disk round trip"""
         try:
-            doc = Document(file_path)
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            file_format = os.path.splitext(filename)[1].lower().lstrip('.')
+            if file_format not in extraction_pool.formats:
+                raise ValueError(f"Unsupported file type: .{file_format}")
+            return await asyncio.to_thread(extraction_pool.extract, content, file_format)
+
         except Exception as e:
-            raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+            raise ValueError(f"Failed to extract text: {str(e)}")
     
     def get_file_path(self, filename: str) -> Optional[str]:
         """Get full path for a file"""
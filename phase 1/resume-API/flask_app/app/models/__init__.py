@@ -1,4 +1,4 @@
 # Import all models here to ensure they are registered with SQLAlchemy
-from .resume import Resume, Skill, ResumeSkill, ChatHistory
+from .resume import Resume, Skill, ResumeSkill, ChatHistory, ChatMemory, ResumeJob, ResumeArtifact, ResumeAnalysisResult, ResumeChunk, StoredFile
 
-__all__ = ['Resume', 'Skill', 'ResumeSkill', 'ChatHistory'] 
\ No newline at end of file
+__all__ = ['Resume', 'Skill', 'ResumeSkill', 'ChatHistory', 'ChatMemory', 'ResumeJob', 'ResumeArtifact', 'ResumeAnalysisResult', 'ResumeChunk', 'StoredFile'] 
\ No newline at end of file
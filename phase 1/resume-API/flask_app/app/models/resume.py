@@ -1,10 +1,15 @@
 from datetime import datetime
 from app import db
 from sqlalchemy.orm import relationship
+from app.domain.resume.resume_entity import STATUS_PENDING
 
 class Resume(db.Model):
     """Resume model for storing uploaded resumes and their extracted information"""
     __tablename__ = 'resumes'
+    __table_args__ = (
+        db.Index('ix_resumes_user_id_created_at_id', 'user_id', db.text('created_at DESC'), db.text('id DESC')),
+        db.Index('ix_resumes_user_id_experience_education', 'user_id', 'years_of_experience', 'education_level'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     file_name = db.Column(db.String(255), nullable=False)
@@ -19,14 +24,21 @@ class Resume(db.Model):
     years_of_experience = db.Column(db.Float, nullable=True)
     education_level = db.Column(db.String(50), nullable=True)  # e.g., "Bachelor's", "Master's", "PhD"
     
+    # SHA-256 of the uploaded file, shared by duplicate uploads
+    content_hash = db.Column(db.String(64), db.ForeignKey('resume_artifacts.content_hash'), nullable=True, index=True)
+    
     # Relationships
     resume_skills = relationship('ResumeSkill', back_populates='resume', cascade='all, delete-orphan')
     skills = relationship('Skill', secondary='resume_skills', back_populates='resumes')
     chat_history = relationship('ChatHistory', back_populates='resume', cascade='all, delete-orphan')
     education = relationship('Education', back_populates='resume', cascade='all, delete-orphan')
     experience = relationship('Experience', back_populates='resume', cascade='all, delete-orphan')
+    artifact = relationship('ResumeArtifact')
+    analysis_result = relationship('ResumeAnalysisResult', back_populates='resume', uselist=False, cascade='all, delete-orphan')
+    chunks = relationship('ResumeChunk', back_populates='resume', cascade='all, delete-orphan', order_by='ResumeChunk.position')
+    chat_memory = relationship('ChatMemory', back_populates='resume', uselist=False, cascade='all, delete-orphan')
     
-    def __init__(self, file_name=None, file_path=None, file_type=None, extracted_text=None, user_id=None, years_of_experience=0.0, education_level="High School"):
+    def __init__(self, file_name=None, file_path=None, file_type=None, extracted_text=None, user_id=None, years_of_experience=0.0, education_level="High School", content_hash=None):
         self.file_name = file_name
         self.file_path = file_path
         self.file_type = file_type
@@ -34,10 +46,43 @@ class Resume(db.Model):
         self.user_id = user_id
         self.years_of_experience = years_of_experience
         self.education_level = education_level
+        self.content_hash = content_hash
 
     def __repr__(self):
         return f'<Resume {self.file_name}>'
 
+class ResumeArtifact(db.Model):
+    """Derived results for a unique file content, shared by every upload of the same bytes"""
+    __tablename__ = 'resume_artifacts'
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest
+    extracted_text = db.Column(db.Text, nullable=False)
+    skills = db.Column(db.JSON, nullable=False)  # Category-keyed skill lists
+    education_level = db.Column(db.String(50), nullable=True)
+    years_of_experience = db.Column(db.Float, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ResumeArtifact {self.content_hash}>'
+
+class StoredFile(db.Model):
+    """An upload in the content-addressed file store, with the number of jobs and resumes using it"""
+    __tablename__ = 'stored_files'
+    __table_args__ = (
+        # Released files waiting to be purged
+        db.Index('ix_stored_files_unreferenced', 'content_hash', postgresql_where=db.text('ref_count <= 0')),
+    )
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest
+    stored_name = db.Column(db.String(255), nullable=False)  # Path inside the store, e.g. ab/cd/<hash>.pdf
+    size = db.Column(db.BigInteger, nullable=True)  # Bytes
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoredFile {self.stored_name} refs={self.ref_count}>'
+
 class Skill(db.Model):
     __tablename__ = 'skills'
 
@@ -49,11 +94,14 @@ class Skill(db.Model):
     # Relationships
     resumes = relationship('Resume', secondary='resume_skills', back_populates='skills')
 
+# Case-insensitive skill lookups (filter endpoint)
+db.Index('ix_skills_name_lower', db.func.lower(Skill.name))
+
 class ResumeSkill(db.Model):
     __tablename__ = 'resume_skills'
 
     resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), primary_key=True)
-    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True, index=True)
     confidence_score = db.Column(db.Float)  # Score from NER
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -63,6 +111,9 @@ class ResumeSkill(db.Model):
 
 class ChatHistory(db.Model):
     __tablename__ = 'chat_history'
+    __table_args__ = (
+        db.Index('ix_chat_history_resume_id_created_at', 'resume_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False)
@@ -73,6 +124,22 @@ class ChatHistory(db.Model):
     # Relationship
     resume = relationship('Resume', back_populates='chat_history')
 
+class ChatMemory(db.Model):
+    """Rolling summary of the chat turns that have left a resume's verbatim memory window"""
+    __tablename__ = 'chat_memories'
+
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    summary = db.Column(db.Text, nullable=True)
+    summarized_until_id = db.Column(db.Integer, nullable=False, default=0)  # Last chat_history id folded in
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    resume = relationship('Resume', back_populates='chat_memory')
+
+    def __repr__(self):
+        return f'<ChatMemory {self.resume_id} until {self.summarized_until_id}>'
+
 class Education(db.Model):
     """Education model for storing educational qualifications"""
     __tablename__ = 'education'
@@ -103,4 +170,88 @@ class Experience(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
-    resume = relationship('Resume', back_populates='experience') 
\ No newline at end of file
+    resume = relationship('Resume', back_populates='experience') 
+
+class ResumeJob(db.Model):
+    """Background processing job for an uploaded resume"""
+    __tablename__ = 'resume_jobs'
+    __table_args__ = (
+        # Unfinished jobs, swept for ones lost with their worker
+        db.Index('ix_resume_jobs_unfinished_updated_at', 'updated_at',
+                 postgresql_where=db.text("status IN ('pending', 'processing')")),
+    )
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID4 string
+    user_id = db.Column(db.String(128), nullable=False, index=True)  # Firebase UID
+    file_name = db.Column(db.String(255), nullable=False)  # Original (secured) upload name
+    stored_name = db.Column(db.String(255), nullable=False)  # Path inside the file store (see ContentStore)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the upload
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+    stage = db.Column(db.String(20), nullable=True)  # extract, skills, enrich, persist
+    error = db.Column(db.Text, nullable=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='SET NULL'), nullable=True)
+    result = db.Column(db.JSON, nullable=True)  # e.g. extracted skills
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    resume = relationship('Resume')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'file_name': self.file_name,
+            'resume_id': self.resume_id,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ResumeJob {self.id} {self.status}>'
+
+class ResumeAnalysisResult(db.Model):
+    """Stored LLM analysis of a resume, valid while its fingerprint (text, model, prompt version) matches"""
+    __tablename__ = 'resume_analyses'
+
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    text_hash = db.Column(db.String(64), nullable=False, index=True)  # SHA-256 of extracted_text
+    model = db.Column(db.String(100), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+    analysis = db.Column(db.Text, nullable=True)  # Last completed analysis, kept while regenerating
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)  # When the current generation began
+    generated_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    resume = relationship('Resume', back_populates='analysis_result')
+
+    def __repr__(self):
+        return f'<ResumeAnalysisResult {self.resume_id} {self.status}>'
+
+class ResumeChunk(db.Model):
+    """Section-labelled piece of a resume's text, used to build compact chat prompts"""
+    __tablename__ = 'resume_chunks'
+    __table_args__ = (
+        db.UniqueConstraint('resume_id', 'position', name='uq_resume_chunks_resume_id_position'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Order within the resume text
+    section = db.Column(db.String(50), nullable=False)  # e.g. "experience", "education", "skills"
+    content = db.Column(db.Text, nullable=False)
+    token_count = db.Column(db.Integer, nullable=False)  # Estimated prompt tokens
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationship
+    resume = relationship('Resume', back_populates='chunks')
+
+    def __repr__(self):
+        return f'<ResumeChunk {self.resume_id}:{self.position} {self.section}>'
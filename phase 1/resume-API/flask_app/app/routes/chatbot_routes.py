@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify, g
+import json
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from app.models.resume import Resume, ChatHistory
-from app.services.chatbot_service import ChatbotService
+from app.services.chatbot_service import ChatbotService, get_openai_service
+from app.services.answer_cache import answer_cache
+from app.services.single_flight import single_flight
+from app.services.llm_resilience import llm_resilience
+from app.services.llm_governor import llm_governor
+from app.services.analysis_service import AnalysisService
+from app.domain.resume.resume_entity import STATUS_PROCESSING
 from app import db
 from flask_cors import cross_origin
 from app.middlewares.auth_middleware import verify_firebase_token
@@ -8,6 +15,7 @@ from app.utils.logger import resume_logger, log_function_call
 from app.utils.errors import APIError
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chat')
+analysis_service = AnalysisService()
 
 @chatbot_bp.route('/ask', methods=['POST'])
 @cross_origin()
@@ -26,6 +34,7 @@ def ask_question():
             
         resume_id = data.get('resume_id')
         question = data.get('question')
+        use_cache = not data.get('no_cache', False)
         
         resume_logger.info(f"Extracted resume_id: {resume_id}, question: {question}")
         
@@ -62,7 +71,7 @@ def ask_question():
         resume_logger.info(f"Processing question for resume {resume_id}: {question}")
         
         try:
-            answer = chatbot_service.get_response(resume, question)
+            answer = chatbot_service.get_response(resume, question, use_cache=use_cache)
             if not answer:
                 resume_logger.error("Empty response received from chatbot service")
                 return jsonify({'error': 'Failed to generate response'}), 500
@@ -83,6 +92,73 @@ def ask_question():
         resume_logger.error(f"Unexpected error in ask_question: {str(e)}", exc_info=True)
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event; data is JSON so newlines in answers stay inside the frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@chatbot_bp.route('/ask/stream', methods=['POST'])
+@cross_origin()
+@verify_firebase_token
+@log_function_call(resume_logger)
+def ask_question_stream():
+    """Ask a question about a resume, streaming the answer as Server-Sent Events.
+
+    Emits ``token`` events ({"text": ...}) as the answer is generated, then a
+    single ``done`` event, or an ``error`` event if generation fails midway.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            resume_logger.error("No data provided in request")
+            return jsonify({'error': 'No data provided'}), 400
+            
+        resume_id = data.get('resume_id')
+        question = data.get('question')
+        use_cache = not data.get('no_cache', False)
+        
+        if not resume_id or not question:
+            resume_logger.error("Missing required fields: resume_id or question")
+            return jsonify({'error': 'Resume ID and question are required'}), 400
+            
+        resume = Resume.query.filter_by(id=resume_id, user_id=g.user_id).first()
+        if not resume:
+            resume_logger.error(f"Resume not found: {resume_id} for user: {g.user_id}")
+            return jsonify({'error': 'Resume not found'}), 404
+            
+        if not resume.extracted_text:
+            resume_logger.error(f"No extracted text found for resume: {resume_id}")
+            return jsonify({'error': 'No text content available for this resume'}), 400
+            
+        chatbot_service = ChatbotService()
+        resume_logger.info(f"Streaming answer for resume {resume_id}: {question}")
+        
+        def generate():
+            try:
+                for text in chatbot_service.stream_response(resume, question, use_cache=use_cache):
+                    yield _sse_event('token', {'text': text})
+                yield _sse_event('done', {'resume_id': resume_id, 'question': question})
+            except APIError as api_error:
+                yield _sse_event('error', {'error': api_error.message, 'status': api_error.status_code})
+            except Exception as e:
+                resume_logger.error(f"Unexpected error while streaming answer: {str(e)}", exc_info=True)
+                yield _sse_event('error', {'error': 'An unexpected error occurred', 'status': 500})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                # Stop nginx and similar proxies from buffering the stream
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except APIError as api_error:
+        return jsonify({'error': api_error.message}), api_error.status_code
+    except Exception as e:
+        resume_logger.error(f"Unexpected error in ask_question_stream: {str(e)}", exc_info=True)
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
 @chatbot_bp.route('/analyze/<int:resume_id>', methods=['GET'])
 @cross_origin()
 @verify_firebase_token
@@ -99,29 +175,23 @@ def analyze_resume(resume_id):
             resume_logger.error(f"No extracted text found for resume: {resume_id}")
             return jsonify({'error': 'No text content available for this resume'}), 400
             
-        try:
-            chatbot_service = ChatbotService()
-            resume_logger.info(f"ChatbotService initialized successfully")
-        except Exception as service_error:
-            resume_logger.error(f"Failed to initialize ChatbotService: {str(service_error)}", exc_info=True)
-            return jsonify({'error': 'Failed to initialize chat service'}), 500
-            
         resume_logger.info(f"Analyzing resume: {resume_id}")
         
         try:
-            analysis = chatbot_service.get_resume_analysis(resume)
-            if not analysis:
+            result = analysis_service.get_analysis(resume)
+            if result['status'] == STATUS_PROCESSING:
+                # Another request is generating it; serve the previous analysis if there is one
+                return jsonify({'resume_id': resume_id, **result}), 202
+
+            if not result['analysis']:
                 resume_logger.error("Empty analysis received from chatbot service")
                 return jsonify({'error': 'Failed to generate analysis'}), 500
                 
-            return jsonify({
-                'resume_id': resume_id,
-                'analysis': analysis
-            })
+            return jsonify({'resume_id': resume_id, **result})
             
         except APIError as api_error:
             resume_logger.error(f"API Error in chatbot service: {str(api_error)}", exc_info=True)
-            return jsonify({'error': str(api_error)}), api_error.status_code
+            return jsonify({'error': api_error.message}), api_error.status_code
             
     except Exception as e:
         resume_logger.error(f"Unexpected error in analyze_resume: {str(e)}", exc_info=True)
@@ -155,4 +225,29 @@ def get_chat_history(resume_id):
         
     except Exception as e:
         resume_logger.error(f"Error in get_chat_history: {str(e)}", exc_info=True)
-        return jsonify({'error': 'Failed to retrieve chat history'}), 500 
\ No newline at end of file
+        return jsonify({'error': 'Failed to retrieve chat history'}), 500 
+
+@chatbot_bp.route('/health', methods=['GET'])
+@cross_origin()
+def chat_health():
+    """Report whether the OpenAI key is valid, from the cached check"""
+    try:
+        healthy = bool(get_openai_service().check_health()['healthy'])
+    except APIError:
+        healthy = False
+    return jsonify({'healthy': healthy}), 200 if healthy else 503
+
+@chatbot_bp.route('/health/details', methods=['GET'])
+@cross_origin()
+@verify_firebase_token
+def chat_health_details():
+    """Report the key validation state, circuit breaker state and cache counters; refresh=true re-validates the key"""
+    try:
+        health = get_openai_service().check_health(force=request.args.get('refresh') == 'true')
+        health['answer_cache'] = answer_cache.stats()
+        health['single_flight'] = single_flight.stats()
+        health['resilience'] = llm_resilience.state()
+        health['governor'] = llm_governor.stats()
+        return jsonify(health), 200 if health['healthy'] else 503
+    except APIError as api_error:
+        return jsonify({'healthy': False, 'error': api_error.message}), api_error.status_code
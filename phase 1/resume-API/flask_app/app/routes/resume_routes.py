@@ -1,18 +1,23 @@
 import os
-from flask import Blueprint, request, jsonify, g
-from werkzeug.utils import secure_filename
+import json
+from flask import Blueprint, request, jsonify, g, current_app, Response, stream_with_context
 from app import db
 from app.models.resume import Resume, ResumeSkill, Skill
 from app.services.file_service import FileService
 from app.services.skill_service import SkillService
+from app.services.job_service import JobService
 from app.middlewares.auth_middleware import verify_firebase_token
-from sqlalchemy import text
+from sqlalchemy import text, select, func, tuple_
+from sqlalchemy.orm import load_only, selectinload
 from app.utils.logger import resume_logger, log_function_call
+from app.utils.errors import APIError
+from app.utils.pagination import encode_cursor, decode_cursor, get_page_size, is_truthy
 from sqlalchemy import any_
 
 resume_bp = Blueprint('resume', __name__, url_prefix='/api/resumes')
 file_service = FileService(os.getenv('UPLOAD_FOLDER', 'uploads'))
 skill_service = SkillService()
+job_service = JobService(file_service, skill_service)
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 
@@ -31,182 +36,129 @@ def test_endpoint():
 @verify_firebase_token
 @log_function_call(resume_logger)
 def upload_resume():
-    """Handle resume upload and processing"""
+    """Accept a resume upload and queue it for background processing.
+
+    The multipart body is streamed to storage chunk by chunk instead of being
+    buffered by Werkzeug (request.files is never touched), so oversize and
+    wrong-type files are rejected before the rest of the body is read.
+    """
     try:
         resume_logger.info(f"Starting resume upload process for user: {g.user_id}")
-        
-        # Check if file is present in request
-        if 'file' not in request.files:
+
+        boundary = request.mimetype_params.get('boundary')
+        if request.mimetype != 'multipart/form-data' or not boundary:
             resume_logger.error("No file part in request")
             return jsonify({'error': 'No file part'}), 400
-        
-        file = request.files['file']
-        if not file or not file.filename:
-            resume_logger.error("No file selected")
-            return jsonify({'error': 'No file selected'}), 400
-
-        # Save the file
-        resume_logger.info(f"Attempting to save file: {file.filename}")
-        success, file_name = file_service.save_file(file)
-        if not success:
-            resume_logger.error(f"Failed to save file: {file_name}")
-            return jsonify({'error': f'Failed to save file: {file_name}'}), 500
-
-        # Extract text from file
-        resume_logger.info(f"Extracting text from file: {file_name}")
-        text = file_service.extract_text(file_name)
-        if not text:
-            resume_logger.error("Failed to extract text from file")
-            return jsonify({'error': 'Failed to extract text from file'}), 500
-
-        # Extract skills from text
-        resume_logger.info("Extracting skills from text")
-        skills = skill_service.extract_skills(text)
-        if not skills:
-            resume_logger.warning("No skills found in resume")
-            return jsonify({'error': 'No skills found in resume'}), 400
-
-        # Extract education level and experience from text using OpenAI
-        try:
-            resume_logger.info("Extracting education and experience info")
-            from app.services.chatbot_service import ChatbotService
-            chatbot = ChatbotService()
-            
-            # Ask about education level
-            education_query = "What is the highest education level mentioned in this resume? Respond with ONLY ONE of these exact values: High School, Associate's, Bachelor's, Master's, PhD. If none found, respond with High School."
-            education_level = chatbot.get_response_direct(text, education_query).strip()
-            resume_logger.info(f"Detected education level: {education_level}")
-            
-            # Ask about years of experience
-            experience_query = """Extract ALL full-time professional work experiences from the resume with their start and end dates.
-            Format your response EXACTLY as follows (one experience per line):
-            Company Name | Start Date (MM/YYYY) | End Date (MM/YYYY or PRESENT)
-
-            Rules:
-            - Only include full-time professional roles
-            - Skip internships, part-time work, or academic experience
-            - Use PRESENT for current roles
-            - If exact month is unknown, use 01 for start dates and 12 for end dates
-            - If no professional experience found, respond with NONE"""
-            
-            experience_text = chatbot.get_response_direct(text, experience_query).strip()
-            resume_logger.info(f"Extracted experience text: {experience_text}")
-            
-            # Calculate total years of experience
-            from datetime import datetime
-            total_years = 0.0
-            
-            if experience_text.upper() != "NONE":
-                current_date = datetime.now()
-                for line in experience_text.split('\n'):
-                    if '|' not in line:
-                        continue
-                    try:
-                        parts = [p.strip() for p in line.split('|')]
-                        if len(parts) != 3:
-                            continue
-                            
-                        company, start_date, end_date = parts
-                        start = datetime.strptime(start_date, '%m/%Y')
-                        
-                        if end_date.upper() == 'PRESENT':
-                            end = current_date
-                        else:
-                            end = datetime.strptime(end_date, '%m/%Y')
-                            
-                        # Calculate years for this role
-                        years = (end - start).days / 365.25
-                        total_years += years
-                        
-                    except Exception as date_error:
-                        resume_logger.error(f"Error parsing date from line '{line}': {str(date_error)}")
-                        continue
-                
-                # Round to nearest 0.5
-                total_years = round(total_years * 2) / 2
-                
-            years_exp = total_years
-            resume_logger.info(f"Calculated years of experience: {years_exp}")
-        except Exception as e:
-            resume_logger.error(f"Error extracting education/experience: {str(e)}")
-            education_level = "High School"
-            years_exp = 0.0
-
-        # Create resume record
-        resume_logger.info(f"Creating resume record for user_id: {g.user_id}")
-        file_path = os.path.join(os.getenv('UPLOAD_FOLDER', 'uploads'), file_name)
-        file_type = file_name.rsplit('.', 1)[1].lower()
-        
-        resume = Resume(
-            file_name=secure_filename(file.filename),
-            file_path=file_path,
-            file_type=file_type,
-            extracted_text=text,
-            user_id=g.user_id,
-            years_of_experience=years_exp,
-            education_level=education_level
-        )
-        
-        try:
-            db.session.add(resume)
-            db.session.flush()
-            resume_logger.info(f"Resume record created with ID: {resume.id}")
 
-            # Save skills
-            resume_logger.info(f"Saving extracted skills for resume ID: {resume.id}")
-            skill_service.save_skills(resume, skills)
-            
-            db.session.commit()
-            resume_logger.info(f"Transaction committed successfully for resume ID: {resume.id}")
+        max_size = current_app.config['MAX_CONTENT_LENGTH']
+        if request.content_length is not None and request.content_length > max_size:
+            resume_logger.error(f"Upload rejected: Content-Length {request.content_length} exceeds {max_size}")
+            return jsonify({'error': f'File exceeds the {max_size / (1024 * 1024):g} MB limit'}), 413
 
-            return jsonify({
-                'message': 'Resume uploaded successfully',
-                'resume_id': resume.id,
-                'skills': skills
-            }), 200
+        file_name, stored_name, content_hash = file_service.receive_upload(request.stream, boundary, max_size)
 
-        except Exception as db_error:
-            db.session.rollback()
-            resume_logger.error(f"Database error during resume creation: {str(db_error)}", exc_info=True)
-            return jsonify({'error': f'Database error: {str(db_error)}'}), 500
+        # Queue extraction, skill matching, enrichment and persistence
+        job = job_service.create_job(g.user_id, file_name, stored_name, content_hash)
+        resume_logger.info(f"Queued upload job {job.id} for file: {file_name} ({stored_name})")
 
+        return jsonify({
+            'message': 'Resume upload accepted for processing',
+            'job_id': job.id,
+            'status': job.status
+        }), 202
+
+    except APIError as api_error:
+        resume_logger.error(f"Upload rejected: {api_error.message}")
+        return jsonify({'error': api_error.message}), api_error.status_code
     except Exception as e:
         resume_logger.error(f"Error in resume upload: {str(e)}", exc_info=True)
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@resume_bp.route('/jobs/<job_id>', methods=['GET'])
+@verify_firebase_token
+@log_function_call(resume_logger)
+def get_upload_job(job_id):
+    """Get the processing status of an upload job"""
+    try:
+        job = job_service.get_job(job_id, g.user_id)
+        if not job:
+            resume_logger.error(f"Upload job not found: {job_id} for user: {g.user_id}")
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify(job.to_dict()), 200
+
+    except Exception as e:
+        resume_logger.error(f"Error in get_upload_job: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @resume_bp.route('/list', methods=['GET'])
 @verify_firebase_token
 @log_function_call(resume_logger)
 def get_resumes():
-    """Get list of all resumes for the current user"""
+    """Get resumes for the current user, newest first, one keyset page at a time.
+
+    Query parameters: ``limit`` (capped by MAX_PAGE_SIZE), ``cursor`` (the
+    ``next_cursor`` of the previous page) and ``stream=true`` to receive every
+    resume as NDJSON from a server-side cursor instead.
+    """
     try:
         resume_logger.debug(f"Getting resumes for user: {g.user_id}")
         resume_logger.debug(f"Headers: {request.headers}")
+
+        def format_row(row):
+            return {
+                'id': row[0],
+                'filename': row[1],
+                'file_type': row[2],
+                'created_at': row[3].isoformat()
+            }
+
+        if is_truthy(request.args.get('stream')):
+            statement = text("""
+                SELECT id, file_name, file_type, created_at
+                FROM resumes
+                WHERE user_id = :user_id
+                ORDER BY created_at DESC, id DESC
+                """).execution_options(yield_per=current_app.config.get('STREAM_BATCH_SIZE', 500))
+            return _ndjson_response(
+                format_row(row) for row in db.session.execute(statement, {"user_id": g.user_id})
+            )
+
+        limit = get_page_size(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
         
-        # Test database connection with raw SQL
         try:
+            params = {"user_id": g.user_id, "limit": limit + 1}
+            keyset = ""
+            if cursor:
+                keyset = "AND (created_at, id) < (:cursor_created_at, :cursor_id)"
+                params.update({"cursor_created_at": cursor[0], "cursor_id": cursor[1]})
+
             result = db.session.execute(
-                text("""
+                text(f"""
                 SELECT id, file_name, file_type, created_at 
                 FROM resumes 
-                WHERE user_id = :user_id
+                WHERE user_id = :user_id {keyset}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit
                 """),
-                {"user_id": g.user_id}
+                params
             )
+            rows = result.all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
             
-            resumes = [{
-                'id': row[0],
-                'filename': row[1],
-                'file_type': row[2],
-                'created_at': row[3].isoformat()
-            } for row in result]
+            resumes = [format_row(row) for row in rows]
+            next_cursor = encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None
             
             resume_logger.debug(f"Found resumes: {resumes}")
             
             return jsonify({
                 'status': 'success',
-                'resumes': resumes
+                'resumes': resumes,
+                'next_cursor': next_cursor,
+                'has_more': has_more
             })
             
         except Exception as db_error:
@@ -216,6 +168,11 @@ def get_resumes():
                 'message': f'Database error: {str(db_error)}'
             }), 500
             
+    except APIError as api_error:
+        return jsonify({
+            'status': 'error',
+            'message': api_error.message
+        }), api_error.status_code
     except Exception as e:
         resume_logger.error(f"Error in get_resumes: {str(e)}", exc_info=True)
         return jsonify({
@@ -322,15 +279,27 @@ def delete_resume(resume_id):
             resume_logger.error(f"Resume not found for deletion: {resume_id}")
             return jsonify({'error': 'Resume not found'}), 404
         
-        # Delete the file if it exists
-        if os.path.exists(resume.file_path):
-            os.remove(resume.file_path)
-            resume_logger.info(f"Deleted file: {resume.file_path}")
+        # Drop the resume's reference to its stored file; the store deletes the file with the last one
+        stored_name = file_service.store.stored_name_of(resume.file_path)
+        released = bool(stored_name) and file_service.store.release(stored_name)
+        legacy_path = None
+        if not released:
+            # Saved before the content store: delete the file unless another resume still uses it
+            shared = Resume.query.filter(Resume.file_path == resume.file_path, Resume.id != resume.id).first()
+            if not shared:
+                legacy_path = resume.file_path
         
         db.session.delete(resume)
         db.session.commit()
         resume_logger.info(f"Successfully deleted resume: {resume_id}")
         
+        # Files go only once the delete is committed, so a failed delete keeps them
+        if released:
+            file_service.store.purge(stored_name)
+        elif legacy_path and os.path.exists(legacy_path):
+            os.remove(legacy_path)
+            resume_logger.info(f"Deleted file: {legacy_path}")
+        
         return jsonify({'message': 'Resume deleted successfully'}), 200
         
     except Exception as e:
@@ -341,7 +310,13 @@ def delete_resume(resume_id):
 @verify_firebase_token
 @log_function_call(resume_logger)
 def filter_resumes():
-    """Filter resumes based on various criteria"""
+    """Filter resumes based on various criteria.
+
+    Results are keyset-paginated on (created_at, id): pass ``limit`` and the
+    previous page's ``next_cursor`` as ``cursor`` in the body. ``total`` is only
+    computed for the first page. With ``?stream=true`` every match is streamed
+    as NDJSON instead.
+    """
     try:
         data = request.get_json()
         resume_logger.info(f"Received filter criteria: {data}")
@@ -349,83 +324,128 @@ def filter_resumes():
         if not data:
             return jsonify({'error': 'No filter criteria provided'}), 400
 
-        # Start with base query
-        query = Resume.query.filter_by(user_id=g.user_id)
-        resume_logger.info(f"Initial query for user_id: {g.user_id}")
-
-        # Filter by years of experience
-        min_experience = data.get('min_experience')
-        max_experience = data.get('max_experience')
-        
-        # Apply filters if provided
-        if min_experience is not None:
-            resume_logger.info(f"Filtering by min experience: {min_experience}")
-            query = query.filter(Resume.years_of_experience >= min_experience)
-            
-        if max_experience is not None:
-            resume_logger.info(f"Filtering by max experience: {max_experience}")
-            query = query.filter(Resume.years_of_experience <= max_experience)
-
-        # Filter by education level
-        education_levels = data.get('education_levels', [])
-        if education_levels:
-            resume_logger.info(f"Filtering by education levels: {education_levels}")
-            query = query.filter(Resume.education_level.in_(education_levels))
-
-        # Filter by skills
-        skills = data.get('skills', [])
-        if skills:
-            resume_logger.info(f"Filtering by skills: {skills}")
-            # Make skill search case-insensitive
-            query = query.join(ResumeSkill).join(Skill).filter(
-                db.func.lower(Skill.name).in_([s.lower() for s in skills])
+        if is_truthy(request.args.get('stream')):
+            # Server-side cursor; relationships are batch-loaded per chunk
+            query = _build_filter_query(data, select(Resume))\
+                .execution_options(yield_per=current_app.config.get('STREAM_BATCH_SIZE', 500))
+            return _ndjson_response(
+                _format_filtered_resume(resume) for resume in db.session.scalars(query)
             )
 
-        # Execute query and get count before fetching results
-        total_count = query.count()
-        resume_logger.info(f"Total matching resumes before fetching: {total_count}")
-        
-        # Execute query and format results
-        resumes = query.all()
-        resume_logger.info(f"Found {len(resumes)} matching resumes")
-        results = []
-        
-        for resume in resumes:
-            # Get all skills for this resume
-            resume_skills = {}
-            for skill in resume.skills:
-                if skill.category not in resume_skills:
-                    resume_skills[skill.category] = []
-                resume_skills[skill.category].append(skill.name)
-
-            # Get education details
-            education = [{
-                'degree': edu.degree,
-                'field': edu.field,
-                'institution': edu.institution,
-                'graduation_year': edu.graduation_year,
-                'gpa': edu.gpa
-            } for edu in resume.education]
-
-            # Format result
-            result = {
-                'id': resume.id,
-                'filename': resume.file_name,
-                'created_at': resume.created_at.isoformat(),
-                'years_of_experience': resume.years_of_experience or 0.0,
-                'education_level': resume.education_level or "Not Specified",
-                'skills': resume_skills,
-                'education': education
-            }
-            results.append(result)
-            resume_logger.info(f"Added resume to results: {resume.id} - {resume.file_name}")
+        limit = get_page_size(data.get('limit'))
+        cursor = decode_cursor(data.get('cursor'))
+
+        # Only the columns the response uses; on the first page a window count
+        # returns the total with the rows in one round trip
+        if cursor:
+            query = _build_filter_query(data, select(Resume))\
+                .where(tuple_(Resume.created_at, Resume.id) < tuple_(*cursor))
+        else:
+            query = _build_filter_query(data, select(Resume, func.count().over().label('total')))
+
+        # Single execution; relationships are batch-loaded with one IN query each
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        total_count = None if cursor else (rows[0].total if rows else 0)
+        resume_logger.info(f"Found {len(rows)} matching resumes (total: {total_count})")
+
+        results = [_format_filtered_resume(row[0]) for row in rows]
+        next_cursor = encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None
 
         resume_logger.info(f"Returning {len(results)} formatted results")
         return jsonify({
-            'total': len(results),
-            'resumes': results
+            'total': total_count,
+            'resumes': results,
+            'next_cursor': next_cursor,
+            'has_more': has_more
         })
 
+    except APIError as api_error:
+        return jsonify({'error': api_error.message}), api_error.status_code
     except Exception as e:
         resume_logger.error(f"Error in filter_resumes: {str(e)}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def _build_filter_query(data, query):
+    """Apply the filter criteria, column projection and keyset ordering to a select(Resume, ...)"""
+    query = query.where(Resume.user_id == g.user_id)\
+        .options(
+            load_only(Resume.id, Resume.file_name, Resume.created_at,
+                      Resume.years_of_experience, Resume.education_level),
+            selectinload(Resume.skills).load_only(Skill.name, Skill.category),
+            selectinload(Resume.education)
+        )
+    resume_logger.info(f"Initial query for user_id: {g.user_id}")
+
+    # Filter by years of experience
+    min_experience = data.get('min_experience')
+    max_experience = data.get('max_experience')
+    
+    # Apply filters if provided
+    if min_experience is not None:
+        resume_logger.info(f"Filtering by min experience: {min_experience}")
+        query = query.where(Resume.years_of_experience >= min_experience)
+        
+    if max_experience is not None:
+        resume_logger.info(f"Filtering by max experience: {max_experience}")
+        query = query.where(Resume.years_of_experience <= max_experience)
+
+    # Filter by education level
+    education_levels = data.get('education_levels', [])
+    if education_levels:
+        resume_logger.info(f"Filtering by education levels: {education_levels}")
+        query = query.where(Resume.education_level.in_(education_levels))
+
+    # Filter by skills
+    skills = data.get('skills', [])
+    if skills:
+        resume_logger.info(f"Filtering by skills: {skills}")
+        # Semi-join so a resume matching several skills is returned once
+        # (case-insensitive skill search)
+        query = query.where(
+            select(ResumeSkill.resume_id)
+            .join(Skill, Skill.id == ResumeSkill.skill_id)
+            .where(
+                ResumeSkill.resume_id == Resume.id,
+                db.func.lower(Skill.name).in_([s.lower() for s in skills])
+            )
+            .exists()
+        )
+
+    return query.order_by(Resume.created_at.desc(), Resume.id.desc())
+
+def _format_filtered_resume(resume):
+    """Format a filtered resume with its skills grouped by category"""
+    # Get all skills for this resume
+    resume_skills = {}
+    for skill in resume.skills:
+        if skill.category not in resume_skills:
+            resume_skills[skill.category] = []
+        resume_skills[skill.category].append(skill.name)
+
+    # Get education details
+    education = [{
+        'degree': edu.degree,
+        'field': edu.field,
+        'institution': edu.institution,
+        'graduation_year': edu.graduation_year,
+        'gpa': edu.gpa
+    } for edu in resume.education]
+
+    return {
+        'id': resume.id,
+        'filename': resume.file_name,
+        'created_at': resume.created_at.isoformat(),
+        'years_of_experience': resume.years_of_experience or 0.0,
+        'education_level': resume.education_level or "Not Specified",
+        'skills': resume_skills,
+        'education': education
+    }
+
+def _ndjson_response(records):
+    """Stream an iterable of dicts as newline-delimited JSON"""
+    def generate():
+        for record in records:
+            yield json.dumps(record) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,153 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Select
+from app import db
+from app.models.resume import ResumeAnalysisResult
+from app.domain.resume.resume_entity import STATUS_PROCESSING, STATUS_COMPLETED, STATUS_ERROR
+from app.utils.logger import resume_logger, log_function_call
+
+class AnalysisService:
+    """Stores generated resume analyses and regenerates them only when their inputs change.
+
+    An analysis is fresh while its fingerprint (extracted text hash, model and
+    prompt version) matches the resume. A single generation runs at a time per
+    resume; concurrent viewers see it as in progress together with the previous
+    (stale) analysis, if any.
+    """
+
+    def _get_chatbot(self):
+        from app.services.chatbot_service import ChatbotService
+        return ChatbotService()
+
+    def fingerprint(self, resume, model: Optional[str] = None) -> Tuple[str, str, str]:
+        from app.services.chatbot_service import ANALYSIS_PROMPT_VERSION, get_openai_service
+        text_hash = hashlib.sha256((resume.extracted_text or '').encode('utf-8')).hexdigest()
+        return text_hash, model or get_openai_service().model, ANALYSIS_PROMPT_VERSION
+
+    def _matches(self, record: ResumeAnalysisResult, fingerprint: Tuple[str, str, str]) -> bool:
+        return (record.text_hash, record.model, record.prompt_version) == fingerprint
+
+    def is_fresh(self, record: Optional[ResumeAnalysisResult], fingerprint) -> bool:
+        return bool(record) and record.status == STATUS_COMPLETED and self._matches(record, fingerprint)
+
+    def is_in_progress(self, record: Optional[ResumeAnalysisResult], fingerprint, timeout_seconds: Optional[int] = None) -> bool:
+        if not record or record.status != STATUS_PROCESSING or not self._matches(record, fingerprint):
+            return False
+        if timeout_seconds is None:
+            timeout_seconds = current_app.config.get('ANALYSIS_GENERATION_TIMEOUT', 180)
+        timeout = timedelta(seconds=timeout_seconds)
+        return bool(record.started_at) and datetime.utcnow() - record.started_at < timeout
+
+    def to_dict(self, record: Optional[ResumeAnalysisResult], fingerprint) -> dict:
+        if not record:
+            return {'status': None, 'analysis': None, 'stale': False, 'generated_at': None, 'error': None}
+        return {
+            'status': record.status,
+            'analysis': record.analysis,
+            'stale': bool(record.analysis) and not self.is_fresh(record, fingerprint),
+            'generated_at': record.generated_at.isoformat() if record.generated_at else None,
+            'error': record.error
+        }
+
+    def should_generate(self, record: Optional[ResumeAnalysisResult], fingerprint, timeout_seconds: Optional[int] = None) -> bool:
+        return not self.is_fresh(record, fingerprint) and not self.is_in_progress(record, fingerprint, timeout_seconds)
+
+    def claim_query(self, resume_id: int) -> Select:
+        """The resume's analysis row, locked until the claim commits"""
+        return select(ResumeAnalysisResult).where(ResumeAnalysisResult.resume_id == resume_id).with_for_update()
+
+    def mark_processing(self, record: Optional[ResumeAnalysisResult], resume_id: int, fingerprint) -> ResumeAnalysisResult:
+        """Claim the analysis for this fingerprint; returns the record, which is new if record was None"""
+        if record is None:
+            record = ResumeAnalysisResult(resume_id=resume_id)
+        record.text_hash, record.model, record.prompt_version = fingerprint
+        record.status = STATUS_PROCESSING
+        record.started_at = datetime.utcnow()
+        record.error = None
+        return record
+
+    def shared_query(self, resume_id: int, fingerprint) -> Select:
+        """A completed analysis of identical text from another resume"""
+        text_hash, model, prompt_version = fingerprint
+        return select(ResumeAnalysisResult.analysis).where(
+            ResumeAnalysisResult.text_hash == text_hash,
+            ResumeAnalysisResult.model == model,
+            ResumeAnalysisResult.prompt_version == prompt_version,
+            ResumeAnalysisResult.status == STATUS_COMPLETED,
+            ResumeAnalysisResult.resume_id != resume_id
+        ).limit(1)
+
+    def mark_completed(self, record: ResumeAnalysisResult, analysis: str):
+        record.analysis = analysis
+        record.status = STATUS_COMPLETED
+        record.generated_at = datetime.utcnow()
+
+    def mark_failed(self, record: ResumeAnalysisResult, error: Exception):
+        record.status = STATUS_ERROR
+        record.error = getattr(error, 'message', None) or str(error)
+
+    def _claim(self, resume, fingerprint) -> Tuple[Optional[ResumeAnalysisResult], bool]:
+        """Mark the resume's analysis as processing for this fingerprint; returns (record, claimed)"""
+        record = db.session.execute(self.claim_query(resume.id)).scalar_one_or_none()
+        if record is None:
+            record = self.mark_processing(None, resume.id, fingerprint)
+            db.session.add(record)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request created it first
+                db.session.rollback()
+                return db.session.get(ResumeAnalysisResult, resume.id), False
+            return record, True
+
+        if not self.should_generate(record, fingerprint):
+            db.session.commit()
+            return record, False
+
+        self.mark_processing(record, resume.id, fingerprint)
+        db.session.commit()
+        return record, True
+
+    @log_function_call(resume_logger)
+    def generate(self, resume) -> ResumeAnalysisResult:
+        """Generate and store the analysis unless it is already fresh or being generated"""
+        fingerprint = self.fingerprint(resume)
+        record, claimed = self._claim(resume, fingerprint)
+        if not claimed:
+            resume_logger.info(f"Analysis for resume {resume.id} is {record.status}; not regenerating")
+            return record
+
+        try:
+            analysis = db.session.execute(self.shared_query(resume.id, fingerprint)).scalar_one_or_none()
+            if analysis:
+                resume_logger.info(f"Reusing stored analysis of identical text for resume {resume.id}")
+            else:
+                analysis = self._get_chatbot().get_resume_analysis(resume)
+
+            self.mark_completed(record, analysis)
+            db.session.commit()
+            resume_logger.info(f"Stored analysis for resume {resume.id}")
+            return record
+
+        except Exception as e:
+            db.session.rollback()
+            record = db.session.get(ResumeAnalysisResult, resume.id)
+            if record:
+                self.mark_failed(record, e)
+                db.session.commit()
+            raise
+
+    @log_function_call(resume_logger)
+    def get_analysis(self, resume, generate: bool = True) -> dict:
+        """Serve the stored analysis, generating it synchronously only when needed and allowed"""
+        fingerprint = self.fingerprint(resume)
+        record = db.session.get(ResumeAnalysisResult, resume.id)
+
+        if generate and self.should_generate(record, fingerprint):
+            record = self.generate(resume)
+
+        return self.to_dict(record, fingerprint)
@@ -0,0 +1,124 @@
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+import redis
+from app.config.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    question = re.sub(r'\s+', ' ', question.strip().lower())
+    return question.rstrip(' ?!.')
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class AnswerCache:
+    """Two-tier (in-process LRU + Redis) cache for LLM answers.
+
+    Keys combine the resume text hash, the normalized question, the model and
+    the prompt-template version, so any of those changing misses the cache.
+    Redis errors fail open: the cache then behaves as local-only.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, namespace: str = 'chat_answer',
+                 ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        self.namespace = namespace
+        self.ttl = ttl or Config.CHAT_CACHE_TTL
+        self.enabled = Config.CHAT_CACHE_ENABLED if enabled is None else enabled
+        self.local = LRUCache(max_entries or Config.CHAT_CACHE_MAX_ENTRIES, self.ttl)
+        self._redis_url = redis_url or Config.REDIS_URL
+        self._redis = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'sets': 0, 'errors': 0}
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            # Short timeouts: a slow Redis must not cost more than the LLM call it saves
+            self._redis = redis.from_url(self._redis_url, socket_timeout=1, socket_connect_timeout=1)
+        return self._redis
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def make_key(self, resume_text: str, question: str, model: str, prompt_version: str) -> str:
+        text_hash = hashlib.sha256(resume_text.encode('utf-8')).hexdigest()
+        material = '\x1f'.join([text_hash, normalize_question(question), model, prompt_version])
+        return f"{self.namespace}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up the local tier, then Redis (promoting Redis hits to the local tier)"""
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            logger.error(f"Answer cache Redis error: {str(e)}")
+            self._count('errors')
+            raw = None
+        if raw is not None:
+            value = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            self.local.set(key, value)
+            self._count('redis_hits')
+            return value
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: str):
+        self.local.set(key, value)
+        self._count('sets')
+        try:
+            self.redis.set(key, value, ex=self.ttl)
+        except Exception as e:
+            logger.error(f"Answer cache Redis error: {str(e)}")
+            self._count('errors')
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['redis_hits']) / lookups, 4) if lookups else 0.0
+        stats['local_entries'] = len(self.local)
+        stats['enabled'] = self.enabled
+        return stats
+
+# Create global answer cache instance
+answer_cache = AnswerCache()
@@ -0,0 +1,32 @@
+from typing import Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models.resume import ResumeArtifact
+from app.utils.logger import resume_logger
+
+class ArtifactService:
+    """Content-addressed store of derived resume data, keyed by the SHA-256 of the upload"""
+
+    def get(self, content_hash: Optional[str]) -> Optional[ResumeArtifact]:
+        """Get cached artifacts for a content hash"""
+        if not content_hash:
+            return None
+        artifact = db.session.get(ResumeArtifact, content_hash)
+        if artifact:
+            resume_logger.info(f"Artifact cache hit for content hash: {content_hash}")
+        return artifact
+
+    def save(self, content_hash: Optional[str], extracted_text: str, skills: Dict[str, List[str]],
+             education_level: str, years_of_experience: float):
+        """Store artifacts for a content hash; the first writer wins on concurrent uploads"""
+        if not content_hash:
+            return
+        stmt = insert(ResumeArtifact).values(
+            content_hash=content_hash,
+            extracted_text=extracted_text,
+            skills=skills,
+            education_level=education_level,
+            years_of_experience=years_of_experience
+        ).on_conflict_do_nothing(index_elements=['content_hash'])
+        db.session.execute(stmt)
+        resume_logger.info(f"Stored artifacts for content hash: {content_hash}")
@@ -1,15 +1,156 @@
 import os
+import re
+import time
 import logging
+import threading
+from typing import Optional
+import httpx
+import openai
 from openai import OpenAI
 from app.models.resume import ChatHistory
 from app import db
 from app.utils.errors import APIError
 from app.utils.logger import resume_logger, log_function_call
+from app.services.answer_cache import answer_cache, normalize_question
+from app.services.single_flight import single_flight
+from app.services.llm_resilience import llm_resilience
+from app.services.llm_governor import llm_governor, estimate_request_tokens
+from app.services.retrieval_service import RetrievalService
+from app.services.memory_service import MemoryService
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the system message or prompt templates change so cached answers are not reused
+PROMPT_VERSION = '2'
+# Versioned separately so chat prompt changes do not invalidate stored analyses
+ANALYSIS_PROMPT_VERSION = '1'
+
+END_MARKER = "END_RESPONSE"
+
+SYSTEM_MESSAGE = """You are an AI assistant specialized in analyzing resumes and providing insights. 
+            You can answer questions about the resume content, suggest improvements, and provide career advice based on the resume information.
+            Keep your responses professional, constructive, and focused on the resume content.
+            Due to token limits, you must:
+            • Prioritize the most important points first
+            • Be concise and direct in your suggestions
+            • Focus on 2-3 key improvements when asked about CV enhancements
+            • Use bullet points (•) without any numbering or headers
+            • Start each point directly with the suggestion
+            • Avoid lengthy explanations
+            End your response with END_RESPONSE when you've completed answering the current question."""
+
+IMPROVEMENT_KEYWORDS = ['improve', 'enhancement', 'suggestion', 'better']
+
+# Words and openings that tie a question to the conversation so far
+FOLLOW_UP_WORDS = {'it', 'that', 'those', 'these', 'above', 'previous', 'earlier', 'again', 'more', 'else',
+                   'elaborate', 'expand', 'further', 'instead', 'same', 'said', 'mentioned'}
+FOLLOW_UP_OPENINGS = ('and ', 'but ', 'so ', 'also ', 'then ', 'what about ', 'how about ')
+
+def build_question_messages(question, context, is_excerpt=False, history=None, system_message=SYSTEM_MESSAGE):
+    """Messages for a chat question given the resume context and conversation memory"""
+    # Determine if this is a CV improvement question
+    is_improvement_question = any(keyword in question.lower() for keyword in IMPROVEMENT_KEYWORDS)
+    
+    instruction = """
+    Provide a focused and complete response to this specific question only.
+    Keep your response within the token limit by being concise and direct.
+    """
+    
+    if is_improvement_question:
+        instruction += """
+        For CV improvements:
+        • List 2-3 most important suggestions using bullet points (•)
+        • Start each point directly with the action or improvement
+        • Do not use numbers or headers
+        • Be specific but brief
+        Example format:
+        • Add quantifiable achievements to work experience
+        • Include a technical skills section
+        """
+    
+    intro = "Here are the parts of the resume most relevant to the question" if is_excerpt else "Here is the resume content"
+    return [
+        {"role": "system", "content": system_message},
+        *(history or []),
+        {"role": "user", "content": f"{intro}:\n{context}\n\nQuestion: {question}\n\n{instruction}\n\nEnd your response with END_RESPONSE."}
+    ]
+
+def clean_answer(answer):
+    """Answer text without the END_RESPONSE marker"""
+    return answer.replace(END_MARKER, "").strip()
+
+def is_follow_up(question):
+    """Whether the question only makes sense with the earlier conversation"""
+    text = normalize_question(question)
+    words = re.findall(r"[a-z']+", text)
+    return len(words) < 3 or bool(FOLLOW_UP_WORDS.intersection(words)) or text.startswith(FOLLOW_UP_OPENINGS)
+
+def question_cache_key(resume, question, model):
+    """Answer cache key for a stand-alone question, or None when its answer must not be cached.
+
+    Stand-alone questions are answered without conversation memory, so their
+    answers depend only on the resume and can be shared; follow-ups are not cached.
+    """
+    if not answer_cache.enabled or is_follow_up(question):
+        return None
+    return answer_cache.make_key(resume.extracted_text, question, model, PROMPT_VERSION)
+
+def build_analysis_messages(resume_text, system_message=SYSTEM_MESSAGE):
+    """Messages for the full resume analysis"""
+    prompt = f"""Please analyze this resume and provide a comprehensive evaluation covering:
+            1. Overall impression
+            2. Key strengths
+            3. Areas for improvement
+            4. Suggested enhancements
+            
+            Resume content:
+            {resume_text}"""
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt}
+    ]
+
+class EndMarkerFilter:
+    """Strips the END_RESPONSE marker from a streamed answer as it arrives.
+
+    Trailing text that could be the start of the marker is held back until the
+    next delta shows whether it is; everything from the marker on is dropped.
+    """
+    def __init__(self, marker: str = END_MARKER):
+        self.marker = marker
+        self.done = False
+        self._pending = ''
+
+    def feed(self, delta: str) -> str:
+        """Return the part of the stream so far that is safe to forward"""
+        if self.done:
+            return ''
+        text = self._pending + delta
+        index = text.find(self.marker)
+        if index != -1:
+            self.done = True
+            self._pending = ''
+            return text[:index]
+
+        hold = 0
+        for size in range(min(len(self.marker) - 1, len(text)), 0, -1):
+            if self.marker.startswith(text[-size:]):
+                hold = size
+                break
+        self._pending = text[len(text) - hold:]
+        return text[:len(text) - hold]
+
+    def flush(self) -> str:
+        """Release any held-back text once the stream has ended"""
+        text, self._pending = self._pending, ''
+        return '' if self.done else text
+
 class OpenAIService:
-    """Handles OpenAI API interactions"""
+    """Handles OpenAI API interactions.
+
+    One instance is shared per process (see get_openai_service) so requests
+    reuse a pooled keep-alive HTTP client instead of building a new one.
+    """
     def __init__(self):
         try:
             api_key = os.getenv('OPENAI_API_KEY')
@@ -17,24 +158,41 @@ class OpenAIService:
                 resume_logger.error('OpenAI API key not configured')
                 raise APIError('OpenAI API key not configured', status_code=500)
                 
-            resume_logger.info('Initializing OpenAI client...')
-            self.client = OpenAI(api_key=api_key)
-            
             # Get configuration from environment
             self.model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
             self.max_tokens = int(os.getenv('MAX_TOKENS', '150'))
             self.temperature = 0.7
+            self.health_ttl = float(os.getenv('OPENAI_HEALTH_TTL', '300'))
+            self.health_min_refresh = float(os.getenv('OPENAI_HEALTH_MIN_REFRESH', '30'))
+            pool_size = int(os.getenv('OPENAI_POOL_SIZE', '20'))
             
-            # Test the API key with a simple request
-            test_response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": "Test"}],
-                max_tokens=10
+            resume_logger.info(f'Initializing OpenAI client with a pool of {pool_size} connections...')
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+                ),
+                timeout=httpx.Timeout(
+                    float(os.getenv('OPENAI_TIMEOUT', '60')),
+                    connect=float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+                )
             )
-            if not test_response.choices or not test_response.choices[0].message:
-                raise APIError('Failed to validate OpenAI API key', status_code=500)
-                
-            resume_logger.info('OpenAI client initialized and validated successfully')
+            self.client = OpenAI(
+                api_key=api_key,
+                http_client=self.http_client,
+                # Retries are handled by llm_resilience within the call deadline
+                max_retries=0
+            )
+            
+            # Key validation is lazy and cached, see check_health
+            self._health_lock = threading.Lock()
+            self._healthy = None
+            self._health_error = None
+            self._health_checked_at = 0.0
+            self._health_checking = False
+            
+            resume_logger.info('OpenAI client initialized successfully')
             
         except Exception as e:
             resume_logger.error(f'Error initializing OpenAI service: {str(e)}', exc_info=True)
@@ -42,21 +200,75 @@ class OpenAIService:
                 raise
             raise APIError(f'Error initializing OpenAI service: {str(e)}', status_code=500)
 
+    def check_health(self, force: bool = False) -> dict:
+        """Validate the API key, caching the result for OPENAI_HEALTH_TTL seconds.
+
+        A forced check still reuses a result younger than OPENAI_HEALTH_MIN_REFRESH
+        seconds. One check runs at a time, outside the lock; meanwhile other
+        callers get the cached state.
+        """
+        with self._health_lock:
+            age = time.monotonic() - self._health_checked_at
+            due = self._healthy is None or age >= (self.health_min_refresh if force else self.health_ttl)
+            run = due and not self._health_checking
+            self._health_checking = self._health_checking or run
+        if run:
+            try:
+                # Model lookup validates the key without spending completion tokens
+                self.client.models.retrieve(self.model)
+                self._record_health(True)
+                resume_logger.info('OpenAI API key validated successfully')
+            except Exception as e:
+                self._record_health(False, str(e))
+                resume_logger.error(f'OpenAI API key validation failed: {str(e)}')
+            finally:
+                with self._health_lock:
+                    self._health_checking = False
+        with self._health_lock:
+            return {
+                'healthy': self._healthy,
+                'error': self._health_error,
+                'model': self.model
+            }
+
+    def _record_health(self, healthy: bool, error: Optional[str] = None):
+        """Update the cached health state from a real API call"""
+        with self._health_lock:
+            self._healthy, self._health_error = healthy, error
+            self._health_checked_at = time.monotonic()
+
     @log_function_call(resume_logger)
     def create_chat_completion(self, messages, max_tokens=None, temperature=None):
+        """Create a chat completion; identical concurrent requests share one upstream call"""
+        max_tokens = max_tokens or self.max_tokens
+        temperature = self.temperature if temperature is None else temperature
+        key = single_flight.make_key(
+            model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
+        return single_flight.do(key, lambda: self._create_chat_completion(messages, max_tokens, temperature))
+
+    def _create_chat_completion(self, messages, max_tokens, temperature):
         """Create a chat completion with error handling"""
         try:
             resume_logger.info(f'Sending request to OpenAI API with {len(messages)} messages')
             resume_logger.debug(f'Messages content: {messages}')
-            resume_logger.debug(f'Using model: {self.model}, max_tokens: {max_tokens or self.max_tokens}')
+            resume_logger.debug(f'Using model: {self.model}, max_tokens: {max_tokens}')
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens or self.max_tokens,
-                temperature=temperature or self.temperature,
-                stop=["END_RESPONSE"]  # Add a stop sequence to ensure complete responses
-            )
+            cost = estimate_request_tokens(messages, max_tokens)
+            
+            def attempt(timeout):
+                # Every attempt, retries and hedges included, holds a cluster-wide slot
+                with llm_governor.slot(cost, max_wait=timeout):
+                    return self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stop=[END_MARKER],  # Add a stop sequence to ensure complete responses
+                        timeout=timeout
+                    )
+            
+            response = llm_resilience.call(attempt, kind=f'chat:{max_tokens}')
             
             if not response.choices:
                 resume_logger.error('No choices in OpenAI response')
@@ -72,30 +284,92 @@ class OpenAIService:
                 raise APIError('Empty response from OpenAI', status_code=500)
                 
             resume_logger.info(f'Successfully received response from OpenAI: {len(answer)} characters')
+            self._record_health(True)
             return answer.strip()
             
         except Exception as e:
             resume_logger.error(f"OpenAI API error: {str(e)}", exc_info=True)
             if isinstance(e, APIError):
                 raise
+            if isinstance(e, openai.AuthenticationError):
+                self._record_health(False, str(e))
+            raise APIError(f'Error communicating with OpenAI API: {str(e)}', status_code=503)
+
+    def stream_chat_completion(self, messages, max_tokens=None, temperature=None):
+        """Create a streamed chat completion, yielding content deltas as they arrive"""
+        try:
+            resume_logger.info(f'Streaming request to OpenAI API with {len(messages)} messages')
+            max_tokens = max_tokens or self.max_tokens
+            received = 0
+            # The slot is held until the stream ends
+            with llm_governor.slot(estimate_request_tokens(messages, max_tokens)):
+                # Only opening the stream is retried; tokens already sent cannot be taken back
+                stream = llm_resilience.call(
+                    lambda timeout: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=self.temperature if temperature is None else temperature,
+                        stop=[END_MARKER],
+                        stream=True,
+                        timeout=timeout
+                    ),
+                    kind='stream',
+                    hedge=False
+                )
+                try:
+                    for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            received += len(delta)
+                            yield delta
+                finally:
+                    # Also runs when the client disconnects and the generator is closed early
+                    stream.close()
+            
+            if not received:
+                resume_logger.error('Empty content in OpenAI stream')
+                raise APIError('Empty response from OpenAI', status_code=500)
+            
+            resume_logger.info(f'Successfully streamed response from OpenAI: {received} characters')
+            self._record_health(True)
+            
+        except Exception as e:
+            resume_logger.error(f"OpenAI API streaming error: {str(e)}", exc_info=True)
+            if isinstance(e, APIError):
+                raise
+            if isinstance(e, openai.AuthenticationError):
+                self._record_health(False, str(e))
             raise APIError(f'Error communicating with OpenAI API: {str(e)}', status_code=503)
 
+_openai_service = None
+_openai_service_pid = None
+_openai_service_lock = threading.Lock()
+
+def get_openai_service() -> OpenAIService:
+    """Get the process-wide OpenAIService, creating it on first use.
+
+    The client is rebuilt after a fork so gunicorn workers never share
+    connections inherited from the master process.
+    """
+    global _openai_service, _openai_service_pid
+    if _openai_service is None or _openai_service_pid != os.getpid():
+        with _openai_service_lock:
+            if _openai_service is None or _openai_service_pid != os.getpid():
+                _openai_service = OpenAIService()
+                _openai_service_pid = os.getpid()
+    return _openai_service
+
 class ChatbotService:
     """Handles resume analysis and chat functionality"""
     def __init__(self):
         try:
-            self.openai_service = OpenAIService()
-            self.system_message = """You are an AI assistant specialized in analyzing resumes and providing insights. 
-            You can answer questions about the resume content, suggest improvements, and provide career advice based on the resume information.
-            Keep your responses professional, constructive, and focused on the resume content.
-            Due to token limits, you must:
-            • Prioritize the most important points first
-            • Be concise and direct in your suggestions
-            • Focus on 2-3 key improvements when asked about CV enhancements
-            • Use bullet points (•) without any numbering or headers
-            • Start each point directly with the suggestion
-            • Avoid lengthy explanations
-            End your response with END_RESPONSE when you've completed answering the current question."""
+            self.openai_service = get_openai_service()
+            self.retrieval_service = RetrievalService()
+            self.memory_service = MemoryService()
+            self.system_message = SYSTEM_MESSAGE
             resume_logger.info('ChatbotService initialized successfully')
         except Exception as e:
             resume_logger.error(f'Error initializing ChatbotService: {str(e)}', exc_info=True)
@@ -114,34 +388,27 @@ class ChatbotService:
             resume_logger.error(f'Error retrieving chat history: {str(e)}', exc_info=True)
             raise APIError('Error retrieving chat history', status_code=500)
 
+    def get_memory_messages(self, resume):
+        """Conversation memory (rolling summary plus recent turns) to send with the next question"""
+        window = self.get_chat_context(resume, limit=self.memory_service.turns)
+        return self.memory_service.build_messages(resume, window)
+
+    def update_memory(self, resume):
+        """Fold turns that left the memory window into the summary; failures only delay it"""
+        try:
+            window = self.get_chat_context(resume, limit=self.memory_service.turns)
+            self.memory_service.update(resume, window)
+        except Exception as e:
+            db.session.rollback()
+            resume_logger.warning(f'Could not update chat memory for resume {resume.id}: {str(e)}')
+
     @log_function_call(resume_logger)
-    def prepare_messages(self, resume, question):
+    def prepare_messages(self, resume, question, history=None):
         """Prepare messages for OpenAI API"""
         try:
-            # Determine if this is a CV improvement question
-            is_improvement_question = any(keyword in question.lower() for keyword in ['improve', 'enhancement', 'suggestion', 'better'])
-            
-            instruction = """
-            Provide a focused and complete response to this specific question only.
-            Keep your response within the token limit by being concise and direct.
-            """
-            
-            if is_improvement_question:
-                instruction += """
-                For CV improvements:
-                • List 2-3 most important suggestions using bullet points (•)
-                • Start each point directly with the action or improvement
-                • Do not use numbers or headers
-                • Be specific but brief
-                Example format:
-                • Add quantifiable achievements to work experience
-                • Include a technical skills section
-                """
-            
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": f"Here is the resume content:\n{resume.extracted_text}\n\nQuestion: {question}\n\n{instruction}\n\nEnd your response with END_RESPONSE."}
-            ]
+            # Long resumes are reduced to the sections relevant to the question
+            context, is_excerpt = self.retrieval_service.build_context(resume, question)
+            messages = build_question_messages(question, context, is_excerpt, history, self.system_message)
             
             resume_logger.info(f'Prepared {len(messages)} messages for OpenAI')
             return messages
@@ -154,7 +421,7 @@ class ChatbotService:
         """Save chat interaction to database"""
         try:
             # Remove the END_RESPONSE marker if present
-            answer = answer.replace("END_RESPONSE", "").strip()
+            answer = clean_answer(answer)
             
             chat_history = ChatHistory(
                 resume_id=resume_id,
@@ -169,8 +436,18 @@ class ChatbotService:
             db.session.rollback()
             raise APIError('Error saving chat history', status_code=500)
 
+    def _lookup_cached_answer(self, resume, question, use_cache=True):
+        """Return (cache_key, cached answer or None); the key is None when the answer is not cacheable"""
+        cache_key = question_cache_key(resume, question, self.openai_service.model) if use_cache else None
+        if not cache_key:
+            return None, None
+        answer = answer_cache.get(cache_key)
+        if answer is not None:
+            resume_logger.info(f'Answer cache hit for resume {resume.id}')
+        return cache_key, answer
+
     @log_function_call(resume_logger)
-    def get_response(self, resume, question):
+    def get_response(self, resume, question, use_cache=True):
         """Get chatbot response for a resume-related question"""
         try:
             if not resume.extracted_text:
@@ -178,13 +455,25 @@ class ChatbotService:
                 raise APIError('No resume text available for analysis', status_code=400)
 
             resume_logger.info(f'Processing question for resume {resume.id}')
-            messages = self.prepare_messages(resume, question)
             
-            answer = self.openai_service.create_chat_completion(messages)
-            # Remove the END_RESPONSE marker if present
-            answer = answer.replace("END_RESPONSE", "").strip()
+            cache_key, answer = self._lookup_cached_answer(resume, question, use_cache)
+            if answer is not None:
+                # Cached answers are still part of the conversation
+                self.save_chat_history(resume.id, question, answer)
+                self.update_memory(resume)
+                return answer
+            
+            # Cacheable questions are answered without memory, so the answer fits any conversation
+            history = None if cache_key else self.get_memory_messages(resume)
+            messages = self.prepare_messages(resume, question, history)
+            
+            answer = clean_answer(self.openai_service.create_chat_completion(messages))
+            
+            if cache_key:
+                answer_cache.set(cache_key, answer)
             
             self.save_chat_history(resume.id, question, answer)
+            self.update_memory(resume)
             
             resume_logger.info('Successfully generated and saved response')
             return answer
@@ -195,6 +484,62 @@ class ChatbotService:
                 raise e
             raise APIError('Error processing chat request', status_code=500)
 
+    def stream_response(self, resume, question, use_cache=True):
+        """Yield the answer in pieces as it is generated; it is cached and saved once complete"""
+        try:
+            if not resume.extracted_text:
+                resume_logger.error(f'No extracted text found for resume {resume.id}')
+                raise APIError('No resume text available for analysis', status_code=400)
+
+            resume_logger.info(f'Streaming answer for resume {resume.id}')
+            
+            cache_key, answer = self._lookup_cached_answer(resume, question, use_cache)
+            if answer is not None:
+                self.save_chat_history(resume.id, question, answer)
+                yield answer
+                self.update_memory(resume)
+                return
+            
+            # Cacheable questions are answered without memory, so the answer fits any conversation
+            history = None if cache_key else self.get_memory_messages(resume)
+            messages = self.prepare_messages(resume, question, history)
+            
+            marker_filter = EndMarkerFilter()
+            parts = []
+            deltas = self.openai_service.stream_chat_completion(messages)
+            try:
+                for delta in deltas:
+                    text = marker_filter.feed(delta)
+                    if text:
+                        parts.append(text)
+                        yield text
+                    if marker_filter.done:
+                        break
+            finally:
+                deltas.close()
+            tail = marker_filter.flush()
+            if tail:
+                parts.append(tail)
+                yield tail
+            
+            answer = ''.join(parts).strip()
+            if not answer:
+                resume_logger.error('Empty streamed answer after removing END_RESPONSE')
+                raise APIError('Empty response from OpenAI', status_code=500)
+            
+            if cache_key:
+                answer_cache.set(cache_key, answer)
+            
+            self.save_chat_history(resume.id, question, answer)
+            self.update_memory(resume)
+            resume_logger.info('Successfully streamed and saved response')
+            
+        except Exception as e:
+            resume_logger.error(f'Error in stream_response: {str(e)}', exc_info=True)
+            if isinstance(e, APIError):
+                raise e
+            raise APIError('Error processing chat request', status_code=500)
+
     @log_function_call(resume_logger)
     def get_resume_analysis(self, resume):
         """Get an overall analysis of the resume"""
@@ -203,19 +548,7 @@ class ChatbotService:
                 resume_logger.error(f'No extracted text found for resume {resume.id}')
                 raise APIError('No resume text available for analysis', status_code=400)
 
-            prompt = f"""Please analyze this resume and provide a comprehensive evaluation covering:
-            1. Overall impression
-            2. Key strengths
-            3. Areas for improvement
-            4. Suggested enhancements
-            
-            Resume content:
-            {resume.extracted_text}"""
-            
-            messages = [
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": prompt}
-            ]
+            messages = build_analysis_messages(resume.extracted_text, self.system_message)
             
             resume_logger.info('Sending resume analysis request to OpenAI')
             analysis = self.openai_service.create_chat_completion(messages, max_tokens=1000)
@@ -227,36 +560,3 @@ class ChatbotService:
             if isinstance(e, APIError):
                 raise e
             raise APIError('Error analyzing resume', status_code=500)
-
-    def get_response_direct(self, context: str, query: str) -> str:
-        """Get a direct response from the chatbot without any conversation context.
-        
-        Args:
-            context (str): The text to analyze (e.g. resume content)
-            query (str): The specific question to ask about the context
-            
-        Returns:
-            str: The chatbot's response
-            
-        Raises:
-            Exception: If there's an error getting the response or if response is None
-        """
-        from openai.types.chat import ChatCompletionMessageParam
-        messages: list[ChatCompletionMessageParam] = [
-            {"role": "system", "content": "You are a helpful assistant that analyzes resumes. Provide direct, concise answers."},
-            {"role": "user", "content": f"Here is a resume:\n\n{context}\n\nQuestion: {query}"}
-        ]
-        
-        try:
-            response = self.openai_service.client.chat.completions.create(
-                model=self.openai_service.model,
-                messages=messages,
-                temperature=0.0  # Use 0 temperature for consistent, deterministic responses
-            )
-            content = response.choices[0].message.content
-            if content is None:
-                raise Exception("Received null response from OpenAI")
-            return content
-        except Exception as e:
-            logger.error(f"Error getting chatbot response: {str(e)}")
-            raise 
\ No newline at end of file
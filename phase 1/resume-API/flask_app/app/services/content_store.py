@@ -0,0 +1,142 @@
+import os
+import time
+import tempfile
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models.resume import StoredFile
+from app.utils.logger import resume_logger
+
+SHARD_LEVELS = 2  # Directory levels between the root and a file
+SHARD_WIDTH = 2  # Hex digits of the hash per level, i.e. 256 directories per level
+STAGING_DIR = '.staging'
+STAGING_MAX_AGE = 3600  # Seconds before an abandoned staged file is removed
+
+class ContentStore:
+    """Content-addressed file store, sharded by hash prefix.
+
+    A file with SHA-256 ``abcd...`` is stored once, as ``<root>/ab/cd/abcd....pdf``,
+    so duplicate uploads share it and no directory grows past a few hundred
+    entries at millions of files. Files are written to a staging directory on
+    the same filesystem, fsynced and renamed into place, so readers never see
+    a partial file.
+
+    ``stored_files`` counts the jobs and resumes using each file. A reference
+    is committed before its file is renamed into place. Releasing the last
+    reference only leaves a row with no references; once that is committed,
+    purge() deletes the file while holding the row lock, so neither a rolled
+    back delete nor an upload of the same bytes racing it can lose a file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.staging = os.path.join(root, STAGING_DIR)
+        os.makedirs(self.staging, exist_ok=True)
+        self._remove_abandoned()
+
+    def _remove_abandoned(self):
+        """Remove staged files left behind by interrupted uploads"""
+        cutoff = time.time() - STAGING_MAX_AGE
+        for entry in os.scandir(self.staging):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def name_for(self, content_hash: str, file_format: str) -> str:
+        """Path of the content inside the store"""
+        shards = [content_hash[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH] for level in range(SHARD_LEVELS)]
+        return os.path.join(*shards, f'{content_hash}.{file_format}')
+
+    def path(self, stored_name: str) -> str:
+        return os.path.join(self.root, stored_name)
+
+    def stored_name_of(self, path: str) -> Optional[str]:
+        """Inverse of path(), or None for a file outside the store"""
+        stored_name = os.path.relpath(path, self.root)
+        return None if stored_name.startswith(os.pardir) else stored_name
+
+    def stage(self):
+        """Open a new file in the staging directory: (binary file object, temp path)"""
+        fd, temp_path = tempfile.mkstemp(dir=self.staging, suffix='.part')
+        return os.fdopen(fd, 'wb'), temp_path
+
+    def acquire(self, content_hash: str, stored_name: str, size: Optional[int] = None, count: int = 1):
+        """Add references to a stored file, creating its row on first use; the caller commits"""
+        stmt = insert(StoredFile).values(
+            content_hash=content_hash,
+            stored_name=stored_name,
+            size=size,
+            ref_count=count
+        ).on_conflict_do_update(
+            index_elements=['content_hash'],
+            set_={'ref_count': StoredFile.ref_count + count, 'updated_at': datetime.utcnow()}
+        )
+        db.session.execute(stmt)
+
+    def add_file(self, temp_path: str, content_hash: str, file_format: str) -> str:
+        """Take a reference to a fsynced staged file and move it into place; commits the session.
+
+        Returns the stored name. The reference belongs to the caller (an
+        upload job, then its resume) and is dropped with release().
+        """
+        stored_name = self.name_for(content_hash, file_format)
+        self.acquire(content_hash, stored_name, os.path.getsize(temp_path))
+        db.session.commit()
+
+        path = self.path(stored_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # An existing copy has the same bytes, so replacing it is harmless
+        os.replace(temp_path, path)
+        resume_logger.info(f"Stored {content_hash} as {stored_name}")
+        return stored_name
+
+    def _record(self, stored_name: str) -> Optional[StoredFile]:
+        """Locked row of a stored file, or None if the store does not track it"""
+        content_hash = os.path.splitext(os.path.basename(stored_name))[0]
+        record = StoredFile.query.filter_by(content_hash=content_hash).with_for_update().first()
+        return record if record and record.stored_name == stored_name else None
+
+    def release(self, stored_name: str) -> bool:
+        """Drop a reference; the caller commits and then calls purge().
+
+        Returns False for a file the store does not track (uploads saved
+        before it existed), which callers then handle themselves.
+        """
+        record = self._record(stored_name)
+        if not record:
+            return False
+        record.ref_count -= 1
+        return True
+
+    def purge(self, stored_name: str):
+        """Delete the file and its row if no references are left; commits the session.
+
+        Call it only after the release is committed. Failures are logged and
+        leave the unreferenced row for purge_unreferenced().
+        """
+        try:
+            record = self._record(stored_name)
+            if record and record.ref_count <= 0:
+                db.session.delete(record)
+                # Deleted under the row lock: a concurrent acquire waits for our commit
+                try:
+                    os.remove(self.path(stored_name))
+                    resume_logger.info(f"Deleted stored file {stored_name}: no references left")
+                except FileNotFoundError:
+                    pass
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            resume_logger.error(f"Could not purge stored file {stored_name}: {str(e)}")
+
+    def purge_unreferenced(self, limit: int = 100) -> int:
+        """Purge files whose last release was committed but never purged; returns how many were tried"""
+        stored_names = [name for (name,) in db.session.query(StoredFile.stored_name)
+                        .filter(StoredFile.ref_count <= 0).limit(limit)]
+        db.session.commit()
+        for stored_name in stored_names:
+            self.purge(stored_name)
+        return len(stored_names)
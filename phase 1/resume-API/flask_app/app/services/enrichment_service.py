@@ -0,0 +1,205 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.aio.loop import background_loop
+from app.aio.openai_service import get_async_openai_service
+from app.services.local_extractor import LocalResumeExtractor, current_month_index, month_index, years_from_intervals
+from app.utils.logger import resume_logger
+
+EDUCATION_LEVELS = ["High School", "Associate's", "Bachelor's", "Master's", "PhD"]
+DEFAULT_EDUCATION_LEVEL = "High School"
+
+EDUCATION_MAX_TOKENS = 16  # The answer is one of EDUCATION_LEVELS
+
+EDUCATION_QUERY = "What is the highest education level mentioned in this resume? Respond with ONLY ONE of these exact values: High School, Associate's, Bachelor's, Master's, PhD. If none found, respond with High School."
+
+EXPERIENCE_QUERY = """Extract ALL full-time professional work experiences from the resume with their start and end dates.
+            Format your response EXACTLY as follows (one experience per line):
+            Company Name | Start Date (MM/YYYY) | End Date (MM/YYYY or PRESENT)
+
+            Rules:
+            - Only include full-time professional roles
+            - Skip internships, part-time work, or academic experience
+            - Use PRESENT for current roles
+            - If exact month is unknown, use 01 for start dates and 12 for end dates
+            - If no professional experience found, respond with NONE"""
+
+STRUCTURED_QUERY = """Extract the highest education level and ALL full-time professional work experiences from the resume.
+
+            Rules:
+            - education_level must be the highest level mentioned; use High School if none is found
+            - Only include full-time professional roles in experience
+            - Skip internships, part-time work, or academic experience
+            - Dates use MM/YYYY; use PRESENT as end_date for current roles
+            - If exact month is unknown, use 01 for start dates and 12 for end dates
+            - Return an empty experience list if no professional experience is found"""
+
+ENRICHMENT_SCHEMA = {
+    "name": "resume_enrichment",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "education_level": {"type": "string", "enum": EDUCATION_LEVELS},
+            "experience": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "company": {"type": "string"},
+                        "start_date": {"type": "string", "description": "MM/YYYY"},
+                        "end_date": {"type": "string", "description": "MM/YYYY or PRESENT"}
+                    },
+                    "required": ["company", "start_date", "end_date"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["education_level", "experience"],
+        "additionalProperties": False
+    }
+}
+
+# Model families that accept response_format json_schema; older snapshots such
+# as gpt-4o-2024-05-13, gpt-4-turbo and gpt-3.5-turbo reject it
+STRUCTURED_OUTPUT_MODELS = ('gpt-4o-mini', 'gpt-4o-2024-08-06', 'gpt-4o-2024-11-20', 'gpt-4.1', 'gpt-5',
+                            'o1-2024-12-17', 'o3', 'o4-mini')
+
+def supports_structured_outputs(model: str) -> bool:
+    model = (model or '').lower()
+    return model in ('gpt-4o', 'o1') or model.startswith(STRUCTURED_OUTPUT_MODELS)
+
+class EnrichmentService:
+    """Derives education level and years of experience from resume text.
+
+    Local rules (LocalResumeExtractor) run first; the LLM is only asked for the
+    values whose local confidence is below ENRICHMENT_LOCAL_CONFIDENCE. When
+    the model supports structured outputs (ENRICHMENT_MODE=auto, the default)
+    or ENRICHMENT_MODE=structured, a single JSON schema call returns them.
+    Otherwise, or if that call fails, the original education and experience
+    prompts are sent concurrently and parsed line by line. LLM calls run on the
+    shared background event loop with the async OpenAI client.
+    """
+
+    def __init__(self, mode: Optional[str] = None, local_confidence: Optional[float] = None):
+        self.mode = (mode or os.getenv('ENRICHMENT_MODE', 'auto')).lower()
+        self.local_confidence = local_confidence if local_confidence is not None \
+            else float(os.getenv('ENRICHMENT_LOCAL_CONFIDENCE', '0.7'))
+        self.local_extractor = LocalResumeExtractor()
+
+    def parse_experience_years(self, experience_text: str) -> float:
+        """Years covered by 'Company | MM/YYYY | MM/YYYY or PRESENT' lines, overlaps counted once, rounded to 0.5"""
+        if experience_text.strip().upper() == "NONE":
+            return 0.0
+
+        intervals = []
+        now = current_month_index()
+        for line in experience_text.split('\n'):
+            if '|' not in line:
+                continue
+            try:
+                parts = [p.strip() for p in line.split('|')]
+                if len(parts) != 3:
+                    continue
+
+                company, start_date, end_date = parts
+                start = datetime.strptime(start_date, '%m/%Y')
+
+                # End months are inclusive
+                if end_date.upper() == 'PRESENT':
+                    end_index = now + 1
+                else:
+                    end = datetime.strptime(end_date, '%m/%Y')
+                    end_index = month_index(end.year, end.month) + 1
+
+                start_index = month_index(start.year, start.month)
+                if start_index < end_index:
+                    intervals.append((start_index, min(end_index, now + 1)))
+
+            except Exception as date_error:
+                resume_logger.error(f"Error parsing date from line '{line}': {str(date_error)}")
+                continue
+
+        # Concurrent roles are merged rather than double-counted
+        return years_from_intervals(intervals)
+
+    def _format_experience_lines(self, experience: List[dict]) -> str:
+        """Render structured experience entries in the line format parse_experience_years reads"""
+        if not experience:
+            return "NONE"
+        return "\n".join(
+            f"{entry.get('company', '')} | {entry.get('start_date', '')} | {entry.get('end_date', '')}"
+            for entry in experience
+        )
+
+    async def _enrich_structured(self, openai_service, text: str) -> Tuple[str, float]:
+        data = await openai_service.get_structured_response(text, STRUCTURED_QUERY, ENRICHMENT_SCHEMA)
+        education_level = data.get('education_level')
+        if education_level not in EDUCATION_LEVELS:
+            raise ValueError(f"Unexpected education level in structured response: {education_level}")
+        experience_text = self._format_experience_lines(data.get('experience') or [])
+        resume_logger.info(f"Structured extraction: {education_level}; experience: {experience_text}")
+        return education_level, self.parse_experience_years(experience_text)
+
+    async def _enrich_parallel(self, openai_service, text: str, need_education: bool = True,
+                               need_experience: bool = True) -> Tuple[Optional[str], Optional[float]]:
+        queries = []
+        if need_education:
+            queries.append(openai_service.get_response_direct(text, EDUCATION_QUERY, EDUCATION_MAX_TOKENS))
+        if need_experience:
+            queries.append(openai_service.get_response_direct(text, EXPERIENCE_QUERY))
+        answers = iter(await asyncio.gather(*queries))
+
+        education_level = years_exp = None
+        if need_education:
+            education_level = next(answers).strip()
+            resume_logger.info(f"Detected education level: {education_level}")
+
+        if need_experience:
+            experience_text = next(answers).strip()
+            resume_logger.info(f"Extracted experience text: {experience_text}")
+            years_exp = self.parse_experience_years(experience_text)
+        return education_level, years_exp
+
+    async def _enrich_llm_async(self, text: str, need_education: bool, need_experience: bool) -> Tuple[Optional[str], Optional[float]]:
+        openai_service = get_async_openai_service()
+
+        mode = self.mode
+        if mode == 'auto':
+            mode = 'structured' if supports_structured_outputs(openai_service.model) else 'parallel'
+        if mode == 'structured':
+            try:
+                # One call answers both; only the requested values are used
+                return await self._enrich_structured(openai_service, text)
+            except Exception as e:
+                resume_logger.warning(f"Structured extraction failed, falling back to line-based prompts: {str(e)}")
+
+        return await self._enrich_parallel(openai_service, text, need_education, need_experience)
+
+    def _enrich_llm(self, text: str, need_education: bool, need_experience: bool) -> Tuple[Optional[str], Optional[float]]:
+        return background_loop.run(self._enrich_llm_async(text, need_education, need_experience))
+
+    def enrich(self, text: str) -> Tuple[str, float]:
+        """Return (education_level, years_of_experience); raises if a needed LLM call fails"""
+        resume_logger.info("Extracting education and experience info")
+        local = self.local_extractor.extract(text)
+        need_education = local['education_level'] is None or local['education_confidence'] < self.local_confidence
+        need_experience = local['experience_confidence'] < self.local_confidence
+        resume_logger.info(
+            f"Local extraction: {local['education_level']} ({local['education_confidence']}), "
+            f"{local['years_of_experience']} years ({local['experience_confidence']})"
+        )
+
+        education_level, years_exp = local['education_level'], local['years_of_experience']
+        if need_education or need_experience:
+            llm_education, llm_years = self._enrich_llm(text, need_education, need_experience)
+            if need_education:
+                education_level = llm_education
+            if need_experience:
+                years_exp = llm_years
+        else:
+            resume_logger.info("Local extraction is confident; skipping LLM enrichment")
+
+        resume_logger.info(f"Calculated years of experience: {years_exp}")
+        return education_level, years_exp
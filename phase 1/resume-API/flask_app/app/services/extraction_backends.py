@@ -0,0 +1,105 @@
+"""Text extraction backends behind one interface, selected per file format.
+
+Backends import their parser lazily, so this module stays cheap to import in
+the server process and in extraction workers (see extraction_worker). Custom
+backends must be registered here at import time to be visible to workers.
+
+A document is either a path or the file's bytes (an upload that has not been
+written to disk yet); every backend accepts both.
+"""
+import io
+from typing import Dict, List, Optional, Union
+
+Source = Union[str, bytes]
+
+class ExtractionBackend:
+    """Extracts the text of a document, page by page.
+
+    ``extract`` returns ``{'pages': [...], 'page_count': n}`` where each page's
+    text ends with a newline, so joining the pages never merges words.
+    Backends with ``page_ranges`` can extract [start, end) page ranges, which
+    lets the pool fan long documents out over several workers.
+    """
+    name = ''
+    formats = ()
+    module = ''
+    page_ranges = False
+
+    def available(self) -> bool:
+        try:
+            __import__(self.module)
+            return True
+        except ImportError:
+            return False
+
+    def extract(self, source: Source, start: int = 0, end: Optional[int] = None) -> dict:
+        raise NotImplementedError
+
+def _page(text: Optional[str]) -> str:
+    text = text or ''
+    return text if text.endswith('\n') else text + '\n'
+
+def _file(source: Source):
+    """A file-like object for parsers that take either a path or a stream"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+class PyMuPDFBackend(ExtractionBackend):
+    name = 'pymupdf'
+    formats = ('pdf',)
+    module = 'fitz'
+    page_ranges = True
+
+    def extract(self, source: Source, start: int = 0, end: Optional[int] = None) -> dict:
+        import fitz  # PyMuPDF
+        document = fitz.open(stream=source, filetype='pdf') if isinstance(source, bytes) else fitz.open(source)
+        with document:
+            page_count = document.page_count
+            end = page_count if end is None else min(end, page_count)
+            return {
+                'pages': [_page(document[number].get_text()) for number in range(start, end)],
+                'page_count': page_count
+            }
+
+class PyPDF2Backend(ExtractionBackend):
+    name = 'pypdf2'
+    formats = ('pdf',)
+    module = 'PyPDF2'
+    page_ranges = True
+
+    def extract(self, source: Source, start: int = 0, end: Optional[int] = None) -> dict:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(_file(source))
+        page_count = len(reader.pages)
+        end = page_count if end is None else min(end, page_count)
+        return {
+            'pages': [_page(reader.pages[number].extract_text()) for number in range(start, end)],
+            'page_count': page_count
+        }
+
+class DocxBackend(ExtractionBackend):
+    name = 'python-docx'
+    formats = ('docx',)
+    module = 'docx'
+
+    def extract(self, source: Source, start: int = 0, end: Optional[int] = None) -> dict:
+        from docx import Document
+        document = Document(_file(source))
+        return {'pages': [_page("\n".join(paragraph.text for paragraph in document.paragraphs))], 'page_count': 1}
+
+_backends: Dict[str, ExtractionBackend] = {}
+
+def register_backend(backend: ExtractionBackend) -> ExtractionBackend:
+    _backends[backend.name] = backend
+    return backend
+
+def get_backend(name: str) -> ExtractionBackend:
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown extraction backend: {name} (available: {', '.join(sorted(_backends))})")
+
+def backends_for(file_format: str) -> List[ExtractionBackend]:
+    return [backend for backend in _backends.values() if file_format in backend.formats]
+
+for _backend in (PyMuPDFBackend(), PyPDF2Backend(), DocxBackend()):
+    register_backend(_backend)
@@ -0,0 +1,212 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from app.config.config import Config
+from app.services.extraction_backends import Source, get_backend
+from app.services.extraction_worker import worker_main
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MONITOR_INTERVAL = 0.1  # seconds between RSS and deadline checks while a task runs
+
+class ExtractionError(Exception):
+    """A document could not be extracted within its budgets or crashed its worker"""
+    pass
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident set size in bytes, or None where /proc is unavailable"""
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _Worker:
+    """One extraction process and the pipe used to send it tasks"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), name='resume-extract', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        # Closing the pipe ends the worker loop
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+    def run(self, kind: str, args: tuple, cpu_budget: float, timeout: float, memory_limit: int) -> dict:
+        """Run one task, killing the process if it outlives the timeout or memory limit"""
+        self.tasks += 1
+        deadline = time.monotonic() + timeout
+        try:
+            self.conn.send((kind, args, cpu_budget))
+        except OSError:
+            self.kill()
+            raise ExtractionError('crashed its extraction worker')
+        while not self.conn.poll(MONITOR_INTERVAL):
+            if not self.alive:
+                self.kill()
+                raise ExtractionError('crashed its extraction worker')
+            if time.monotonic() >= deadline:
+                self.kill()
+                raise ExtractionError(f'timed out after {timeout:.0f}s')
+            rss = process_rss(self.process.pid)
+            if memory_limit and rss and rss > memory_limit:
+                self.kill()
+                raise ExtractionError(f'exceeded its memory budget of {memory_limit // (1024 * 1024)} MB')
+
+        try:
+            status, payload = self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise ExtractionError('crashed its extraction worker')
+        if status != 'ok':
+            raise ExtractionError(payload)
+        return payload
+
+class ExtractionPool:
+    """Bounded pool of worker processes for text extraction.
+
+    Parsing runs outside the server process, so a huge or malformed file
+    cannot pin a request worker's CPU. Each format is parsed by the backend
+    named in EXTRACTION_BACKENDS (see extraction_backends). Each document has a
+    CPU-time budget (RLIMIT_CPU in the worker), an RSS budget and a wall-clock
+    timeout; a worker that exceeds them is killed and replaced, and the
+    document fails with an ExtractionError. Documents longer than
+    EXTRACTION_FANOUT_PAGES are split into page ranges that run on several
+    workers when the backend supports it, and the CPU budget is shared out
+    between the ranges. Workers are started with spawn so they never inherit
+    the server's threads or locks.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cpu_seconds: Optional[float] = None,
+                 memory_mb: Optional[int] = None, timeout: Optional[float] = None,
+                 fanout_pages: Optional[int] = None, max_tasks_per_worker: Optional[int] = None,
+                 backends: Optional[Dict[str, str]] = None):
+        self.workers = workers or Config.EXTRACTION_WORKERS
+        self.cpu_seconds = cpu_seconds or Config.EXTRACTION_CPU_SECONDS
+        self.memory_limit = (memory_mb or Config.EXTRACTION_MEMORY_MB) * 1024 * 1024
+        self.timeout = timeout or Config.EXTRACTION_TIMEOUT
+        self.fanout_pages = Config.EXTRACTION_FANOUT_PAGES if fanout_pages is None else fanout_pages
+        self.max_tasks_per_worker = max_tasks_per_worker or Config.EXTRACTION_MAX_TASKS_PER_WORKER
+        self.backends = {
+            file_format: get_backend(name)
+            for file_format, name in (backends or Config.EXTRACTION_BACKENDS).items()
+        }
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._slots = None
+        self._dispatcher = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Rebuilt after a fork: the parent's workers and threads are not ours
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._idle = []
+                    self._slots = threading.BoundedSemaphore(self.workers)
+                    self._dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extract-fanout')
+                    self._pid = os.getpid()
+
+    def _checkout(self, deadline: float) -> _Worker:
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise ExtractionError('timed out waiting for an extraction worker')
+        try:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None or not worker.alive:
+                worker = _Worker(self._context)
+            return worker
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker: _Worker):
+        try:
+            if worker.alive and worker.tasks < self.max_tasks_per_worker:
+                with self._lock:
+                    self._idle.append(worker)
+            elif worker.alive:
+                # Recycled to bound any memory the parsers leak
+                worker.stop()
+        finally:
+            self._slots.release()
+
+    def _run(self, kind: str, args: tuple, cpu_budget: float, deadline: float) -> dict:
+        worker = self._checkout(deadline)
+        try:
+            return worker.run(kind, args, cpu_budget, max(deadline - time.monotonic(), 0), self.memory_limit)
+        finally:
+            self._checkin(worker)
+
+    @property
+    def formats(self):
+        return set(self.backends)
+
+    def extract(self, source: Source, file_format: str) -> str:
+        """Text of a document (a path or the file's bytes) with the backend configured for its format.
+
+        Long documents are fanned out over several workers when the backend
+        can extract page ranges; bytes are then sent to each of them.
+        """
+        backend = self.backends.get(file_format)
+        if backend is None:
+            raise ValueError(f"No extraction backend configured for {file_format} files")
+        self._ensure_started()
+        deadline = time.monotonic() + self.timeout
+        fanout = self.fanout_pages if backend.page_ranges else 0
+        first = self._run(backend.name, (source, 0, fanout or None), self.cpu_seconds, deadline)
+        pages, page_count = first['pages'], first['page_count']
+
+        if fanout and page_count > fanout:
+            remaining_cpu = self.cpu_seconds - first['cpu']
+            if remaining_cpu <= 0:
+                raise ExtractionError(f'exceeded its CPU budget of {self.cpu_seconds:g}s')
+            ranges = [(start, min(start + fanout, page_count)) for start in range(fanout, page_count, fanout)]
+            remaining_pages = page_count - fanout
+            futures = [
+                self._dispatcher.submit(
+                    self._run, backend.name, (source, start, end),
+                    max(remaining_cpu * (end - start) / remaining_pages, 1), deadline
+                )
+                for start, end in ranges
+            ]
+            try:
+                for future in futures:
+                    pages.extend(future.result()['pages'])
+            finally:
+                for future in futures:
+                    future.cancel()
+            label = source if isinstance(source, str) else f'{len(source)} byte upload'
+            logger.info(f"Extracted {page_count} pages from {label} in {len(ranges) + 1} ranges")
+
+        # One join instead of growing a string page by page
+        return ''.join(pages)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+# Create global extraction pool instance
+extraction_pool = ExtractionPool()
@@ -0,0 +1,76 @@
+"""Code that runs inside extraction worker processes (see extraction_pool).
+
+Kept free of Flask and database imports so workers start quickly.
+"""
+import math
+import signal
+from app.services.extraction_backends import get_backend
+try:
+    import resource
+except ImportError:  # Not available on Windows; CPU budgets are then enforced by the timeout only
+    resource = None
+
+class CPUBudgetExceeded(Exception):
+    pass
+
+# Only raise while a task is running, not for a signal that arrives after it finished
+_task_running = False
+
+def _on_sigxcpu(signum, frame):
+    if _task_running:
+        raise CPUBudgetExceeded()
+
+def cpu_time() -> float:
+    """CPU seconds used by this process so far"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _set_cpu_limit(seconds):
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is not None:
+        seconds = int(math.ceil(seconds))
+        if hard != resource.RLIM_INFINITY:
+            seconds = min(seconds, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard if seconds is None else seconds, hard))
+
+def worker_main(conn):
+    """Serve (backend name, args, cpu_budget) tasks from the pool until the pipe closes.
+
+    The CPU budget is a soft RLIMIT_CPU just above the CPU time used so far;
+    the kernel then sends SIGXCPU, which aborts the task between pages.
+    Replies are (status, payload) with status ok, error, cpu or memory.
+    """
+    global _task_running
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is for the server process
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+    while True:
+        try:
+            backend, args, cpu_budget = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        started = cpu_time()
+        try:
+            _task_running = True
+            if resource is not None and cpu_budget:
+                _set_cpu_limit(started + cpu_budget)
+            result = get_backend(backend).extract(*args)
+            _task_running = False
+            result['cpu'] = cpu_time() - started
+            conn.send(('ok', result))
+        except CPUBudgetExceeded:
+            conn.send(('cpu', f'exceeded its CPU budget of {cpu_budget:g}s'))
+        except MemoryError:
+            conn.send(('memory', 'ran out of memory'))
+            # Exit so the pool replaces this process instead of reusing a fragmented heap
+            return
+        except Exception as e:
+            conn.send(('error', f'could not be parsed: {str(e)}'))
+        finally:
+            _task_running = False
+            if resource is not None and cpu_budget:
+                _set_cpu_limit(None)
@@ -1,98 +1,166 @@
 import os
+import hashlib
 import logging
-import fitz  # PyMuPDF
-from docx import Document
+from itertools import chain
+from werkzeug.exceptions import ClientDisconnected, RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
 from werkzeug.utils import secure_filename
 from typing import Optional, Tuple
+from app.services.content_store import ContentStore
+from app.services.extraction_backends import Source
+from app.services.extraction_pool import extraction_pool, ExtractionError
+from app.utils.errors import FileTooLargeError, FileUploadError, UnsupportedFileTypeError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+MAX_FORM_FIELD_SIZE = 64 * 1024  # Non-file form fields are buffered by the multipart decoder
+
+# Leading bytes of each accepted format (a DOCX file is a ZIP archive)
+MAGIC_BYTES = {
+    'pdf': b'%PDF-',
+    'docx': b'PK\x03\x04'
+}
+
+class _Upload:
+    """An upload being spooled to a staged file in the content store.
+
+    The hash, size and magic bytes are checked as each chunk arrives, so a bad
+    upload fails on the chunk that gives it away. commit() moves the file to
+    its content-addressed place in the store.
+    """
+
+    def __init__(self, store: ContentStore, filename: str, max_size: int):
+        self.file_name = secure_filename(filename or '')
+        if not self.file_name:
+            raise FileUploadError('Invalid file name')
+        self.file_format = os.path.splitext(self.file_name)[1].lower().lstrip('.')
+        if self.file_format not in MAGIC_BYTES:
+            raise UnsupportedFileTypeError(f'Unsupported file type: .{self.file_format}',
+                                           details={'allowed': sorted(MAGIC_BYTES)})
+        self.store = store
+        self.max_size = max_size
+        self.size = 0
+        self.head = b''
+        self.digest = hashlib.sha256()
+        self.out, self.temp_path = store.stage()
+        self.committed = False
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise FileTooLargeError(f'File exceeds the {self.max_size / (1024 * 1024):g} MB limit',
+                                    details={'max_bytes': self.max_size})
+        magic = MAGIC_BYTES[self.file_format]
+        if len(self.head) < len(magic):
+            self.head += data[:len(magic) - len(self.head)]
+            if self.head != magic[:len(self.head)]:
+                raise UnsupportedFileTypeError(f'File content is not a valid {self.file_format.upper()}')
+        self.digest.update(data)
+        self.out.write(data)
+
+    def commit(self) -> Tuple[str, str, str]:
+        if self.head != MAGIC_BYTES[self.file_format]:
+            raise UnsupportedFileTypeError(f'File content is not a valid {self.file_format.upper()}')
+        self.out.flush()
+        os.fsync(self.out.fileno())
+        self.out.close()
+        content_hash = self.digest.hexdigest()
+        stored_name = self.store.add_file(self.temp_path, content_hash, self.file_format)
+        self.committed = True
+        return self.file_name, stored_name, content_hash
+
+    def discard(self):
+        if self.committed:
+            return
+        self.out.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
 class FileService:
     def __init__(self, upload_folder: str):
         self.upload_folder = upload_folder
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
             logger.info(f"Created upload folder: {upload_folder}")
+        self.store = ContentStore(upload_folder)
 
-    def save_file(self, file) -> Tuple[bool, str]:
-        """Save uploaded file and return success status and file_name"""
-        try:
-            if not file:
-                logger.error("No file provided")
-                return False, "No file provided"
-
-            file_name = secure_filename(str(file.filename))
-            if not file_name:
-                logger.error("Invalid file name")
-                return False, "Invalid file name"
+    def receive_upload(self, stream, boundary: str, max_size: int, field: str = 'file') -> Tuple[str, str, str]:
+        """Stream a multipart upload's file field into the content store: file_name, stored_name, content_hash.
 
-            filepath = os.path.join(self.upload_folder, file_name)
-            file.save(filepath)
-            logger.info(f"Successfully saved file: {filepath}")
-            return True, file_name
-        except Exception as e:
-            logger.error(f"Error saving file: {str(e)}")
-            return False, str(e)
-
-    def extract_text_from_pdf(self, filepath: str) -> Optional[str]:
-        """Extract text from PDF file"""
+        The body is read in CHUNK_SIZE chunks, so memory per upload stays
+        constant, and reading stops as soon as the file is rejected or
+        complete. The stored file has one reference for the caller's job
+        (see ContentStore.add_file). Raises FileUploadError, FileTooLargeError or
+        UnsupportedFileTypeError.
+        """
+        decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=MAX_FORM_FIELD_SIZE)
+        upload = None
+        target = None  # The upload while the decoder is inside its part
         try:
-            logger.info(f"Extracting text from PDF: {filepath}")
-            pdf_document = fitz.Document(filepath)
-            text = ""
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                # PyMuPDF 1.23.8+ uses get_text()
-                text += page.get_text()  # type: ignore
-            pdf_document.close()
-            
-            if not text.strip():
-                logger.warning("Extracted empty text from PDF")
-                return None
-                
-            logger.info(f"Successfully extracted {len(text)} characters from PDF")
-            return text
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {str(e)}")
-            return None
+            for chunk in chain(iter(lambda: stream.read(CHUNK_SIZE), b''), [None]):
+                decoder.receive_data(chunk)
+                event = decoder.next_event()
+                while not isinstance(event, (NeedData, Epilogue)):
+                    if isinstance(event, File) and event.name == field and upload is None:
+                        upload = target = _Upload(self.store, event.filename, max_size)
+                    elif isinstance(event, (Field, File)):
+                        target = None  # Other parts are skipped
+                    elif isinstance(event, Data) and target is not None:
+                        target.write(event.data)
+                        if not event.more_data:
+                            result = upload.commit()
+                            logger.info(f"Received upload {result[0]}: {upload.size} bytes stored as {result[1]}")
+                            return result
+                    event = decoder.next_event()
+                if isinstance(event, Epilogue):
+                    break
+            raise FileUploadError('No file part' if upload is None else 'Upload ended before the file was complete')
+        except RequestEntityTooLarge:
+            raise FileTooLargeError(f'Upload exceeds the {max_size / (1024 * 1024):g} MB limit',
+                                    details={'max_bytes': max_size})
+        except (ClientDisconnected, ValueError) as e:
+            raise FileUploadError(f'Malformed upload: {str(e)}')
+        finally:
+            if upload is not None:
+                upload.discard()
 
-    def extract_text_from_docx(self, filepath: str) -> Optional[str]:
-        """Extract text from DOCX file"""
+    def _extract(self, source: Source, file_format: str, label: str) -> Optional[str]:
+        """Extract text with the backend configured for the file's format; ExtractionError when a budget is exceeded"""
+        if file_format not in extraction_pool.formats:
+            logger.error(f"Unsupported file extension: .{file_format}")
+            return None
         try:
-            logger.info(f"Extracting text from DOCX: {filepath}")
-            doc = Document(filepath)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            logger.info(f"Extracting text from {file_format.upper()}: {label}")
+            text = extraction_pool.extract(source, file_format)
             
             if not text.strip():
-                logger.warning("Extracted empty text from DOCX")
+                logger.warning(f"Extracted empty text from {file_format.upper()}")
                 return None
                 
-            logger.info(f"Successfully extracted {len(text)} characters from DOCX")
+            logger.info(f"Successfully extracted {len(text)} characters from {file_format.upper()}")
             return text
+        except ExtractionError as e:
+            logger.error(f"{file_format.upper()} {label} {str(e)}")
+            raise
         except Exception as e:
-            logger.error(f"Error extracting text from DOCX: {str(e)}")
+            logger.error(f"Error extracting text from {file_format.upper()}: {str(e)}")
             return None
 
+    def extract_text_from_path(self, filepath: str) -> Optional[str]:
+        """Extract text from a file on disk"""
+        return self._extract(filepath, os.path.splitext(filepath)[1].lower().lstrip('.'), filepath)
+
     def extract_text(self, file_name: str) -> Optional[str]:
         """Extract text from uploaded file"""
-        try:
-            logger.info(f"Starting text extraction for file: {file_name}")
-            filepath = os.path.join(self.upload_folder, file_name)
-            
-            if not os.path.exists(filepath):
-                logger.error(f"File not found: {filepath}")
-                return None
-
-            file_extension = os.path.splitext(file_name)[1].lower()
-            
-            if file_extension == '.pdf':
-                return self.extract_text_from_pdf(filepath)
-            elif file_extension == '.docx':
-                return self.extract_text_from_docx(filepath)
-            else:
-                logger.error(f"Unsupported file extension: {file_extension}")
-                return None
-        except Exception as e:
-            logger.error(f"Error in extract_text: {str(e)}")
-            return None 
\ No newline at end of file
+        logger.info(f"Starting text extraction for file: {file_name}")
+        filepath = self.store.path(file_name)
+        
+        if not os.path.exists(filepath):
+            logger.error(f"File not found: {filepath}")
+            return None
+        
+        return self.extract_text_from_path(filepath)
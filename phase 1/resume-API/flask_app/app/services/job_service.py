@@ -0,0 +1,285 @@
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from flask import current_app
+from app import db
+from app.models.resume import Resume, ResumeJob
+from app.domain.resume.resume_entity import (
+    STATUS_PENDING, STATUS_PROCESSING, STATUS_COMPLETED, STATUS_ERROR
+)
+from app.services.enrichment_service import EnrichmentService, DEFAULT_EDUCATION_LEVEL
+from app.services.artifact_service import ArtifactService
+from app.services.analysis_service import AnalysisService
+from app.services.retrieval_service import RetrievalService
+from app.services.llm_governor import llm_user
+from app.services.extraction_pool import ExtractionError
+from app.utils.logger import resume_logger, log_function_call
+
+# Pipeline stages, in execution order
+STAGE_EXTRACT = 'extract'
+STAGE_SKILLS = 'skills'
+STAGE_ENRICH = 'enrich'
+STAGE_PERSIST = 'persist'
+
+UNFINISHED = (STATUS_PENDING, STATUS_PROCESSING)
+LOST_JOB_MESSAGE = 'Processing was interrupted, please upload the file again'
+SWEEP_BATCH = 100
+
+class PipelineError(Exception):
+    """Raised by a pipeline stage to fail the job with a client-facing message"""
+    pass
+
+class JobService:
+    """Runs the resume upload pipeline (extract, skills, enrich, persist) in a local worker pool"""
+
+    def __init__(self, file_service, skill_service, enrichment_service: Optional[EnrichmentService] = None,
+                 artifact_service: Optional[ArtifactService] = None,
+                 analysis_service: Optional[AnalysisService] = None,
+                 retrieval_service: Optional[RetrievalService] = None):
+        self.file_service = file_service
+        self.skill_service = skill_service
+        self.enrichment_service = enrichment_service or EnrichmentService()
+        self.artifact_service = artifact_service or ArtifactService()
+        self.analysis_service = analysis_service or AnalysisService()
+        self.retrieval_service = retrieval_service or RetrievalService()
+        self.stages = [
+            (STAGE_EXTRACT, self._extract),
+            (STAGE_SKILLS, self._extract_skills),
+            (STAGE_ENRICH, self._enrich),
+            (STAGE_PERSIST, self._persist)
+        ]
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._last_sweep = None
+        self._sweep_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the worker pool on first use so it is sized from the app config"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    max_workers = current_app.config.get('JOB_WORKERS', 4)
+                    resume_logger.info(f"Starting upload job pool with {max_workers} workers")
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max_workers,
+                        thread_name_prefix='resume-job'
+                    )
+        return self._executor
+
+    @log_function_call(resume_logger)
+    def create_job(self, user_id: str, file_name: str, stored_name: str,
+                   content_hash: Optional[str] = None) -> ResumeJob:
+        """Record a pending job for an upload and queue it for processing.
+
+        The upload must already be in the content store as ``stored_name``,
+        with a reference the job takes over. A completed job hands the
+        reference to its resume; a failed one releases it.
+        """
+        job = ResumeJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            file_name=file_name,
+            stored_name=stored_name,
+            content_hash=content_hash,
+            status=STATUS_PENDING
+        )
+        db.session.add(job)
+        db.session.commit()
+        resume_logger.info(f"Created upload job {job.id} for user: {user_id}")
+
+        app = current_app._get_current_object()
+        self._get_executor().submit(self._run_job, app, job.id)
+        self._maybe_sweep(app)
+        return job
+
+    def get_job(self, job_id: str, user_id: str) -> Optional[ResumeJob]:
+        """Get a job owned by the given user"""
+        return ResumeJob.query.filter_by(id=job_id, user_id=user_id).first()
+
+    def _set_state(self, job: ResumeJob, status: str, stage: Optional[str] = None, error: Optional[str] = None):
+        job.status = status
+        if stage:
+            job.stage = stage
+        job.error = error
+        db.session.commit()
+
+    def _run_job(self, app, job_id: str):
+        """Worker entry point: run every stage for a job inside its own app context"""
+        with app.app_context():
+            job = db.session.get(ResumeJob, job_id)
+            if not job:
+                resume_logger.error(f"Upload job not found: {job_id}")
+                return
+
+            state = {}
+            # LLM calls of this job wait in the fair queue as the job's owner
+            user_token = llm_user.set(job.user_id)
+            try:
+                stages = self.stages
+                if self._load_cached(job, state):
+                    # Same bytes were processed before: only the per-user rows are needed
+                    stages = [(STAGE_PERSIST, self._persist)]
+
+                for stage, handler in stages:
+                    resume_logger.info(f"Job {job_id}: running stage '{stage}'")
+                    self._set_state(job, STATUS_PROCESSING, stage)
+                    handler(job, state)
+
+                self._set_state(job, STATUS_COMPLETED)
+                resume_logger.info(f"Job {job_id} completed with resume ID: {job.resume_id}")
+
+                if current_app.config.get('ANALYSIS_PRECOMPUTE'):
+                    self._precompute_analysis(job)
+
+            except Exception as e:
+                db.session.rollback()
+                message = str(e) if isinstance(e, PipelineError) else f"Processing failed: {str(e)}"
+                resume_logger.error(f"Job {job_id} failed at stage '{job.stage}': {str(e)}", exc_info=True)
+                try:
+                    job = db.session.get(ResumeJob, job_id)
+                    released = self._release_file(job)
+                    self._set_state(job, STATUS_ERROR, error=message)
+                    if released:
+                        self.file_service.store.purge(job.stored_name)
+                except Exception as state_error:
+                    db.session.rollback()
+                    resume_logger.error(f"Could not record failure for job {job_id}: {str(state_error)}")
+            finally:
+                llm_user.reset(user_token)
+
+    def _maybe_sweep(self, app):
+        """Queue a sweep for lost jobs when the pool starts and then every JOB_SWEEP_INTERVAL seconds"""
+        now = time.monotonic()
+        with self._sweep_lock:
+            if self._last_sweep is not None and now - self._last_sweep < app.config.get('JOB_SWEEP_INTERVAL', 300):
+                return
+            self._last_sweep = now
+        self._get_executor().submit(self._run_sweep, app)
+
+    def _run_sweep(self, app):
+        with app.app_context():
+            try:
+                self.recover_lost_jobs()
+                self.file_service.store.purge_unreferenced()
+            except Exception as e:
+                db.session.rollback()
+                resume_logger.error(f"Lost job sweep failed: {str(e)}", exc_info=True)
+
+    def recover_lost_jobs(self, stale_after: Optional[int] = None) -> int:
+        """Fail unfinished jobs without progress for JOB_STALE_AFTER seconds and release their files.
+
+        Jobs run only in the pool of the process that created them, so a worker
+        restart or deploy drops them with their rows still pending or processing.
+        The threshold is far longer than any pipeline run. Returns the number failed.
+        """
+        stale_after = stale_after or current_app.config.get('JOB_STALE_AFTER', 1800)
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        job_ids = [job_id for (job_id,) in db.session.query(ResumeJob.id).filter(
+            ResumeJob.status.in_(UNFINISHED), ResumeJob.updated_at < cutoff
+        ).limit(SWEEP_BATCH)]
+        db.session.commit()
+
+        failed = 0
+        for job_id in job_ids:
+            job = ResumeJob.query.filter_by(id=job_id).with_for_update().first()
+            # It may have moved on since it was listed
+            if not job or job.status not in UNFINISHED or job.updated_at >= cutoff:
+                db.session.commit()
+                continue
+            released = self._release_file(job)
+            self._set_state(job, STATUS_ERROR, error=LOST_JOB_MESSAGE)
+            if released:
+                self.file_service.store.purge(job.stored_name)
+            resume_logger.warning(f"Failed lost upload job {job_id} (last stage: {job.stage or 'none'})")
+            failed += 1
+        return failed
+
+    def _release_file(self, job: ResumeJob) -> bool:
+        """Drop the failed job's reference to its stored file; committed with the job state, then purged"""
+        if job.resume_id:
+            return False  # The resume was saved and owns the reference
+        return self.file_service.store.release(job.stored_name)
+
+    def _precompute_analysis(self, job: ResumeJob):
+        """Generate the full analysis ahead of the first /analyze request; failures only cost the precompute"""
+        try:
+            resume = db.session.get(Resume, job.resume_id)
+            if resume and resume.extracted_text:
+                self.analysis_service.generate(resume)
+        except Exception as e:
+            db.session.rollback()
+            resume_logger.error(f"Analysis precompute failed for resume {job.resume_id}: {str(e)}")
+
+    def _load_cached(self, job: ResumeJob, state: dict) -> bool:
+        artifact = self.artifact_service.get(job.content_hash)
+        if not artifact:
+            return False
+        state['text'] = artifact.extracted_text
+        state['skills'] = artifact.skills
+        state['education_level'] = artifact.education_level
+        state['years_of_experience'] = artifact.years_of_experience
+        state['cached'] = True
+        return True
+
+    def _extract(self, job: ResumeJob, state: dict):
+        try:
+            text = self.file_service.extract_text(job.stored_name)
+        except ExtractionError as e:
+            raise PipelineError(f'File could not be processed: it {str(e)}')
+        if not text:
+            raise PipelineError('Failed to extract text from file')
+        state['text'] = text
+
+    def _extract_skills(self, job: ResumeJob, state: dict):
+        skills = self.skill_service.extract_skills(state['text'])
+        if not skills:
+            raise PipelineError('No skills found in resume')
+        state['skills'] = skills
+
+    def _enrich(self, job: ResumeJob, state: dict):
+        try:
+            education_level, years_exp = self.enrichment_service.enrich(state['text'])
+        except Exception as e:
+            # Keep the upload usable with the low-confidence local values, but don't cache them
+            resume_logger.error(f"Error extracting education/experience: {str(e)}")
+            local = self.enrichment_service.local_extractor.extract(state['text'])
+            education_level = local['education_level'] or DEFAULT_EDUCATION_LEVEL
+            years_exp = local['years_of_experience']
+            state['degraded'] = True
+        state['education_level'] = education_level
+        state['years_of_experience'] = years_exp
+
+    def _persist(self, job: ResumeJob, state: dict):
+        if not state.get('cached') and not state.get('degraded'):
+            self.artifact_service.save(
+                job.content_hash, state['text'], state['skills'],
+                state['education_level'], state['years_of_experience']
+            )
+        # content_hash references resume_artifacts, so a degraded upload only links an artifact that already exists
+        content_hash = job.content_hash
+        if state.get('degraded') and not self.artifact_service.get(content_hash):
+            content_hash = None
+
+        resume = Resume(
+            file_name=job.file_name,
+            file_path=self.file_service.store.path(job.stored_name),
+            file_type=job.stored_name.rsplit('.', 1)[1].lower(),
+            extracted_text=state['text'],
+            user_id=job.user_id,
+            years_of_experience=state['years_of_experience'],
+            education_level=state['education_level'],
+            content_hash=content_hash
+        )
+        self.retrieval_service.save_chunks(resume)
+        db.session.add(resume)
+        db.session.flush()
+        resume_logger.info(f"Resume record created with ID: {resume.id} ({len(resume.chunks)} chunks)")
+
+        job.resume_id = resume.id
+        job.result = {'skills': state['skills'], 'cached': bool(state.get('cached'))}
+
+        # save_skills commits the resume, its chunks, its skills and the job together
+        self.skill_service.save_skills(resume, state['skills'])
@@ -0,0 +1,304 @@
+import time
+import uuid
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import redis
+from flask import g, has_app_context
+from app.config.config import Config
+from app.services.retrieval_service import estimate_tokens
+from app.utils.errors import APIError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# User on whose behalf LLM calls are made outside a Flask request (ASGI routes, upload jobs)
+llm_user: ContextVar[Optional[str]] = ContextVar('llm_user', default=None)
+
+SYSTEM_USER = 'system'
+
+POLL_MIN_INTERVAL = 0.05  # seconds
+POLL_MAX_INTERVAL = 0.25
+WAITER_TTL = 10  # seconds a waiter stays queued without polling
+
+# Adds a waiter to the fair queue. Its finish tag is the later of the global
+# virtual time and the user's previous finish tag, plus cost / weight.
+ENQUEUE_SCRIPT = """
+local v = tonumber(redis.call('get', KEYS[4]) or '0')
+local last = tonumber(redis.call('hget', KEYS[3], ARGV[2]) or '0')
+local tag = math.max(v, last) + tonumber(ARGV[3]) / tonumber(ARGV[4])
+redis.call('hset', KEYS[3], ARGV[2], tostring(tag))
+redis.call('expire', KEYS[3], 3600)
+redis.call('zadd', KEYS[1], tag, ARGV[1])
+redis.call('zadd', KEYS[2], ARGV[5], ARGV[1])
+return tostring(tag)
+"""
+
+# Admits a queued waiter when a slot is free, it is among the first waiters by
+# finish tag and the token budget of the current minute allows it.
+# Returns 1 when admitted, 0 to keep waiting and -1 if the waiter expired.
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[2])
+redis.call('zremrangebyscore', KEYS[1], '-inf', now)
+local stale = redis.call('zrangebyscore', KEYS[3], '-inf', now)
+for _, token in ipairs(stale) do
+    redis.call('zrem', KEYS[2], token)
+    redis.call('zrem', KEYS[3], token)
+end
+
+local tag = redis.call('zscore', KEYS[2], ARGV[1])
+if not tag then
+    return -1
+end
+redis.call('zadd', KEYS[3], ARGV[8], ARGV[1])
+
+local free = tonumber(ARGV[3]) - redis.call('zcard', KEYS[1])
+if free <= 0 or redis.call('zrank', KEYS[2], ARGV[1]) >= free then
+    return 0
+end
+
+local cost = tonumber(ARGV[5])
+local tpm_limit = tonumber(ARGV[4])
+if tpm_limit > 0 then
+    local used = tonumber(redis.call('get', KEYS[5]) or '0')
+    if used > 0 and used + cost > tpm_limit then
+        return 0
+    end
+    redis.call('incrby', KEYS[5], cost)
+    redis.call('expire', KEYS[5], 120)
+end
+
+redis.call('zadd', KEYS[1], ARGV[6], ARGV[1])
+redis.call('zrem', KEYS[2], ARGV[1])
+redis.call('zrem', KEYS[3], ARGV[1])
+local start = tonumber(tag) - cost / tonumber(ARGV[7])
+if start > tonumber(redis.call('get', KEYS[4]) or '0') then
+    redis.call('set', KEYS[4], tostring(start))
+end
+return 1
+"""
+
+class LLMCapacityError(APIError):
+    """No LLM capacity became available within the queue timeout"""
+    def __init__(self, waited: float):
+        super().__init__(
+            message='The assistant is busy, please try again shortly',
+            status_code=429,
+            error_code='LLM_BUSY',
+            details={'waited': round(waited, 1)}
+        )
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Parse 'user_id=weight,user_id=weight' into a dict"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        user_id, _, weight = item.partition('=')
+        try:
+            weights[user_id.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM user weight: {item}")
+    return weights
+
+def estimate_request_tokens(messages, max_tokens: int) -> int:
+    """Prompt tokens plus the completion budget, the most a request can use"""
+    return sum(estimate_tokens(message.get('content') or '') for message in messages) + max_tokens
+
+def current_llm_user() -> str:
+    """The user an LLM call is made for: llm_user, then g.user_id, then the system user"""
+    user_id = llm_user.get()
+    if user_id is None and has_app_context():
+        user_id = getattr(g, 'user_id', None)
+    return user_id or SYSTEM_USER
+
+class LLMGovernor:
+    """Cluster-wide limit on concurrent LLM calls and tokens per minute.
+
+    Slots and the per-minute token budget live in Redis, so the limits hold
+    across every worker process. Callers wait in a weighted fair queue: each
+    request's finish tag advances its user's virtual clock by its token cost
+    divided by the user's weight, and the smallest tags are admitted first, so
+    a user with a large backlog cannot starve users with a few requests.
+    Redis errors fail open so an outage never blocks LLM calls.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, namespace: str = 'llm_gov',
+                 max_concurrency: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 queue_timeout: Optional[float] = None, lease: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        self.namespace = namespace
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.tokens_per_minute = Config.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.queue_timeout = queue_timeout or Config.LLM_QUEUE_TIMEOUT
+        self.lease = lease or Config.LLM_SLOT_LEASE
+        self.enabled = Config.LLM_GOVERNOR_ENABLED if enabled is None else enabled
+        self.weights = parse_weights(Config.LLM_USER_WEIGHTS)
+        self._redis_url = redis_url or Config.REDIS_URL
+        self._redis = None
+        self._scripts = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'errors': 0, 'wait_seconds': 0.0}
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = redis.from_url(self._redis_url, socket_timeout=1, socket_connect_timeout=1)
+            self._scripts = {
+                'enqueue': self._redis.register_script(ENQUEUE_SCRIPT),
+                'acquire': self._redis.register_script(ACQUIRE_SCRIPT)
+            }
+        return self._redis
+
+    def _count(self, name: str, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _key(self, name: str) -> str:
+        return f"{self.namespace}:{name}"
+
+    def weight_for(self, user_id: str) -> float:
+        return self.weights.get(user_id, 1.0)
+
+    def _enqueue(self, token: str, user_id: str, cost: int, weight: float):
+        client = self.redis
+        self._scripts['enqueue'](
+            keys=[self._key('queue'), self._key('waiters'), self._key('finish'), self._key('vtime')],
+            args=[token, user_id, cost, weight, time.time() + WAITER_TTL],
+            client=client
+        )
+
+    def _try_acquire(self, token: str, cost: int, weight: float) -> int:
+        now = time.time()
+        client = self.redis
+        return int(self._scripts['acquire'](
+            keys=[self._key('holders'), self._key('queue'), self._key('waiters'), self._key('vtime'),
+                  self._key(f'tpm:{int(now // 60)}')],
+            args=[token, now, self.max_concurrency, self.tokens_per_minute, cost,
+                  now + self.lease, weight, now + WAITER_TTL],
+            client=client
+        ))
+
+    def _release(self, token: str):
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zrem(self._key('holders'), token)
+            pipe.zrem(self._key('queue'), token)
+            pipe.zrem(self._key('waiters'), token)
+            pipe.execute()
+        except Exception as e:
+            # Slots expire after the lease, waiters after WAITER_TTL
+            logger.error(f"LLM governor Redis error: {str(e)}")
+            self._count('errors')
+
+    def _poll(self, token: str, user_id: str, cost: int, weight: float) -> bool:
+        """One admission attempt; re-queues a waiter that expired"""
+        result = self._try_acquire(token, cost, weight)
+        if result == -1:
+            self._enqueue(token, user_id, cost, weight)
+        return result == 1
+
+    def _admitted(self, started: float, waited: bool):
+        self._count('admitted')
+        if waited:
+            self._count('queued')
+            self._count('wait_seconds', time.monotonic() - started)
+
+    def _reject(self, token: str, user_id: str, started: float):
+        self._release(token)
+        self._count('rejected')
+        logger.warning(f"LLM capacity wait timed out for user {user_id}")
+        return LLMCapacityError(time.monotonic() - started)
+
+    def _fail_open(self, error: Exception):
+        logger.error(f"LLM governor Redis error, calling without a slot: {str(error)}")
+        self._count('errors')
+
+    @contextmanager
+    def slot(self, cost: int, max_wait: Optional[float] = None):
+        """Hold one cluster-wide LLM slot for the block, waiting for it in the fair queue"""
+        token = self.acquire(cost, max_wait)
+        try:
+            yield
+        finally:
+            if token:
+                self._release(token)
+
+    def acquire(self, cost: int, max_wait: Optional[float] = None) -> Optional[str]:
+        """Wait for a slot; returns its token, or None when the governor is disabled or unavailable"""
+        if not self.enabled:
+            return None
+        user_id, token = current_llm_user(), uuid.uuid4().hex
+        weight = self.weight_for(user_id)
+        started = time.monotonic()
+        deadline = started + min(self.queue_timeout, max_wait or self.queue_timeout)
+        delay = POLL_MIN_INTERVAL
+        try:
+            self._enqueue(token, user_id, cost, weight)
+            while not self._poll(token, user_id, cost, weight):
+                if time.monotonic() >= deadline:
+                    raise self._reject(token, user_id, started)
+                time.sleep(delay)
+                delay = min(delay * 1.5, POLL_MAX_INTERVAL)
+        except redis.RedisError as e:
+            self._fail_open(e)
+            return None
+        self._admitted(started, delay > POLL_MIN_INTERVAL)
+        return token
+
+    @asynccontextmanager
+    async def slot_async(self, cost: int, max_wait: Optional[float] = None):
+        """Async counterpart of slot; the Redis client is synchronous with short timeouts"""
+        token = await self.acquire_async(cost, max_wait)
+        try:
+            yield
+        finally:
+            if token:
+                await asyncio.to_thread(self._release, token)
+
+    async def acquire_async(self, cost: int, max_wait: Optional[float] = None) -> Optional[str]:
+        if not self.enabled:
+            return None
+        user_id, token = current_llm_user(), uuid.uuid4().hex
+        weight = self.weight_for(user_id)
+        started = time.monotonic()
+        deadline = started + min(self.queue_timeout, max_wait or self.queue_timeout)
+        delay = POLL_MIN_INTERVAL
+        try:
+            await asyncio.to_thread(self._enqueue, token, user_id, cost, weight)
+            while not await asyncio.to_thread(self._poll, token, user_id, cost, weight):
+                if time.monotonic() >= deadline:
+                    raise await asyncio.to_thread(self._reject, token, user_id, started)
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, POLL_MAX_INTERVAL)
+        except redis.RedisError as e:
+            self._fail_open(e)
+            return None
+        except asyncio.CancelledError:
+            # Leave the queue (or give back a slot admitted just before cancellation)
+            await asyncio.shield(asyncio.to_thread(self._release, token))
+            raise
+        self._admitted(started, delay > POLL_MIN_INTERVAL)
+        return token
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 2)
+        stats.update(enabled=self.enabled, max_concurrency=self.max_concurrency,
+                     tokens_per_minute=self.tokens_per_minute)
+        if self.enabled:
+            try:
+                now = time.time()
+                pipe = self.redis.pipeline()
+                pipe.zcount(self._key('holders'), now, '+inf')
+                pipe.zcard(self._key('queue'))
+                pipe.get(self._key(f'tpm:{int(now // 60)}'))
+                active, waiting, used = pipe.execute()
+                stats.update(active=active, waiting=waiting, tokens_this_minute=int(used or 0))
+            except Exception as e:
+                logger.error(f"LLM governor Redis error: {str(e)}")
+        return stats
+
+# Create global LLM governor instance
+llm_governor = LLMGovernor()
@@ -0,0 +1,403 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Optional
+import openai
+from app.services.llm_governor import llm_user, current_llm_user
+from app.utils.errors import APIError
+from app.utils.logger import resume_logger
+
+class CircuitOpenError(APIError):
+    """OpenAI calls are being rejected while the circuit breaker is open"""
+    def __init__(self, retry_in: float):
+        super().__init__(
+            message='OpenAI is temporarily unavailable, please try again shortly',
+            status_code=503,
+            error_code='CIRCUIT_OPEN',
+            details={'retry_in': round(retry_in, 1)}
+        )
+
+class DeadlineExceededError(APIError):
+    """An OpenAI call did not finish within its deadline, retries included"""
+    def __init__(self, deadline: float):
+        super().__init__(
+            message=f'OpenAI did not respond within {deadline:g} seconds',
+            status_code=504,
+            error_code='DEADLINE_EXCEEDED'
+        )
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, 429s and 5xx responses are worth retrying"""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in (408, 409)
+
+def is_provider_failure(error: Exception) -> bool:
+    """Errors that suggest the provider is degraded (counted by the circuit breaker)"""
+    return is_retryable(error) and not isinstance(error, openai.RateLimitError)
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header, if the error carries one"""
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after')) if response is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class CircuitBreaker:
+    """Closed -> open after consecutive provider failures -> half-open after a cooldown.
+
+    While open every call fails immediately. In half-open a single probe call
+    is let through; its outcome closes or re-opens the circuit.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._times_opened = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._state == self.CLOSED
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may be made now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.cooldown:
+                    raise CircuitOpenError(self.cooldown - waited)
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                resume_logger.info('OpenAI circuit breaker closed')
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    resume_logger.warning(
+                        f'OpenAI circuit breaker opened after {self._failures} failures, '
+                        f'failing fast for {self.cooldown:g}s'
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def record_abandoned(self):
+        """A call was cancelled before finishing, so it says nothing about the provider"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def state(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == self.OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'times_opened': self._times_opened,
+                'retry_in': round(retry_in, 1)
+            }
+
+class LatencyTracker:
+    """Rolling window of call latencies per kind of call"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def observe(self, kind: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, kind: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> dict:
+        with self._lock:
+            kinds = list(self._samples)
+        return {
+            kind: {'p50': self.percentile(kind, 50), 'p95': self.percentile(kind, 95), 'p99': self.percentile(kind, 99)}
+            for kind in kinds
+        }
+
+class LLMResilience:
+    """Deadlines, retries, hedging and a circuit breaker for OpenAI calls.
+
+    Each call gets an overall deadline (OPENAI_DEADLINE) shared by all of its
+    attempts; every attempt is capped at OPENAI_TIMEOUT and whatever is left of
+    the deadline. Retryable errors are retried up to OPENAI_MAX_RETRIES times
+    with full-jitter exponential backoff (honouring Retry-After). With
+    OPENAI_HEDGE_ENABLED, an attempt still running after the
+    OPENAI_HEDGE_PERCENTILE latency of its kind gets a duplicate and the first
+    response wins. One instance is shared per process by the sync and async
+    OpenAI services, so they see the same breaker.
+    """
+
+    def __init__(self):
+        self.deadline = float(os.getenv('OPENAI_DEADLINE', '90'))
+        self.attempt_timeout = float(os.getenv('OPENAI_TIMEOUT', '60'))
+        self.max_retries = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+        self.retry_base_delay = float(os.getenv('OPENAI_RETRY_BASE_DELAY', '0.5'))
+        self.retry_max_delay = float(os.getenv('OPENAI_RETRY_MAX_DELAY', '8'))
+        self.hedge_enabled = os.getenv('OPENAI_HEDGE_ENABLED', 'false').lower() == 'true'
+        self.hedge_percentile = float(os.getenv('OPENAI_HEDGE_PERCENTILE', '95'))
+        self.hedge_min_delay = float(os.getenv('OPENAI_HEDGE_MIN_DELAY', '2'))
+        self.hedge_min_samples = int(os.getenv('OPENAI_HEDGE_MIN_SAMPLES', '20'))
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('OPENAI_BREAKER_FAILURES', '5')),
+            cooldown=float(os.getenv('OPENAI_BREAKER_COOLDOWN', '30'))
+        )
+        self.latencies = LatencyTracker()
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'rejected': 0,
+                       'deadline_exceeded': 0, 'failures': 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Rebuilt after a fork, like the OpenAI client itself
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=int(os.getenv('OPENAI_POOL_SIZE', '20')), thread_name_prefix='openai-hedge'
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """Seconds after which an attempt gets a hedged duplicate, or None while latencies are unknown"""
+        latency = self.latencies.percentile(kind, self.hedge_percentile, self.hedge_min_samples)
+        return None if latency is None else max(latency, self.hedge_min_delay)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1)))
+        hinted = retry_after(error)
+        return max(delay, min(hinted, self.retry_max_delay)) if hinted else delay
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._count('deadline_exceeded')
+            raise DeadlineExceededError(self.deadline)
+        return min(self.attempt_timeout, remaining)
+
+    def _record(self, kind: str, started: float, error: Optional[BaseException]):
+        if error is None:
+            self.breaker.record_success()
+            self.latencies.observe(kind, time.monotonic() - started)
+        elif isinstance(error, Exception) and is_provider_failure(error):
+            self.breaker.record_failure()
+        elif isinstance(error, Exception) and not isinstance(error, APIError):
+            # The provider answered (e.g. a 400), so it is not degraded
+            self.breaker.record_success()
+        else:
+            self.breaker.record_abandoned()
+
+    def _should_retry(self, error: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Backoff delay before the next attempt, or None to give up"""
+        if not is_retryable(error) or attempt > self.max_retries:
+            return None
+        delay = self._backoff(attempt, error)
+        if time.monotonic() + delay >= deadline:
+            return None
+        self._count('retries')
+        resume_logger.warning(
+            f'OpenAI call failed ({type(error).__name__}), retry {attempt}/{self.max_retries} in {delay:.2f}s'
+        )
+        return delay
+
+    def _give_up(self, error: Exception, deadline: float) -> Exception:
+        self._count('failures')
+        if isinstance(error, openai.APITimeoutError) and time.monotonic() >= deadline:
+            self._count('deadline_exceeded')
+            return DeadlineExceededError(self.deadline)
+        return error
+
+    # Synchronous path
+
+    def call(self, fn: Callable[[float], Any], kind: str = 'default', hedge: bool = True) -> Any:
+        """Run fn(timeout) with the deadline, retry, hedging and breaker policies"""
+        self._count('calls')
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                if hedge and self.hedge_enabled:
+                    return self._hedged(fn, kind, deadline)
+                return self._attempt(fn, kind, deadline)
+            except CircuitOpenError:
+                self._count('rejected')
+                raise
+            except DeadlineExceededError:
+                self._count('failures')
+                raise
+            except Exception as e:
+                attempt += 1
+                delay = self._should_retry(e, attempt, deadline)
+                if delay is None:
+                    raise self._give_up(e, deadline) from e
+                time.sleep(delay)
+
+    def _attempt(self, fn: Callable[[float], Any], kind: str, deadline: float) -> Any:
+        timeout = self._attempt_timeout(deadline)
+        self.breaker.allow()
+        started = time.monotonic()
+        try:
+            result = fn(timeout)
+        except BaseException as e:
+            self._record(kind, started, e)
+            raise
+        self._record(kind, started, None)
+        return result
+
+    def _submit(self, executor: ThreadPoolExecutor, user: str, fn: Callable[[float], Any], kind: str, deadline: float):
+        context = contextvars.copy_context()
+        context.run(llm_user.set, user)
+        return executor.submit(context.run, self._attempt, fn, kind, deadline)
+
+    def _hedged(self, fn: Callable[[float], Any], kind: str, deadline: float) -> Any:
+        delay = self.hedge_delay(kind)
+        if delay is None or time.monotonic() + delay >= deadline:
+            return self._attempt(fn, kind, deadline)
+
+        # Pool threads see neither the caller's contextvars nor Flask g, so each
+        # attempt runs in a copy of the caller's context with the user resolved
+        user = current_llm_user()
+        executor = self._get_executor()
+        first = self._submit(executor, user, fn, kind, deadline)
+        done, _ = wait([first], timeout=delay)
+        if done or not self.breaker.closed:
+            return first.result()
+
+        self._count('hedges')
+        second = self._submit(executor, user, fn, kind, deadline)
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count('hedge_wins')
+                    # The other attempt cannot be interrupted; its result is discarded
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # Asynchronous path
+
+    async def call_async(self, fn: Callable[[float], Awaitable[Any]], kind: str = 'default', hedge: bool = True) -> Any:
+        """Async counterpart of call; losing hedged attempts are cancelled"""
+        self._count('calls')
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                if hedge and self.hedge_enabled:
+                    return await self._hedged_async(fn, kind, deadline)
+                return await self._attempt_async(fn, kind, deadline)
+            except CircuitOpenError:
+                self._count('rejected')
+                raise
+            except DeadlineExceededError:
+                self._count('failures')
+                raise
+            except Exception as e:
+                attempt += 1
+                delay = self._should_retry(e, attempt, deadline)
+                if delay is None:
+                    raise self._give_up(e, deadline) from e
+                await asyncio.sleep(delay)
+
+    async def _attempt_async(self, fn: Callable[[float], Awaitable[Any]], kind: str, deadline: float) -> Any:
+        timeout = self._attempt_timeout(deadline)
+        self.breaker.allow()
+        started = time.monotonic()
+        try:
+            result = await fn(timeout)
+        except BaseException as e:
+            self._record(kind, started, e)
+            raise
+        self._record(kind, started, None)
+        return result
+
+    async def _hedged_async(self, fn: Callable[[float], Awaitable[Any]], kind: str, deadline: float) -> Any:
+        delay = self.hedge_delay(kind)
+        if delay is None or time.monotonic() + delay >= deadline:
+            return await self._attempt_async(fn, kind, deadline)
+
+        first = asyncio.ensure_future(self._attempt_async(fn, kind, deadline))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self.breaker.closed:
+            return await first
+
+        self._count('hedges')
+        second = asyncio.ensure_future(self._attempt_async(fn, kind, deadline))
+        pending, error = {first, second}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def state(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            'circuit_breaker': self.breaker.state(),
+            'stats': stats,
+            'latency': self.latencies.summary(),
+            'hedging': self.hedge_enabled,
+            'deadline': self.deadline,
+            'max_retries': self.max_retries
+        }
+
+# Create global resilience policy instance
+llm_resilience = LLMResilience()
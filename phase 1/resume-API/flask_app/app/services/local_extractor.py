@@ -0,0 +1,173 @@
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.services.retrieval_service import split_sections
+
+# Highest level first; abbreviations need dots or a following "in"/"of" to avoid
+# matching e.g. "MS Office" or "Scrum Master"
+EDUCATION_PATTERNS = [
+    ("PhD", re.compile(r"\b(ph\.?\s?d|d\.phil|doctor of philosophy|doctorate|doctoral)(?![a-z])", re.I)),
+    ("Master's", re.compile(
+        r"\b(master['’]?s|masters|master of|m\.sc|msc|m\.s\.|m\.a\.|mba|m\.eng|meng|m\.tech|mtech|m\.phil|mphil|ms in)(?![a-z])", re.I)),
+    ("Bachelor's", re.compile(
+        r"\b(bachelor['’]?s|bachelors|bachelor of|b\.sc|bsc|b\.s\.|b\.a\.|b\.eng|beng|b\.tech|btech|bba|bs in|ba in|undergraduate degree)(?![a-z])", re.I)),
+    ("Associate's", re.compile(r"\b(associate['’]?s degree|associate degree|associate of (arts|science|applied science)|a\.a\.s\.)", re.I)),
+    ("High School", re.compile(r"\b(high school|secondary school|ged|a-levels?|o-levels?|gcse)(?![a-z])", re.I)),
+]
+
+# Degree mentions that may not be completed
+IN_PROGRESS_PATTERN = re.compile(r"\b(pursuing|candidate|expected|in progress|ongoing|currently studying)\b", re.I)
+
+# Roles that do not count as full-time professional experience
+EXCLUDED_ROLE_PATTERN = re.compile(r"\b(intern|internship|part[- ]time|volunteer|volunteering|freelance|teaching assistant)\b", re.I)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH_NAME = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_YEAR = r"(?:19|20)\d{2}"
+
+def _date_pattern(prefix: str) -> str:
+    return (
+        rf"(?:(?P<{prefix}_month>0?[1-9]|1[0-2])\s*[/.\-]\s*(?P<{prefix}_year>{_YEAR})"
+        rf"|(?P<{prefix}_month_name>{_MONTH_NAME})\s*,?\s*(?P<{prefix}_name_year>{_YEAR})"
+        rf"|(?P<{prefix}_year_only>{_YEAR}))"
+    )
+
+DATE_RANGE_PATTERN = re.compile(
+    rf"(?<![\d/]){_date_pattern('start')}\s*(?:-|–|—|to|until|till)\s*"
+    rf"(?:(?P<present>present|current|now|today|date)|{_date_pattern('end')})(?![\d/])",
+    re.I
+)
+
+EXPERIENCE_SECTIONS = {'experience'}
+SKIPPED_SECTIONS = {'education', 'certifications', 'volunteering', 'awards', 'publications', 'projects'}
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or touching [start, end) month intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def years_from_intervals(intervals: List[Tuple[int, int]]) -> float:
+    """Total years covered by month intervals, overlaps counted once, rounded to 0.5"""
+    months = sum(end - start for start, end in merge_intervals(intervals))
+    return round(months / 12 * 2) / 2
+
+def month_index(year: int, month: int) -> int:
+    return year * 12 + (month - 1)
+
+def current_month_index() -> int:
+    now = datetime.now()
+    return month_index(now.year, now.month)
+
+class LocalResumeExtractor:
+    """Rule-based education level and years-of-experience extraction.
+
+    Each value comes with a confidence in [0, 1] so callers can fall back to the
+    LLM only for resumes the rules cannot read reliably.
+    """
+
+    def extract_education(self, text: str, sections: Optional[List[Tuple[str, str]]] = None) -> Tuple[Optional[str], float]:
+        """Return (highest education level or None, confidence)"""
+        sections = sections if sections is not None else split_sections(text)
+        education_text = '\n'.join(body for section, body in sections if section == 'education')
+        has_section = bool(education_text)
+
+        for level, pattern in EDUCATION_PATTERNS:
+            match = pattern.search(education_text) if has_section else None
+            in_section = match is not None
+            if not match:
+                match = pattern.search(text)
+            if not match:
+                continue
+
+            confidence = 0.9 if in_section else 0.6
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_end = text.find('\n', match.end())
+            line = text[line_start:line_end if line_end != -1 else len(text)]
+            if IN_PROGRESS_PATTERN.search(line):
+                confidence = 0.5
+            return level, confidence
+
+        # An education section without any recognisable degree is ambiguous
+        return None, 0.3 if has_section else 0.2
+
+    def _parse_date(self, match, prefix: str, is_end: bool) -> Tuple[Optional[int], bool]:
+        """Return (month index, month known); end dates are exclusive"""
+        if match.group(f'{prefix}_year'):
+            year, month, exact = int(match.group(f'{prefix}_year')), int(match.group(f'{prefix}_month')), True
+        elif match.group(f'{prefix}_name_year'):
+            year, exact = int(match.group(f'{prefix}_name_year')), True
+            month = MONTHS[match.group(f'{prefix}_month_name').lower()[:3]]
+        elif match.group(f'{prefix}_year_only'):
+            # Unknown month: January for starts, December for ends
+            year, month, exact = int(match.group(f'{prefix}_year_only')), (12 if is_end else 1), False
+        else:
+            return None, False
+        return month_index(year, month) + (1 if is_end else 0), exact
+
+    def extract_intervals(self, text: str) -> Tuple[List[Tuple[int, int]], int, int]:
+        """Return (month intervals, year-only ranges, rejected ranges) for full-time roles in text"""
+        intervals, approximate, rejected = [], 0, 0
+        now = current_month_index()
+        lines = text.splitlines()
+        for number, line in enumerate(lines):
+            for match in DATE_RANGE_PATTERN.finditer(line):
+                context = line
+                if number and not re.search(r'[a-z]{3}', DATE_RANGE_PATTERN.sub('', line), re.I):
+                    # Dates on a line of their own describe the role on the line above
+                    context += ' ' + lines[number - 1]
+                if EXCLUDED_ROLE_PATTERN.search(context):
+                    continue
+
+                start, start_exact = self._parse_date(match, 'start', is_end=False)
+                if match.group('present'):
+                    end, end_exact = now + 1, True
+                else:
+                    end, end_exact = self._parse_date(match, 'end', is_end=True)
+                if start is None or end is None or start >= end or start > now:
+                    rejected += 1
+                    continue
+
+                if not (start_exact and end_exact):
+                    approximate += 1
+                intervals.append((start, min(end, now + 1)))
+        return intervals, approximate, rejected
+
+    def extract_experience(self, text: str, sections: Optional[List[Tuple[str, str]]] = None) -> Tuple[float, float]:
+        """Return (years of full-time experience with overlaps merged, confidence)"""
+        sections = sections if sections is not None else split_sections(text)
+        experience_text = '\n'.join(body for section, body in sections if section in EXPERIENCE_SECTIONS)
+        in_section = bool(experience_text)
+        if not in_section:
+            # No recognised heading: use everything except sections whose dates are not jobs
+            experience_text = '\n'.join(body for section, body in sections if section not in SKIPPED_SECTIONS)
+
+        intervals, approximate, rejected = self.extract_intervals(experience_text)
+        if not intervals:
+            return 0.0, 0.3
+
+        years = years_from_intervals(intervals)
+        confidence = 0.9 if in_section else 0.6
+        confidence -= 0.1 * min(approximate, 2)
+        confidence -= 0.2 * min(rejected, 2)
+        if years > 50:
+            confidence = 0.1
+        return years, round(max(confidence, 0.0), 2)
+
+    def extract(self, text: str) -> dict:
+        sections = split_sections(text)
+        education_level, education_confidence = self.extract_education(text, sections)
+        years_of_experience, experience_confidence = self.extract_experience(text, sections)
+        return {
+            'education_level': education_level,
+            'education_confidence': education_confidence,
+            'years_of_experience': years_of_experience,
+            'experience_confidence': experience_confidence
+        }
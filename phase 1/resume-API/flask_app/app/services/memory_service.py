@@ -0,0 +1,105 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from app import db
+from app.config.config import Config
+from app.models.resume import ChatHistory, ChatMemory
+from app.services.retrieval_service import estimate_tokens
+from app.utils.logger import resume_logger
+
+SUMMARY_SYSTEM_MESSAGE = """You maintain a running summary of a conversation between a user and an assistant about one resume.
+Merge the new turns into the existing summary. Keep the user's goals, preferences, facts established about the resume and the advice already given.
+Drop pleasantries and repetition. Write plain prose in at most 120 words."""
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens estimated tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max_tokens * 4].rstrip() + ' ...'
+
+class MemoryService:
+    """Bounded conversation memory for resume chats.
+
+    Prompts carry the last CHAT_MEMORY_TURNS turns verbatim (each side capped at
+    CHAT_MEMORY_TURN_TOKENS) plus one rolling summary of everything older, so
+    their size does not grow with the length of the chat. The summary is only
+    recomputed when turns slide out of the verbatim window.
+    """
+
+    def __init__(self, turns: Optional[int] = None, turn_tokens: Optional[int] = None,
+                 summary_tokens: Optional[int] = None, fold_batch: Optional[int] = None):
+        self.turns = turns or Config.CHAT_MEMORY_TURNS
+        self.turn_tokens = turn_tokens or Config.CHAT_MEMORY_TURN_TOKENS
+        self.summary_tokens = summary_tokens or Config.CHAT_MEMORY_SUMMARY_TOKENS
+        self.fold_batch = fold_batch or Config.CHAT_MEMORY_FOLD_BATCH
+
+    def format_messages(self, summary: Optional[str], window: List[ChatHistory]) -> List[dict]:
+        """Chat messages for a summary and a verbatim window (oldest turn first)"""
+        messages = []
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation about this resume:\n{truncate_tokens(summary, self.summary_tokens)}"
+            })
+        for turn in sorted(window, key=lambda turn: turn.id):
+            messages.append({"role": "user", "content": truncate_tokens(turn.question, self.turn_tokens)})
+            messages.append({"role": "assistant", "content": truncate_tokens(turn.answer, self.turn_tokens)})
+        return messages
+
+    def build_messages(self, resume, window: List[ChatHistory]) -> List[dict]:
+        memory = db.session.get(ChatMemory, resume.id)
+        return self.format_messages(memory.summary if memory else None, window)
+
+    def window_query(self, resume_id: int) -> Select:
+        """The verbatim window, newest turn first"""
+        return select(ChatHistory).where(ChatHistory.resume_id == resume_id)\
+            .order_by(ChatHistory.created_at.desc()).limit(self.turns)
+
+    def overflow_query(self, resume_id: int, memory: Optional[ChatMemory], window: List[ChatHistory]) -> Optional[Select]:
+        """Turns that have left the window but are not in the summary yet; None while the window is not full"""
+        if len(window) < self.turns:
+            return None
+        return select(ChatHistory).where(
+            ChatHistory.resume_id == resume_id,
+            ChatHistory.id > (memory.summarized_until_id if memory else 0),
+            ChatHistory.id < min(turn.id for turn in window)
+        ).order_by(ChatHistory.id).limit(self.fold_batch)
+
+    def fold(self, resume_id: int, memory: Optional[ChatMemory], summary: str, overflow: List[ChatHistory]) -> ChatMemory:
+        """Record the new summary; returns the memory row, which is new if memory was None"""
+        if not memory:
+            memory = ChatMemory(resume_id=resume_id)
+        memory.summary = summary
+        memory.summarized_until_id = overflow[-1].id
+        return memory
+
+    def summary_messages(self, summary: Optional[str], turns: List[ChatHistory]) -> List[dict]:
+        """Prompt that merges turns into the existing summary"""
+        transcript = '\n\n'.join(
+            f"User: {truncate_tokens(turn.question, self.turn_tokens)}\n"
+            f"Assistant: {truncate_tokens(turn.answer, self.turn_tokens)}"
+            for turn in turns
+        )
+        return [
+            {"role": "system", "content": SUMMARY_SYSTEM_MESSAGE},
+            {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+        ]
+
+    def _summarize(self, summary: Optional[str], turns: List[ChatHistory]) -> str:
+        from app.services.chatbot_service import get_openai_service
+        return get_openai_service().create_chat_completion(
+            self.summary_messages(summary, turns), max_tokens=self.summary_tokens, temperature=0.2
+        )
+
+    def update(self, resume, window: List[ChatHistory]):
+        """Fold turns that have left the verbatim window into the rolling summary"""
+        memory = db.session.get(ChatMemory, resume.id)
+        query = self.overflow_query(resume.id, memory, window)
+        overflow = db.session.execute(query).scalars().all() if query is not None else []
+        if not overflow:
+            return
+
+        summary = self._summarize(memory.summary if memory else None, overflow)
+        db.session.add(self.fold(resume.id, memory, summary, overflow))
+        db.session.commit()
+        resume_logger.info(f"Folded {len(overflow)} chat turns into the summary for resume {resume.id}")
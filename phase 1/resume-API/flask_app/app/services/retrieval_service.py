@@ -0,0 +1,255 @@
+import math
+import re
+from collections import Counter
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Select
+from app import db
+from app.config.config import Config
+from app.models.resume import ResumeChunk
+from app.utils.logger import resume_logger
+
+HEADER_SECTION = 'header'
+
+# Heading text (lowercased, punctuation removed) -> canonical section name
+SECTION_HEADINGS = {
+    'summary': 'summary', 'professional summary': 'summary', 'profile': 'summary',
+    'professional profile': 'summary', 'about me': 'summary', 'objective': 'summary',
+    'career objective': 'summary',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'career history': 'experience', 'relevant experience': 'experience',
+    'education': 'education', 'academic background': 'education', 'qualifications': 'education',
+    'academic qualifications': 'education', 'education and training': 'education',
+    'skills': 'skills', 'technical skills': 'skills', 'key skills': 'skills', 'core competencies': 'skills',
+    'competencies': 'skills', 'expertise': 'skills', 'skills and tools': 'skills',
+    'projects': 'projects', 'personal projects': 'projects', 'key projects': 'projects',
+    'certifications': 'certifications', 'certificates': 'certifications', 'courses': 'certifications',
+    'licenses and certifications': 'certifications', 'training': 'certifications',
+    'awards': 'awards', 'achievements': 'awards', 'honors': 'awards', 'honours': 'awards',
+    'awards and achievements': 'awards',
+    'publications': 'publications', 'research': 'publications',
+    'languages': 'languages',
+    'interests': 'interests', 'hobbies': 'interests', 'hobbies and interests': 'interests',
+    'volunteering': 'volunteering', 'volunteer experience': 'volunteering',
+    'references': 'references',
+    'contact': 'contact', 'contact information': 'contact',
+}
+
+# Question words that point at a section even when the chunk text does not repeat them
+SECTION_HINTS = {
+    'experience': {'experience', 'job', 'jobs', 'role', 'roles', 'work', 'worked', 'company', 'companies',
+                   'employer', 'career', 'position', 'responsibilities'},
+    'education': {'education', 'degree', 'university', 'college', 'school', 'studied', 'study', 'gpa',
+                  'graduated', 'graduation', 'academic', 'qualification', 'qualifications'},
+    'skills': {'skill', 'skills', 'technologies', 'technology', 'stack', 'tools', 'programming',
+               'proficient', 'competencies'},
+    'projects': {'project', 'projects', 'built', 'portfolio'},
+    'certifications': {'certification', 'certifications', 'certificate', 'certified', 'course', 'courses'},
+    'awards': {'award', 'awards', 'achievement', 'achievements', 'honor', 'honors'},
+    'summary': {'summary', 'profile', 'objective', 'overview'},
+    'languages': {'languages', 'speak', 'fluent'},
+    HEADER_SECTION: {'name', 'contact', 'email', 'phone', 'location', 'linkedin'},
+}
+SECTION_HINT_BOOST = 1.5
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'did', 'for', 'from', 'has',
+    'have', 'how', 'i', 'in', 'is', 'it', 'its', 'me', 'my', 'of', 'on', 'or', 'so', 'that', 'the',
+    'their', 'this', 'to', 'was', 'were', 'what', 'when', 'where', 'which', 'who', 'why', 'with',
+    'would', 'you', 'your', 'should', 'could', 'any', 'about', 'resume', 'cv', 'candidate', 'they'
+}
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+def estimate_tokens(text: str) -> int:
+    """Approximate OpenAI token count (about four characters per token for English)"""
+    return math.ceil(len(text) / 4)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms for lexical scoring; keeps names like c++, c# and node.js intact"""
+    terms = (term.rstrip('.-') for term in re.findall(r"[a-z0-9][a-z0-9+#.\-]*", text.lower()))
+    return [term for term in terms if term and term not in STOPWORDS]
+
+def _heading_section(line: str) -> Optional[str]:
+    candidate = ' '.join(re.sub(r'[^a-z& ]', '', line.lower()).replace('&', 'and').split())
+    if not candidate or len(candidate) > 40:
+        return None
+    return SECTION_HEADINGS.get(candidate)
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split resume text on recognised headings into (section, body) pairs, in order"""
+    sections = []
+    current, lines = HEADER_SECTION, []
+    for line in text.splitlines():
+        section = _heading_section(line) if line.strip() else None
+        if section:
+            body = '\n'.join(lines).strip()
+            if body:
+                sections.append((current, body))
+            current, lines = section, []
+        else:
+            lines.append(line)
+    body = '\n'.join(lines).strip()
+    if body:
+        sections.append((current, body))
+    return sections
+
+def _pieces(text: str, max_tokens: int) -> Iterator[str]:
+    """Yield paragraphs, falling back to lines and then words for oversized ones"""
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if estimate_tokens(line) <= max_tokens:
+                yield line
+                continue
+            words, length = [], 0
+            for word in line.split():
+                if words and math.ceil((length + len(word)) / 4) > max_tokens:
+                    yield ' '.join(words)
+                    words, length = [], 0
+                words.append(word)
+                length += len(word) + 1
+            if words:
+                yield ' '.join(words)
+
+def build_chunks(text: str, max_tokens: int) -> List[dict]:
+    """Split resume text into section-labelled chunks of at most about max_tokens each"""
+    chunks = []
+    for section, body in split_sections(text):
+        current, size = [], 0
+        for piece in _pieces(body, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and size + tokens > max_tokens:
+                chunks.append((section, '\n'.join(current)))
+                current, size = [], 0
+            current.append(piece)
+            size += tokens
+        if current:
+            chunks.append((section, '\n'.join(current)))
+    return [
+        {'position': position, 'section': section, 'content': content, 'token_count': estimate_tokens(content)}
+        for position, (section, content) in enumerate(chunks)
+    ]
+
+def score_chunks(chunks: List[ResumeChunk], question: str) -> List[float]:
+    """BM25 score of each chunk for the question, plus a boost for sections the question names"""
+    terms = set(tokenize(question))
+    docs = [Counter(tokenize(chunk.content)) for chunk in chunks]
+    lengths = [sum(doc.values()) for doc in docs]
+    average_length = (sum(lengths) / len(docs)) if docs else 0
+    document_frequency = Counter(term for doc in docs for term in doc if term in terms)
+    hinted = {section for section, words in SECTION_HINTS.items() if terms & words}
+
+    scores = []
+    for chunk, doc, length in zip(chunks, docs, lengths):
+        score = 0.0
+        for term in terms:
+            frequency = doc.get(term)
+            if not frequency:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            norm = 1 - BM25_B + BM25_B * (length / average_length if average_length else 1)
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+        if chunk.section in hinted:
+            score += SECTION_HINT_BOOST
+        scores.append(score)
+    return scores
+
+def select_chunks(chunks: List[ResumeChunk], question: str, token_budget: int) -> List[ResumeChunk]:
+    """Pick the highest scoring chunks that fit the budget, returned in resume order"""
+    scores = score_chunks(chunks, question)
+    if any(scores):
+        order = sorted(range(len(chunks)), key=lambda i: (-scores[i], chunks[i].position))
+    else:
+        # Nothing matched (e.g. "summarize this"): keep the start of the resume
+        order = range(len(chunks))
+
+    selected, used = [], 0
+    for index in order:
+        if used + chunks[index].token_count > token_budget:
+            continue
+        selected.append(chunks[index])
+        used += chunks[index].token_count
+    return sorted(selected, key=lambda chunk: chunk.position)
+
+def format_chunks(chunks: List[ResumeChunk]) -> str:
+    """Join chunks, labelling each run of chunks from the same section"""
+    parts, previous = [], None
+    for chunk in chunks:
+        if chunk.section != previous:
+            parts.append(f"[{chunk.section.replace('_', ' ').title()}]")
+            previous = chunk.section
+        parts.append(chunk.content)
+    return '\n'.join(parts)
+
+class RetrievalService:
+    """Builds per-question resume context from chunks stored at upload.
+
+    Short resumes are sent whole. Longer ones are reduced to the chunks that
+    best match the question (BM25 plus section hints) within
+    CHAT_CONTEXT_TOKEN_BUDGET estimated tokens.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, chunk_tokens: Optional[int] = None):
+        self.token_budget = token_budget or Config.CHAT_CONTEXT_TOKEN_BUDGET
+        self.chunk_tokens = chunk_tokens or Config.CHAT_CHUNK_TOKENS
+
+    def make_chunks(self, text: str, resume_id: Optional[int] = None) -> List[ResumeChunk]:
+        return [ResumeChunk(resume_id=resume_id, **chunk) for chunk in build_chunks(text or '', self.chunk_tokens)]
+
+    def chunks_query(self, resume_id: int) -> Select:
+        return select(ResumeChunk).where(ResumeChunk.resume_id == resume_id).order_by(ResumeChunk.position)
+
+    def save_chunks(self, resume) -> List[ResumeChunk]:
+        """Replace the resume's chunks; the caller commits"""
+        resume.chunks = self.make_chunks(resume.extracted_text)
+        return resume.chunks
+
+    def get_chunks(self, resume) -> List[ResumeChunk]:
+        if resume.chunks or not resume.extracted_text:
+            return resume.chunks
+        # Resumes uploaded before chunking existed are chunked on their first question
+        self.save_chunks(resume)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent question stored them first
+            db.session.rollback()
+            db.session.refresh(resume)
+        return resume.chunks
+
+    def build_context(self, resume, question: str) -> Tuple[str, bool]:
+        """Return (context, is_excerpt) for the question"""
+        text = resume.extracted_text or ''
+        if not self.needs_excerpt(text):
+            return text, False
+
+        return self.context_from_chunks(resume.id, text, self.get_chunks(resume), question)
+
+    def needs_excerpt(self, text: str) -> bool:
+        return estimate_tokens(text) > self.token_budget
+
+    def context_from_chunks(self, resume_id: int, text: str, chunks: List[ResumeChunk], question: str) -> Tuple[str, bool]:
+        """Best chunks for the question within the budget, or the whole text if none fit"""
+        selected = select_chunks(chunks, question, self.token_budget)
+        if not selected:
+            return text, False
+
+        resume_logger.info(
+            f"Using {len(selected)} of {len(chunks)} chunks for resume {resume_id} "
+            f"(~{sum(chunk.token_count for chunk in selected)} of ~{estimate_tokens(text)} tokens)"
+        )
+        return format_chunks(selected), True
@@ -0,0 +1,246 @@
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import redis
+from app.config.config import Config
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Deletes the lock only if this caller still owns it
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+POLL_MIN_INTERVAL = 0.05  # seconds
+POLL_MAX_INTERVAL = 0.5
+
+class _Call:
+    """An in-flight call that other threads in this process can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one upstream call.
+
+    Within a process, callers with the same key wait for the first one (the
+    leader) and share its result or exception. Across processes the leader
+    also takes a Redis lock (SET NX EX) and publishes its result under a short
+    lived result key that the other processes poll for. Redis errors fail open:
+    each process then only coalesces its own callers.
+    Results must be JSON serializable.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, namespace: str = 'llm_flight',
+                 lock_ttl: Optional[int] = None, result_ttl: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl or Config.SINGLE_FLIGHT_LOCK_TTL
+        self.result_ttl = result_ttl or Config.SINGLE_FLIGHT_RESULT_TTL
+        self.enabled = Config.SINGLE_FLIGHT_ENABLED if enabled is None else enabled
+        self._redis_url = redis_url or Config.REDIS_URL
+        self._redis = None
+        self._release = None
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        self._stats = {'leader_calls': 0, 'local_shared': 0, 'remote_shared': 0, 'timeouts': 0, 'errors': 0}
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = redis.from_url(self._redis_url, socket_timeout=1, socket_connect_timeout=1)
+            self._release = self._redis.register_script(RELEASE_SCRIPT)
+        return self._redis
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def make_key(self, **parts) -> str:
+        material = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _keys(self, key: str) -> Tuple[str, str]:
+        return f"{self.namespace}:lock:{key}", f"{self.namespace}:result:{key}"
+
+    # Redis steps, shared by the sync and async paths
+
+    def _get_result(self, result_key: str) -> Tuple[bool, Any]:
+        try:
+            raw = self.redis.get(result_key)
+        except Exception as e:
+            logger.error(f"Single-flight Redis error: {str(e)}")
+            self._count('errors')
+            return False, None
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    def _try_acquire(self, lock_key: str, token: str) -> Optional[bool]:
+        """True if we now hold the lock, False if another process does, None if Redis is unavailable"""
+        try:
+            return bool(self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl))
+        except Exception as e:
+            logger.error(f"Single-flight Redis error: {str(e)}")
+            self._count('errors')
+            return None
+
+    def _publish(self, lock_key: str, result_key: str, token: str, result: Any):
+        try:
+            self.redis.set(result_key, json.dumps(result), ex=self.result_ttl)
+        except Exception as e:
+            logger.error(f"Single-flight Redis error: {str(e)}")
+            self._count('errors')
+        self._unlock(lock_key, token)
+
+    def _unlock(self, lock_key: str, token: str):
+        try:
+            client = self.redis
+            self._release(keys=[lock_key], args=[token], client=client)
+        except Exception as e:
+            # The lock still expires after lock_ttl
+            logger.error(f"Single-flight Redis error: {str(e)}")
+            self._count('errors')
+
+    def _timed_out(self, key: str, deadline: float) -> bool:
+        if time.monotonic() < deadline:
+            return False
+        logger.warning(f"Timed out waiting for in-flight call {key[:12]}, calling upstream directly")
+        self._count('timeouts')
+        return True
+
+    # Synchronous (Flask) path
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return fn(), sharing one call among all concurrent callers with the same key"""
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._count('local_shared')
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_distributed(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _do_distributed(self, key: str, fn: Callable[[], Any]) -> Any:
+        lock_key, result_key = self._keys(key)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+        delay = POLL_MIN_INTERVAL
+        while True:
+            found, result = self._get_result(result_key)
+            if found:
+                self._count('remote_shared')
+                return result
+
+            acquired = self._try_acquire(lock_key, token)
+            if acquired is None or self._timed_out(key, deadline):
+                return fn()
+            if acquired:
+                self._count('leader_calls')
+                try:
+                    result = fn()
+                except Exception:
+                    # Waiting processes see the lock disappear and one of them retries
+                    self._unlock(lock_key, token)
+                    raise
+                self._publish(lock_key, result_key, token, result)
+                return result
+
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_INTERVAL)
+
+    # Asynchronous (ASGI) path; the Redis client is synchronous with short timeouts
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of do for callers on an event loop"""
+        if not self.enabled:
+            return await fn()
+
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if leader:
+                # A separate task so a disconnecting leader does not cancel the call for the others
+                task = self._tasks[task_key] = loop.create_task(self._do_distributed_async(key, fn))
+                task.add_done_callback(lambda done: self._task_done(task_key, done))
+
+        if not leader:
+            self._count('local_shared')
+        return await asyncio.shield(task)
+
+    def _task_done(self, task_key, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every waiter has gone away
+            task.exception()
+
+    async def _do_distributed_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key, result_key = self._keys(key)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+        delay = POLL_MIN_INTERVAL
+        while True:
+            found, result = await asyncio.to_thread(self._get_result, result_key)
+            if found:
+                self._count('remote_shared')
+                return result
+
+            acquired = await asyncio.to_thread(self._try_acquire, lock_key, token)
+            if acquired is None or self._timed_out(key, deadline):
+                return await fn()
+            if acquired:
+                self._count('leader_calls')
+                try:
+                    result = await fn()
+                except BaseException:
+                    await asyncio.to_thread(self._unlock, lock_key, token)
+                    raise
+                await asyncio.to_thread(self._publish, lock_key, result_key, token, result)
+                return result
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_INTERVAL)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls) + len(self._tasks)
+        stats['enabled'] = self.enabled
+        return stats
+
+# Create global single-flight instance
+single_flight = SingleFlight()
@@ -0,0 +1,142 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+def _is_word_char(ch: str) -> bool:
+    """Mirror the regex \\w class for str patterns"""
+    return ch.isalnum() or ch == '_'
+
+class SkillMatcher:
+    """Aho-Corasick automaton that finds every taxonomy skill in one pass over the text.
+
+    Matching is case-insensitive and applies the same word-boundary rule as the
+    ``\\b<skill>\\b`` regex it replaces, so results are identical to running one
+    regex per skill. Skills listed under several categories are scanned once.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]], version: Optional[str] = None):
+        self.version = version
+        self.categories = list(taxonomy.keys())
+
+        # One pattern per distinct lowercase skill, mapped back to (category, skill) entries
+        self._patterns: List[str] = []
+        self._entries: List[List[Tuple[str, str]]] = []
+        index: Dict[str, int] = {}
+        for category, skills in taxonomy.items():
+            for skill in skills:
+                key = skill.lower()
+                if not key:
+                    continue
+                if key not in index:
+                    index[key] = len(self._patterns)
+                    self._patterns.append(key)
+                    self._entries.append([])
+                entry = (category, skill)
+                if entry not in self._entries[index[key]]:
+                    self._entries[index[key]].append(entry)
+
+        # Whether each pattern starts/ends with a word character, for the \b check
+        self._word_edges = [(_is_word_char(p[0]), _is_word_char(p[-1])) for p in self._patterns]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compiled tables as plain JSON-serialisable data"""
+        return {
+            'version': self.version,
+            'categories': self.categories,
+            'patterns': self._patterns,
+            'entries': self._entries,
+            'goto': self._goto,
+            'fail': self._fail,
+            'out': self._out
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SkillMatcher':
+        """Rebuild a matcher from to_dict() output without recompiling; raises ValueError if it is inconsistent"""
+        matcher = cls.__new__(cls)
+        matcher.version = data['version']
+        matcher.categories = [str(category) for category in data['categories']]
+        matcher._patterns = [str(pattern) for pattern in data['patterns']]
+        matcher._entries = [[(str(category), str(skill)) for category, skill in entries] for entries in data['entries']]
+        matcher._goto = [{str(ch): int(child) for ch, child in node.items()} for node in data['goto']]
+        matcher._fail = [int(state) for state in data['fail']]
+        matcher._out = [[int(pattern_id) for pattern_id in ids] for ids in data['out']]
+
+        states, patterns = len(matcher._goto), len(matcher._patterns)
+        if not matcher._goto or len(matcher._fail) != states or len(matcher._out) != states \
+                or len(matcher._entries) != patterns or not all(matcher._patterns) \
+                or any(not 0 <= child < states for node in matcher._goto for child in node.values()) \
+                or any(not 0 <= state < states for state in matcher._fail) \
+                or any(not 0 <= pattern_id < patterns for ids in matcher._out for pattern_id in ids) \
+                or any(category not in matcher.categories for entries in matcher._entries for category, _ in entries):
+            raise ValueError('Inconsistent skill matcher tables')
+        matcher._word_edges = [(_is_word_char(p[0]), _is_word_char(p[-1])) for p in matcher._patterns]
+        return matcher
+
+    def _build(self):
+        """Build the trie, then failure links and merged outputs breadth-first"""
+        goto: List[Dict[str, int]] = [{}]
+        fail: List[int] = [0]
+        out: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self._patterns):
+            node = 0
+            for ch in pattern:
+                child = goto[node].get(ch)
+                if child is None:
+                    child = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                    goto[node][ch] = child
+                node = child
+            out[node].append(pattern_id)
+
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def _has_boundaries(self, text: str, start: int, end: int, pattern_id: int) -> bool:
+        starts_word, ends_word = self._word_edges[pattern_id]
+        before = start > 0 and _is_word_char(text[start - 1])
+        after = end < len(text) and _is_word_char(text[end])
+        return before != starts_word and ends_word != after
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return matched skills keyed by category, omitting empty categories"""
+        text_lower = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+
+        node = 0
+        for i, ch in enumerate(text_lower):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in out[node]:
+                if pattern_id in found:
+                    continue
+                start = i + 1 - len(self._patterns[pattern_id])
+                if self._has_boundaries(text_lower, start, i + 1, pattern_id):
+                    found.add(pattern_id)
+
+        result: Dict[str, List[str]] = {category: [] for category in self.categories}
+        for pattern_id in sorted(found):
+            for category, skill in self._entries[pattern_id]:
+                result[category].append(skill)
+        return {k: v for k, v in result.items() if v}
@@ -1,72 +1,77 @@
 from app import db
 from app.models.resume import Skill, ResumeSkill
-from typing import Dict, List
-import re
+from typing import Dict, List, Optional
+import threading
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from app.utils.logger import skill_logger, log_function_call
+from app.services.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy
 
 class SkillService:
-    def __init__(self):
-        # Define skill categories and their patterns
-        self.skill_patterns = {
-            "technical_skills": [
-                "Python", "JavaScript", "Java", "C++", "SQL", "React", "Angular",
-                "Node.js", "Docker", "Kubernetes", "AWS", "Azure", "Git",
-                "Machine Learning", "Data Science", "AI", "DevOps", "CI/CD",
-                "HTML", "CSS", "TypeScript", "Ruby", "PHP", "Swift", "Kotlin",
-                "Go", "Rust", "R", "Scala", "MongoDB", "PostgreSQL", "MySQL",
-                "Redis", "GraphQL", "REST API", "Microservices", "Linux", "Unix"
-            ],
-            "soft_skills": [
-                "Leadership", "Communication", "Teamwork", "Problem Solving",
-                "Time Management", "Project Management", "Analytical Skills",
-                "Critical Thinking", "Adaptability", "Creativity", "Collaboration",
-                "Organization", "Decision Making", "Presentation", "Negotiation",
-                "Mentoring", "Conflict Resolution", "Strategic Planning"
-            ],
-            "tools": [
-                "Microsoft Office", "Excel", "PowerPoint", "Photoshop",
-                "Illustrator", "JIRA", "Slack", "Trello", "GitHub", "BitBucket",
-                "VS Code", "Visual Studio", "IntelliJ", "Eclipse", "Postman",
-                "Jenkins", "Travis CI", "CircleCI", "AWS Tools", "Azure DevOps",
-                "Google Cloud Platform", "Kubernetes", "Docker", "Git"
-            ]
-        }
+    def __init__(self, taxonomy: Optional[SkillTaxonomy] = None):
+        # Skill categories come from the versioned taxonomy file and hot-reload on change
+        self.taxonomy = taxonomy or get_skill_taxonomy()
+        
+        # Process-local skill name -> id cache; skill rows are never renamed
+        self._skill_ids: Dict[str, int] = {}
+        self._skill_ids_lock = threading.Lock()
+
+    @property
+    def skill_patterns(self) -> Dict[str, List[str]]:
+        """Current category -> skill names mapping"""
+        return self.taxonomy.categories
 
     @log_function_call(skill_logger)
     def extract_skills(self, text: str) -> Dict[str, List[str]]:
-        """Extract skills from text using pattern matching"""
+        """Extract skills from text using the precompiled skill matcher"""
         if not text:
             skill_logger.warning("Empty text provided for skill extraction")
             return {}
 
-        # Initialize results dictionary
-        skills = {
-            "technical_skills": set(),
-            "soft_skills": set(),
-            "tools": set()
-        }
-        
-        # Convert text to lowercase for case-insensitive matching
-        text_lower = text.lower()
         skill_logger.info(f"Processing text of length: {len(text)}")
         
-        # Extract skills from each category
-        for category, skill_list in self.skill_patterns.items():
-            skill_logger.debug(f"Processing category: {category}")
-            for skill in skill_list:
-                # Create a regex pattern that matches whole words
-                pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-                if re.search(pattern, text_lower):
-                    skills[category].add(skill)
-                    skill_logger.debug(f"Found skill: {skill} in category: {category}")
-        
-        # Convert sets to lists for JSON serialization
-        result = {k: list(v) for k, v in skills.items() if v}
+        # Single pass over the text for every skill in every category
+        matcher = self.taxonomy.get_matcher()
+        result = matcher.match(text)
+        skill_logger.debug(f"Matched with taxonomy version: {matcher.version}")
         skill_logger.info(f"Extracted skills: {result}")
         return result
 
+    def resolve_skill_ids(self, skill_categories: Dict[str, str]) -> Dict[str, int]:
+        """Map skill names to ids, creating missing skills, in at most three statements.
+
+        Ids of skills inserted here are only valid once the caller commits.
+        """
+        with self._skill_ids_lock:
+            skill_ids = {name: self._skill_ids[name] for name in skill_categories if name in self._skill_ids}
+
+        missing = [name for name in skill_categories if name not in skill_ids]
+        if missing:
+            rows = db.session.execute(
+                select(Skill.id, Skill.name).where(Skill.name.in_(missing))
+            ).all()
+            skill_ids.update({name: skill_id for skill_id, name in rows})
+
+        missing = [name for name in skill_categories if name not in skill_ids]
+        if missing:
+            skill_logger.info(f"Creating {len(missing)} new skills: {missing}")
+            stmt = insert(Skill).values([
+                {'name': name, 'category': skill_categories[name]} for name in missing
+            ]).on_conflict_do_nothing(index_elements=['name']).returning(Skill.id, Skill.name)
+            rows = db.session.execute(stmt).all()
+            skill_ids.update({name: skill_id for skill_id, name in rows})
+
+            # Skills created concurrently by another transaction are not returned
+            raced = [name for name in missing if name not in skill_ids]
+            if raced:
+                rows = db.session.execute(
+                    select(Skill.id, Skill.name).where(Skill.name.in_(raced))
+                ).all()
+                skill_ids.update({name: skill_id for skill_id, name in rows})
+
+        return skill_ids
+
     @log_function_call(skill_logger)
     def save_skills(self, resume, extracted_skills: Dict[str, List[str]]):
         """Save extracted skills to database"""
@@ -74,58 +79,40 @@ class SkillService:
             skill_logger.info(f"Starting to save skills for resume ID: {resume.id}")
             skill_logger.debug(f"Extracted skills to save: {extracted_skills}")
             
-            with db.session.no_autoflush:
-                # Keep track of processed skills to avoid duplicates
-                processed_skills = set()
-                
-                for category, skills in extracted_skills.items():
-                    skill_logger.info(f"Processing category: {category} with {len(skills)} skills")
-                    
-                    for skill_name in skills:
-                        if skill_name in processed_skills:
-                            skill_logger.debug(f"Skipping duplicate skill: {skill_name}")
-                            continue
-                            
-                        processed_skills.add(skill_name)
-                        
-                        # Check if skill already exists
-                        skill = Skill.query.filter_by(name=skill_name).first()
-                        if not skill:
-                            # Create new skill
-                            skill_logger.info(f"Creating new skill: {skill_name}")
-                            skill = Skill(name=skill_name, category=category)
-                            db.session.add(skill)
-                            db.session.flush()
-                        
-                        # Check if resume-skill association already exists
-                        existing_association = ResumeSkill.query.filter(
-                            and_(
-                                ResumeSkill.resume_id == resume.id,
-                                ResumeSkill.skill_id == skill.id
-                            )
-                        ).first()
-                        
-                        if not existing_association:
-                            # Create new resume-skill association
-                            skill_logger.info(f"Creating new resume-skill association for: {skill_name}")
-                            resume_skill = ResumeSkill(
-                                resume_id=resume.id,
-                                skill_id=skill.id,
-                                confidence_score=0.8
-                            )
-                            db.session.add(resume_skill)
-                        else:
-                            skill_logger.debug(f"Skill association already exists for: {skill_name}")
-                
-                skill_logger.info("Committing skill changes to database")
-                db.session.commit()
-                skill_logger.info("Successfully saved all skills")
+            # First category wins for skills listed under several categories
+            skill_categories = {}
+            for category, skills in extracted_skills.items():
+                for skill_name in skills:
+                    skill_categories.setdefault(skill_name, category)
+
+            skill_ids = {}
+            if skill_categories:
+                skill_ids = self.resolve_skill_ids(skill_categories)
+
+                # One multi-row insert for all resume-skill associations
+                stmt = insert(ResumeSkill).values([
+                    {'resume_id': resume.id, 'skill_id': skill_id, 'confidence_score': 0.8}
+                    for skill_id in dict.fromkeys(skill_ids.values())
+                ]).on_conflict_do_nothing(index_elements=['resume_id', 'skill_id'])
+                db.session.execute(stmt)
+                skill_logger.info(f"Linked {len(skill_ids)} skills to resume ID: {resume.id}")
+
+            skill_logger.info("Committing skill changes to database")
+            db.session.commit()
+            
+            # Only cache ids once any newly inserted skills are committed
+            with self._skill_ids_lock:
+                self._skill_ids.update(skill_ids)
+            skill_logger.info("Successfully saved all skills")
                 
         except IntegrityError as e:
             db.session.rollback()
+            # A cached id may point at a deleted skill; start fresh next time
+            with self._skill_ids_lock:
+                self._skill_ids.clear()
             skill_logger.error(f"IntegrityError while saving skills: {str(e)}", exc_info=True)
             raise
         except Exception as e:
             db.session.rollback()
             skill_logger.error(f"Error saving skills: {str(e)}", exc_info=True)
-            raise 
\ No newline at end of file
+            raise
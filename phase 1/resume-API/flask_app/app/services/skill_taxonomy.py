@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Optional
+from app.services.skill_matcher import SkillMatcher
+from app.utils.logger import skill_logger
+
+class SkillTaxonomy:
+    """Versioned skill taxonomy loaded from a JSON file.
+
+    The compiled SkillMatcher tables are cached in ``cache_dir`` as JSON per
+    taxonomy version so new workers skip compilation; the cache is plain data,
+    so a tampered file cannot run code. The file is re-checked at most every
+    ``reload_interval`` seconds; when its content changes, the new matcher is
+    built off to the side and swapped in with a single reference assignment,
+    so in-flight requests keep using the matcher they started with.
+    """
+
+    def __init__(self, path: str, cache_dir: Optional[str] = None, reload_interval: float = 30.0):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._mtime = None
+        self._digest = None
+        self._last_check = 0.0
+        self._categories: Dict[str, List[str]] = {}
+        self._matcher: Optional[SkillMatcher] = None
+        self.reload(force=True)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._matcher.version if self._matcher else None
+
+    @property
+    def categories(self) -> Dict[str, List[str]]:
+        """Current category -> skill names mapping"""
+        self._maybe_reload()
+        return self._categories
+
+    def get_matcher(self) -> SkillMatcher:
+        """Get the compiled matcher for the current taxonomy version"""
+        self._maybe_reload()
+        return self._matcher
+
+    def all_skills(self) -> List[str]:
+        """Distinct skill names across all categories, in taxonomy order"""
+        seen = {}
+        for skills in self.categories.values():
+            for skill in skills:
+                seen.setdefault(skill, None)
+        return list(seen)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        # Only one thread checks; others keep serving the current matcher
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_check = now
+            self._reload_locked(force=False)
+        except Exception as e:
+            skill_logger.error(f"Failed to reload skill taxonomy, keeping version {self.version}: {str(e)}", exc_info=True)
+        finally:
+            self._reload_lock.release()
+
+    def reload(self, force: bool = False):
+        """Reload the taxonomy file if it changed (or unconditionally with force)"""
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            self._reload_locked(force)
+
+    def _reload_locked(self, force: bool):
+        mtime = os.stat(self.path).st_mtime_ns
+        if not force and mtime == self._mtime:
+            return
+
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if not force and digest == self._digest:
+            self._mtime = mtime
+            return
+
+        data = json.loads(raw)
+        categories = data.get('categories')
+        if not isinstance(categories, dict) or not categories:
+            raise ValueError(f"Skill taxonomy {self.path} has no categories")
+        version = str(data.get('version') or digest[:12])
+
+        matcher = self._load_cached_matcher(version, digest)
+        if matcher is None:
+            skill_logger.info(f"Compiling skill matcher for taxonomy version {version}")
+            matcher = SkillMatcher(categories, version=version)
+            self._store_cached_matcher(matcher, digest)
+
+        # Publish the new version: readers see either the old or the new matcher
+        self._categories = categories
+        self._matcher = matcher
+        self._mtime = mtime
+        self._digest = digest
+        skill_logger.info(f"Loaded skill taxonomy version {version} with {len(matcher)} skills")
+
+    def _cache_path(self, version: str, digest: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        safe_version = "".join(c if c.isalnum() or c in '.-_' else '_' for c in version)
+        return os.path.join(self.cache_dir, f"skill_matcher-{safe_version}-{digest[:16]}.json")
+
+    def _load_cached_matcher(self, version: str, digest: str) -> Optional[SkillMatcher]:
+        cache_path = self._cache_path(version, digest)
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('taxonomy_digest') == digest and data.get('version') == version:
+                matcher = SkillMatcher.from_dict(data)
+                skill_logger.info(f"Loaded compiled skill matcher from {cache_path}")
+                return matcher
+        except Exception as e:
+            skill_logger.warning(f"Ignoring unreadable skill matcher cache {cache_path}: {str(e)}")
+        return None
+
+    def _store_cached_matcher(self, matcher: SkillMatcher, digest: str):
+        cache_path = self._cache_path(matcher.version, digest)
+        if not cache_path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and rename so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(dict(matcher.to_dict(), taxonomy_digest=digest), f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+            skill_logger.info(f"Stored compiled skill matcher at {cache_path}")
+        except Exception as e:
+            skill_logger.warning(f"Could not store skill matcher cache: {str(e)}")
+            if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+_default_taxonomy: Optional[SkillTaxonomy] = None
+_default_lock = threading.Lock()
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy configured from Config"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        with _default_lock:
+            if _default_taxonomy is None:
+                from app.config.config import Config
+                _default_taxonomy = SkillTaxonomy(
+                    Config.SKILL_TAXONOMY_PATH,
+                    cache_dir=Config.SKILL_CACHE_DIR,
+                    reload_interval=Config.SKILL_TAXONOMY_RELOAD_INTERVAL
+                )
+    return _default_taxonomy
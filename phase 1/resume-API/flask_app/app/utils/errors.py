@@ -74,6 +74,26 @@ class FileUploadError(APIError):
             details=details
         )
 
+class FileTooLargeError(APIError):
+    """Upload exceeds the size limit"""
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=413,
+            error_code='FILE_TOO_LARGE',
+            details=details
+        )
+
+class UnsupportedFileTypeError(APIError):
+    """Upload is not one of the accepted file types"""
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            status_code=415,
+            error_code='UNSUPPORTED_FILE_TYPE',
+            details=details
+        )
+
 def register_error_handlers(app):
     """Register error handlers for the application"""
     
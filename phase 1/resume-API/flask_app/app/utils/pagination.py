@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from flask import current_app
+from .errors import ValidationError
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque URL-safe token"""
+    payload = json.dumps({'c': created_at.isoformat(), 'i': row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a cursor token; returns None for the first page"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload['c']), int(payload['i'])
+    except Exception:
+        raise ValidationError('Invalid pagination cursor')
+
+def get_page_size(value: Any) -> int:
+    """Parse a requested page size, applying the configured default and cap"""
+    default = current_app.config.get('DEFAULT_PAGE_SIZE', 50)
+    maximum = current_app.config.get('MAX_PAGE_SIZE', 200)
+    if value in (None, ''):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError('Page size must be an integer')
+    if size < 1:
+        raise ValidationError('Page size must be positive')
+    return min(size, maximum)
+
+def is_truthy(value: Any) -> bool:
+    """Interpret a query-string or JSON flag"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
@@ -0,0 +1,15 @@
+"""ASGI entry point.
+
+/api/chat/ask and /api/chat/analyze/<id> are served by async handlers that
+await OpenAI and PostgreSQL, so a single worker keeps many LLM requests in
+flight. All other routes run in the regular Flask app on a thread pool.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+
+wsgi.py remains available for running everything synchronously under gunicorn.
+"""
+from app import create_app
+from app.aio.app import create_asgi_app
+
+flask_app = create_app()
+app = create_asgi_app(flask_app)
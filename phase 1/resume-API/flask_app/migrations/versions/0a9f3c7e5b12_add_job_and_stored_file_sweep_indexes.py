@@ -0,0 +1,35 @@
+"""Add partial indexes for the lost job and unreferenced file sweeps
+
+Revision ID: 0a9f3c7e5b12
+Revises: b7d3e9a1c524
+Create Date: 2025-03-20 14:05:17.402913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9f3c7e5b12'
+down_revision = 'b7d3e9a1c524'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_resume_jobs_unfinished_updated_at', 'resume_jobs', ['updated_at'],
+                        unique=False, postgresql_where=sa.text("status IN ('pending', 'processing')"),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_stored_files_unreferenced', 'stored_files', ['content_hash'],
+                        unique=False, postgresql_where=sa.text('ref_count <= 0'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_stored_files_unreferenced', table_name='stored_files',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_resume_jobs_unfinished_updated_at', table_name='resume_jobs',
+                      postgresql_concurrently=True, if_exists=True)
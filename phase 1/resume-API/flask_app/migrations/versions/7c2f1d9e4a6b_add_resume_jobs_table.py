@@ -0,0 +1,43 @@
+"""Add resume_jobs table for background upload processing
+
+Revision ID: 7c2f1d9e4a6b
+Revises: 048892429d8e
+Create Date: 2025-03-04 10:12:45.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2f1d9e4a6b'
+down_revision = '048892429d8e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=128), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('stored_name', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('stage', sa.String(length=20), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('resume_id', sa.Integer(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resume_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_resume_jobs_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_resume_jobs_user_id')
+
+    op.drop_table('resume_jobs')
@@ -0,0 +1,47 @@
+"""Add resume_artifacts table and content hashes for upload deduplication
+
+Revision ID: a41d5e8c2b90
+Revises: 7c2f1d9e4a6b
+Create Date: 2025-03-06 14:27:09.551023
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41d5e8c2b90'
+down_revision = '7c2f1d9e4a6b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_artifacts',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('extracted_text', sa.Text(), nullable=False),
+    sa.Column('skills', sa.JSON(), nullable=False),
+    sa.Column('education_level', sa.String(length=50), nullable=True),
+    sa.Column('years_of_experience', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_resumes_content_hash', ['content_hash'], unique=False)
+        batch_op.create_foreign_key('fk_resumes_content_hash', 'resume_artifacts', ['content_hash'], ['content_hash'])
+
+    with op.batch_alter_table('resume_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('resume_jobs', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
+
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_resumes_content_hash', type_='foreignkey')
+        batch_op.drop_index('ix_resumes_content_hash')
+        batch_op.drop_column('content_hash')
+
+    op.drop_table('resume_artifacts')
@@ -0,0 +1,32 @@
+"""Add stored_files table for the content-addressed upload store
+
+Revision ID: b7d3e9a1c524
+Revises: f4c81e2b9d06
+Create Date: 2025-03-18 10:12:41.730264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e9a1c524'
+down_revision = 'f4c81e2b9d06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_files',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('stored_name', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+
+def downgrade():
+    op.drop_table('stored_files')
@@ -0,0 +1,49 @@
+"""Add indexes for hot query paths
+
+Revision ID: c5e8b3f71d24
+Revises: a41d5e8c2b90
+Create Date: 2025-03-11 09:41:52.106387
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8b3f71d24'
+down_revision = 'a41d5e8c2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Every resume route filters on user_id; list/filter also sort by (created_at, id)
+        op.create_index('ix_resumes_user_id_created_at_id', 'resumes',
+                        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_resumes_user_id_experience_education', 'resumes',
+                        ['user_id', 'years_of_experience', 'education_level'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_resume_skills_skill_id', 'resume_skills', ['skill_id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_chat_history_resume_id_created_at', 'chat_history',
+                        ['resume_id', 'created_at'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_skills_name_lower', 'skills', [sa.text('lower(name)')],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_skills_name_lower', table_name='skills',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_chat_history_resume_id_created_at', table_name='chat_history',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_resume_skills_skill_id', table_name='resume_skills',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_resumes_user_id_experience_education', table_name='resumes',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_resumes_user_id_created_at_id', table_name='resumes',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,43 @@
+"""Add resume_analyses table for stored resume analyses
+
+Revision ID: d91a6f0c3e57
+Revises: c5e8b3f71d24
+Create Date: 2025-03-13 15:08:36.774120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91a6f0c3e57'
+down_revision = 'c5e8b3f71d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_analyses',
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('prompt_version', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('analysis', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+    with op.batch_alter_table('resume_analyses', schema=None) as batch_op:
+        batch_op.create_index('ix_resume_analyses_text_hash', ['text_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resume_analyses', schema=None) as batch_op:
+        batch_op.drop_index('ix_resume_analyses_text_hash')
+
+    op.drop_table('resume_analyses')
@@ -0,0 +1,35 @@
+"""Add resume_chunks table for section-aware chat retrieval
+
+Revision ID: e6b2a8d4f153
+Revises: d91a6f0c3e57
+Create Date: 2025-03-14 10:21:09.415307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b2a8d4f153'
+down_revision = 'd91a6f0c3e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_chunks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('section', sa.String(length=50), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('token_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('resume_id', 'position', name='uq_resume_chunks_resume_id_position')
+    )
+
+
+def downgrade():
+    op.drop_table('resume_chunks')
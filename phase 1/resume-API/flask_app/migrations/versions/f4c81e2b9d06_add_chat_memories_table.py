@@ -0,0 +1,32 @@
+"""Add chat_memories table for rolling conversation summaries
+
+Revision ID: f4c81e2b9d06
+Revises: e6b2a8d4f153
+Create Date: 2025-03-14 16:47:52.208613
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c81e2b9d06'
+down_revision = 'e6b2a8d4f153'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_memories',
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_until_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+
+
+def downgrade():
+    op.drop_table('chat_memories')
@@ -0,0 +1,198 @@
+"""Benchmark the hot route queries with and without the hot-path indexes.
+
+Seeds a synthetic dataset into an already migrated PostgreSQL database, then
+runs EXPLAIN ANALYZE for each route's query twice: once with the indexes from
+migration c5e8b3f71d24 dropped ("before") and once with them created ("after").
+
+Usage:
+    python scripts/benchmark_indexes.py --database-url postgresql://localhost/resume_analyzer_bench \\
+        --users 50 --resumes-per-user 2000
+
+Only point this at a scratch database: it drops and recreates indexes, and the
+seeded rows (user ids prefixed with ``bench-user-``) are deleted afterwards
+unless --keep-data is given.
+"""
+import argparse
+import json
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+BENCH_USER_PREFIX = 'bench-user-'
+
+# Mirrors migrations/versions/c5e8b3f71d24_add_hot_path_indexes.py
+INDEXES = {
+    'ix_resumes_user_id_created_at_id':
+        'CREATE INDEX IF NOT EXISTS ix_resumes_user_id_created_at_id ON resumes (user_id, created_at DESC, id DESC)',
+    'ix_resumes_user_id_experience_education':
+        'CREATE INDEX IF NOT EXISTS ix_resumes_user_id_experience_education ON resumes (user_id, years_of_experience, education_level)',
+    'ix_resume_skills_skill_id':
+        'CREATE INDEX IF NOT EXISTS ix_resume_skills_skill_id ON resume_skills (skill_id)',
+    'ix_chat_history_resume_id_created_at':
+        'CREATE INDEX IF NOT EXISTS ix_chat_history_resume_id_created_at ON chat_history (resume_id, created_at)',
+    'ix_skills_name_lower':
+        'CREATE INDEX IF NOT EXISTS ix_skills_name_lower ON skills (lower(name))',
+}
+
+# One query per route, as issued by app/routes
+QUERIES = {
+    'GET /api/resumes/list': ("""
+        SELECT id, file_name, file_type, created_at
+        FROM resumes
+        WHERE user_id = :user_id
+        ORDER BY created_at DESC, id DESC
+        LIMIT 51
+    """, {}),
+    'GET /api/resumes/<id> (ownership check)': ("""
+        SELECT * FROM resumes WHERE id = :resume_id AND user_id = :user_id
+    """, {}),
+    'POST /api/resumes/filter': ("""
+        SELECT r.id, r.file_name, r.created_at, r.years_of_experience, r.education_level,
+               count(*) OVER () AS total
+        FROM resumes r
+        WHERE r.user_id = :user_id
+          AND r.years_of_experience >= 2 AND r.years_of_experience <= 8
+          AND r.education_level IN ('Bachelor''s', 'Master''s')
+          AND EXISTS (
+              SELECT 1 FROM resume_skills rs JOIN skills s ON s.id = rs.skill_id
+              WHERE rs.resume_id = r.id AND lower(s.name) IN ('python', 'docker')
+          )
+        ORDER BY r.created_at DESC, r.id DESC
+        LIMIT 51
+    """, {}),
+    'POST /api/resumes/filter (skill lookup)': ("""
+        SELECT rs.resume_id FROM resume_skills rs JOIN skills s ON s.id = rs.skill_id
+        WHERE lower(s.name) = 'python'
+    """, {}),
+    'GET /api/chat/history/<id>': ("""
+        SELECT id, question, answer, created_at
+        FROM chat_history
+        WHERE resume_id = :resume_id
+        ORDER BY created_at DESC
+    """, {}),
+}
+
+def seed(conn, users: int, resumes_per_user: int, skills: int, chats_per_resume: int):
+    """Insert synthetic skills, resumes, resume skills and chat history with generate_series"""
+    print(f"Seeding {users} users x {resumes_per_user} resumes, {skills} skills ...")
+    conn.execute(text("""
+        INSERT INTO skills (name, category, created_at)
+        SELECT CASE g WHEN 1 THEN 'Python' WHEN 2 THEN 'Docker' ELSE 'Bench Skill ' || g END,
+               (ARRAY['technical_skills', 'soft_skills', 'tools'])[1 + g % 3], now()
+        FROM generate_series(1, :skills) AS g
+        ON CONFLICT (name) DO NOTHING
+    """), {'skills': skills})
+    conn.execute(text("""
+        INSERT INTO resumes (file_name, file_path, file_type, extracted_text, user_id,
+                             created_at, updated_at, years_of_experience, education_level)
+        SELECT 'resume_' || r || '.pdf', 'uploads/resume_' || r || '.pdf', 'pdf',
+               repeat('lorem ipsum dolor sit amet ', 200),
+               :prefix || u,
+               now() - (random() * interval '730 days'), now(),
+               round((random() * 20)::numeric, 1),
+               (ARRAY['High School', 'Associate''s', 'Bachelor''s', 'Master''s', 'PhD'])[1 + floor(random() * 5)::int]
+        FROM generate_series(1, :users) AS u, generate_series(1, :per_user) AS r
+    """), {'prefix': BENCH_USER_PREFIX, 'users': users, 'per_user': resumes_per_user})
+    conn.execute(text("""
+        INSERT INTO resume_skills (resume_id, skill_id, confidence_score, created_at)
+        SELECT DISTINCT r.id, s.id, 0.8, now()
+        FROM resumes r
+        CROSS JOIN LATERAL (
+            SELECT id FROM skills ORDER BY random() + (r.id * 0) LIMIT 12
+        ) s
+        WHERE r.user_id LIKE :pattern
+        ON CONFLICT DO NOTHING
+    """), {'pattern': BENCH_USER_PREFIX + '%'})
+    conn.execute(text("""
+        INSERT INTO chat_history (resume_id, question, answer, created_at)
+        SELECT r.id, 'What are the key strengths?', 'Synthetic answer', now() - (c * interval '1 minute')
+        FROM resumes r, generate_series(1, :chats) AS c
+        WHERE r.user_id LIKE :pattern
+    """), {'chats': chats_per_resume, 'pattern': BENCH_USER_PREFIX + '%'})
+    conn.execute(text("ANALYZE resumes; ANALYZE skills; ANALYZE resume_skills; ANALYZE chat_history"))
+
+def pick_params(conn):
+    row = conn.execute(text("""
+        SELECT user_id, id FROM resumes WHERE user_id LIKE :pattern ORDER BY id LIMIT 1
+    """), {'pattern': BENCH_USER_PREFIX + '%'}).first()
+    if not row:
+        sys.exit("No benchmark rows found; run without --skip-seed first")
+    return {'user_id': row[0], 'resume_id': row[1]}
+
+def drop_indexes(conn):
+    for name in INDEXES:
+        conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+    conn.execute(text("ANALYZE resumes; ANALYZE skills; ANALYZE resume_skills; ANALYZE chat_history"))
+
+def create_indexes(conn):
+    for ddl in INDEXES.values():
+        conn.execute(text(ddl))
+    conn.execute(text("ANALYZE resumes; ANALYZE skills; ANALYZE resume_skills; ANALYZE chat_history"))
+
+def explain(conn, sql: str, params: dict, repeat: int) -> float:
+    """Best execution time in ms over several EXPLAIN ANALYZE runs"""
+    timings = []
+    for _ in range(repeat):
+        plan = conn.execute(text(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}'), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        timings.append(plan[0]['Execution Time'])
+    return min(timings)
+
+def run_queries(conn, params: dict, repeat: int) -> dict:
+    results = {}
+    for name, (sql, extra) in QUERIES.items():
+        query_params = {**params, **extra}
+        # Only bind what the statement uses
+        bound = {k: v for k, v in query_params.items() if f':{k}' in sql}
+        results[name] = explain(conn, sql, bound, repeat)
+    return results
+
+def cleanup(conn):
+    pattern = {'pattern': BENCH_USER_PREFIX + '%'}
+    resume_ids = "SELECT id FROM resumes WHERE user_id LIKE :pattern"
+    conn.execute(text(f"DELETE FROM chat_history WHERE resume_id IN ({resume_ids})"), pattern)
+    conn.execute(text(f"DELETE FROM resume_skills WHERE resume_id IN ({resume_ids})"), pattern)
+    conn.execute(text("DELETE FROM resumes WHERE user_id LIKE :pattern"), pattern)
+    conn.execute(text("DELETE FROM skills WHERE name LIKE 'Bench Skill %'"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='Scratch PostgreSQL database (default: $BENCH_DATABASE_URL)')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--resumes-per-user', type=int, default=2000)
+    parser.add_argument('--skills', type=int, default=5000)
+    parser.add_argument('--chats-per-resume', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5, help='EXPLAIN ANALYZE runs per query')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse previously seeded rows')
+    parser.add_argument('--keep-data', action='store_true', help='Do not delete seeded rows afterwards')
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('--database-url or BENCH_DATABASE_URL is required')
+
+    engine = create_engine(args.database_url, isolation_level='AUTOCOMMIT')
+    with engine.connect() as conn:
+        if not args.skip_seed:
+            seed(conn, args.users, args.resumes_per_user, args.skills, args.chats_per_resume)
+        params = pick_params(conn)
+
+        try:
+            drop_indexes(conn)
+            before = run_queries(conn, params, args.repeat)
+            create_indexes(conn)
+            after = run_queries(conn, params, args.repeat)
+        finally:
+            create_indexes(conn)
+            if not args.keep_data:
+                cleanup(conn)
+
+    width = max(len(name) for name in QUERIES)
+    print(f"\n{'Query':<{width}}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<{width}}  {before[name]:>10.2f}  {after[name]:>10.2f}  {speedup:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Move uploads saved before the content store into it.
+
+Every resume whose file_path is outside the store (a flat file in the upload
+folder) is repointed at a content-addressed copy of its file, with one store
+reference per resume, and the old file is removed. Resumes sharing an old
+file share the stored copy. Re-running skips resumes already in the store.
+
+Usage:
+    python scripts/migrate_uploads_to_store.py --dry-run
+    python scripts/migrate_uploads_to_store.py
+
+Run it from the directory the server runs in, with the same UPLOAD_FOLDER
+and DATABASE_URL, after in-flight upload jobs have finished.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models.resume import Resume  # noqa: E402
+from app.services.content_store import ContentStore  # noqa: E402
+
+CHUNK_SIZE = 1024 * 1024
+
+def in_store(store: ContentStore, path: str) -> bool:
+    stored_name = store.stored_name_of(path)
+    if not stored_name:
+        return False
+    content_hash, file_format = os.path.splitext(os.path.basename(stored_name))
+    return stored_name == store.name_for(content_hash, file_format.lstrip('.'))
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def migrate(store: ContentStore, dry_run: bool) -> dict:
+    resumes_by_path = defaultdict(list)
+    for resume_id, file_path in db.session.query(Resume.id, Resume.file_path).yield_per(1000):
+        if not in_store(store, file_path):
+            resumes_by_path[file_path].append(resume_id)
+
+    counts = {'files': 0, 'resumes': 0, 'missing_files': 0}
+    for old_path, resume_ids in resumes_by_path.items():
+        if not os.path.exists(old_path):
+            print(f'Missing file for resumes {resume_ids}: {old_path}', file=sys.stderr)
+            counts['missing_files'] += 1
+            continue
+
+        content_hash = hash_file(old_path)
+        stored_name = store.name_for(content_hash, os.path.splitext(old_path)[1].lower().lstrip('.'))
+        print(f'{old_path} -> {stored_name} ({len(resume_ids)} resumes)')
+        counts['files'] += 1
+        counts['resumes'] += len(resume_ids)
+        if dry_run:
+            continue
+
+        out, temp_path = store.stage()
+        with out, open(old_path, 'rb') as source:
+            shutil.copyfileobj(source, out, CHUNK_SIZE)
+            out.flush()
+            os.fsync(out.fileno())
+        # References are committed before the file is placed, as for uploads
+        store.acquire(content_hash, stored_name, os.path.getsize(temp_path), count=len(resume_ids))
+        Resume.query.filter(Resume.id.in_(resume_ids)).update(
+            {'file_path': store.path(stored_name)}, synchronize_session=False
+        )
+        db.session.commit()
+        os.makedirs(os.path.dirname(store.path(stored_name)), exist_ok=True)
+        os.replace(temp_path, store.path(stored_name))
+        os.remove(old_path)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--upload-folder', default=os.getenv('UPLOAD_FOLDER', 'uploads'),
+                        help='Upload folder and store root (default: $UPLOAD_FOLDER or uploads)')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the files that would move')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        counts = migrate(ContentStore(args.upload_folder), args.dry_run)
+    print(f"{'Would move' if args.dry_run else 'Moved'} {counts['files']} files for {counts['resumes']} resumes; "
+          f"{counts['missing_files']} files missing")
+
+if __name__ == '__main__':
+    main()
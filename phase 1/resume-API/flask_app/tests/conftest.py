@@ -0,0 +1,15 @@
+import pytest
+from flask import Flask
+from app import db
+
+@pytest.fixture
+def app():
+    """Bare app with the models on in-memory SQLite; create_app also needs Firebase"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', TESTING=True)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,107 @@
+import fakeredis
+import pytest
+from app import db
+from app.models.resume import ChatHistory, Resume
+from app.services import answer_cache as answer_cache_module
+from app.services import chatbot_service
+from app.services.answer_cache import AnswerCache
+from app.services.chatbot_service import ChatbotService, is_follow_up
+
+RESUME_TEXT = 'Jane Doe\nSkills\nPython, SQL, Docker\nExperience\nData engineer at Acme since 2019'
+
+class FakeOpenAI:
+    model = 'gpt-test'
+
+    def __init__(self):
+        self.requests = []
+
+    def create_chat_completion(self, messages, max_tokens=None, temperature=None):
+        self.requests.append(messages)
+        return f'answer {len(self.requests)} END_RESPONSE'
+
+@pytest.fixture
+def openai_service(monkeypatch):
+    service = FakeOpenAI()
+    monkeypatch.setattr(chatbot_service, 'get_openai_service', lambda: service)
+    return service
+
+@pytest.fixture
+def cache(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(answer_cache_module.redis, 'from_url',
+                        lambda *args, **kwargs: fakeredis.FakeRedis(server=server))
+    cache = AnswerCache(ttl=60, max_entries=100, enabled=True)
+    monkeypatch.setattr(chatbot_service, 'answer_cache', cache)
+    return cache
+
+def make_resume(text=RESUME_TEXT):
+    resume = Resume(file_name='cv.pdf', file_path='/tmp/cv.pdf', file_type='pdf', user_id='u1', extracted_text=text)
+    db.session.add(resume)
+    db.session.commit()
+    return resume
+
+def test_repeated_question_on_resume_with_history_is_a_hit(app, openai_service, cache):
+    resume = make_resume()
+    bot = ChatbotService()
+    bot.get_response(resume, 'Summarize this resume')
+    first = bot.get_response(resume, 'What are the key skills of this candidate?')
+    assert len(openai_service.requests) == 2
+
+    # The resume now has history; the stock question is still served from the cache
+    assert bot.get_response(resume, 'what are the key skills of this candidate') == first
+    assert len(openai_service.requests) == 2
+    assert ChatHistory.query.filter_by(resume_id=resume.id).count() == 3
+    stats = cache.stats()
+    assert (stats['local_hits'], stats['misses'], stats['sets']) == (1, 2, 2)
+
+def test_stock_answers_do_not_carry_conversation_memory(app, openai_service, cache):
+    resume = make_resume()
+    bot = ChatbotService()
+    bot.get_response(resume, 'Summarize this resume')
+    bot.get_response(resume, 'What are the key skills of this candidate?')
+
+    assert [message['role'] for message in openai_service.requests[1]] == ['system', 'user']
+
+def test_identical_resume_text_hits_through_redis(app, openai_service, cache):
+    bot = ChatbotService()
+    answer = bot.get_response(make_resume(), 'What are the key skills of this candidate?')
+    cache.local = type(cache.local)(100, 60)
+
+    assert bot.get_response(make_resume(), 'What are the key skills of this candidate?') == answer
+    assert len(openai_service.requests) == 1
+    assert cache.stats()['redis_hits'] == 1
+
+def test_bypass_skips_the_cache(app, openai_service, cache):
+    resume = make_resume()
+    bot = ChatbotService()
+    bot.get_response(resume, 'What are the key skills of this candidate?')
+    bot.get_response(resume, 'What are the key skills of this candidate?', use_cache=False)
+
+    assert len(openai_service.requests) == 2
+    assert ChatHistory.query.filter_by(resume_id=resume.id).count() == 2
+    stats = cache.stats()
+    assert (stats['local_hits'], stats['misses'], stats['sets']) == (0, 1, 1)
+
+def test_follow_ups_use_memory_and_are_not_cached(app, openai_service, cache):
+    resume = make_resume()
+    bot = ChatbotService()
+    bot.get_response(resume, 'What are the key skills of this candidate?')
+    bot.get_response(resume, 'Can you elaborate on that?')
+    bot.get_response(resume, 'Can you elaborate on that?')
+
+    assert len(openai_service.requests) == 3
+    assert [message['role'] for message in openai_service.requests[2]][:3] == ['system', 'user', 'assistant']
+    assert cache.stats()['sets'] == 1
+
+@pytest.mark.parametrize('question, follow_up', [
+    ('Summarize this resume', False),
+    ('What are the key skills of this candidate?', False),
+    ('How can I improve my CV?', False),
+    ('Why?', True),
+    ('Tell me more', True),
+    ('What about his education?', True),
+    ('Can you expand on the second point?', True),
+    ('Is that a good fit for data roles?', True),
+])
+def test_is_follow_up(question, follow_up):
+    assert is_follow_up(question) == follow_up
@@ -0,0 +1,126 @@
+import httpx
+import openai
+import pytest
+from app.services import llm_resilience
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, LLMResilience
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_resilience, 'time', clock)
+    return clock
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, cooldown=30)
+
+def server_error():
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    return openai.InternalServerError('boom', response=httpx.Response(500, request=request), body=None)
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state()['state'] == CircuitBreaker.CLOSED
+
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state()['state'] == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow()
+    assert error.value.status_code == 503
+    assert error.value.details['retry_in'] == 30
+
+def test_success_resets_the_failure_count(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.closed
+
+def test_half_open_after_cooldown_lets_one_probe_through(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    clock.now += 1
+    breaker.allow()
+    assert breaker.state()['state'] == CircuitBreaker.HALF_OPEN
+    # Everyone else fails fast while the probe is in flight
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+def test_successful_probe_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state() == {'state': CircuitBreaker.CLOSED, 'consecutive_failures': 0,
+                               'times_opened': 1, 'retry_in': 0.0}
+    breaker.allow()
+    breaker.allow()
+
+def test_failed_probe_reopens_for_another_cooldown(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state()['state'] == CircuitBreaker.OPEN
+    assert breaker.state()['times_opened'] == 2
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    clock.now += 1
+    breaker.allow()
+
+def test_abandoned_probe_frees_the_half_open_slot(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+    breaker.record_abandoned()
+
+    breaker.allow()
+    assert breaker.state()['state'] == CircuitBreaker.HALF_OPEN
+
+def test_call_fails_fast_while_open(monkeypatch, clock):
+    monkeypatch.setenv('OPENAI_MAX_RETRIES', '0')
+    monkeypatch.setenv('OPENAI_BREAKER_FAILURES', '2')
+    resilience = LLMResilience()
+    calls = []
+
+    def failing(timeout):
+        calls.append(timeout)
+        raise server_error()
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            resilience.call(failing, hedge=False)
+    assert resilience.breaker.state()['state'] == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        resilience.call(failing, hedge=False)
+    assert len(calls) == 2
+
+    clock.now += resilience.breaker.cooldown
+    assert resilience.call(lambda timeout: 'ok', hedge=False) == 'ok'
+    assert resilience.breaker.closed
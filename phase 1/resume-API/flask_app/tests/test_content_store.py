@@ -0,0 +1,65 @@
+import hashlib
+import os
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import db
+from app.models import StoredFile
+from app.services import content_store
+from app.services.content_store import ContentStore
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    # The store upserts with the PostgreSQL dialect; SQLite has the same ON CONFLICT form
+    monkeypatch.setattr(content_store, 'insert', sqlite_insert)
+    return ContentStore(str(tmp_path))
+
+def add(store, data=b'%PDF-1.4 resume'):
+    out, temp_path = store.stage()
+    with out:
+        out.write(data)
+    return store.add_file(temp_path, hashlib.sha256(data).hexdigest(), 'pdf')
+
+def ref_count(stored_name):
+    db.session.expire_all()
+    record = StoredFile.query.filter_by(stored_name=stored_name).first()
+    return record.ref_count if record else None
+
+def test_rolled_back_release_keeps_the_file(store):
+    stored_name = add(store)
+    assert store.release(stored_name)
+    db.session.rollback()
+
+    assert os.path.exists(store.path(stored_name))
+    assert ref_count(stored_name) == 1
+
+def test_purge_after_the_last_release(store):
+    stored_name = add(store)
+    add(store)
+    store.release(stored_name)
+    db.session.commit()
+    store.purge(stored_name)
+    assert os.path.exists(store.path(stored_name))
+    assert ref_count(stored_name) == 1
+
+    store.release(stored_name)
+    db.session.commit()
+    # Released but not yet purged: the row stays, with no references
+    assert os.path.exists(store.path(stored_name))
+    assert ref_count(stored_name) == 0
+
+    store.purge(stored_name)
+    assert not os.path.exists(store.path(stored_name))
+    assert ref_count(stored_name) is None
+
+def test_upload_between_release_and_purge_keeps_the_file(store):
+    stored_name = add(store)
+    store.release(stored_name)
+    db.session.commit()
+
+    assert add(store) == stored_name
+    store.purge(stored_name)
+    assert os.path.exists(store.path(stored_name))
+    assert ref_count(stored_name) == 1
+
+def test_release_of_an_untracked_file(store):
+    assert not store.release('legacy_upload.pdf')
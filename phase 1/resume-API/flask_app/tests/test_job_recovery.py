@@ -0,0 +1,77 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import db
+from app.domain.resume.resume_entity import STATUS_PENDING, STATUS_PROCESSING, STATUS_COMPLETED, STATUS_ERROR
+from app.models import ResumeJob, StoredFile
+from app.services import content_store
+from app.services.content_store import ContentStore
+from app.services.job_service import JobService, LOST_JOB_MESSAGE
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(content_store, 'insert', sqlite_insert)
+    return ContentStore(str(tmp_path))
+
+@pytest.fixture
+def job_service(store):
+    unused = object()
+    return JobService(SimpleNamespace(store=store), unused, enrichment_service=unused, artifact_service=unused,
+                      analysis_service=unused, retrieval_service=unused)
+
+def add_job(store, job_id, status, age_seconds, data=None):
+    data = data or job_id.encode()
+    out, temp_path = store.stage()
+    with out:
+        out.write(data)
+    content_hash = hashlib.sha256(data).hexdigest()
+    stored_name = store.add_file(temp_path, content_hash, 'pdf')
+    updated_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    db.session.add(ResumeJob(id=job_id, user_id='u1', file_name='cv.pdf', stored_name=stored_name,
+                             content_hash=content_hash, status=status, stage='enrich',
+                             created_at=updated_at, updated_at=updated_at))
+    db.session.commit()
+    return stored_name
+
+def test_lost_jobs_are_failed_and_release_their_files(app, store, job_service):
+    lost_processing = add_job(store, 'lost-processing', STATUS_PROCESSING, 3600)
+    lost_pending = add_job(store, 'lost-pending', STATUS_PENDING, 3600)
+    running = add_job(store, 'running', STATUS_PROCESSING, 60)
+    add_job(store, 'done', STATUS_COMPLETED, 3600)
+
+    assert job_service.recover_lost_jobs(stale_after=1800) == 2
+
+    db.session.expire_all()
+    for job_id in ('lost-processing', 'lost-pending'):
+        job = db.session.get(ResumeJob, job_id)
+        assert (job.status, job.error) == (STATUS_ERROR, LOST_JOB_MESSAGE)
+    assert db.session.get(ResumeJob, 'running').status == STATUS_PROCESSING
+    assert db.session.get(ResumeJob, 'done').status == STATUS_COMPLETED
+
+    for stored_name in (lost_processing, lost_pending):
+        assert not os.path.exists(store.path(stored_name))
+    assert os.path.exists(store.path(running))
+    assert StoredFile.query.count() == 2
+
+    # Already failed jobs are not picked up again
+    assert job_service.recover_lost_jobs(stale_after=1800) == 0
+
+def test_shared_file_survives_a_lost_job(app, store, job_service):
+    lost = add_job(store, 'lost', STATUS_PROCESSING, 3600, data=b'same bytes')
+    add_job(store, 'running', STATUS_PROCESSING, 60, data=b'same bytes')
+
+    assert job_service.recover_lost_jobs(stale_after=1800) == 1
+    assert os.path.exists(store.path(lost))
+    assert StoredFile.query.one().ref_count == 1
+
+def test_sweep_purges_files_left_unreferenced(app, store, job_service):
+    stored_name = add_job(store, 'done', STATUS_COMPLETED, 60)
+    store.release(stored_name)
+    db.session.commit()
+
+    job_service._run_sweep(app)
+    assert not os.path.exists(store.path(stored_name))
+    assert StoredFile.query.count() == 0
@@ -0,0 +1,58 @@
+import fakeredis
+import pytest
+from app.services import llm_governor
+from app.services.llm_governor import LLMGovernor
+
+@pytest.fixture
+def governor(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(llm_governor.redis, 'from_url',
+                        lambda *args, **kwargs: fakeredis.FakeRedis(server=server))
+    governor = LLMGovernor(max_concurrency=1, tokens_per_minute=0, queue_timeout=5, lease=60, enabled=True)
+    governor.weights = {'heavy': 1.0, 'light': 3.0}
+    return governor
+
+def admission_order(governor, waiters):
+    """Enqueue every (token, user, cost), then admit and release one at a time"""
+    for token, user_id, cost in waiters:
+        governor._enqueue(token, user_id, cost, governor.weight_for(user_id))
+
+    order, pending = [], list(waiters)
+    while pending:
+        admitted = [waiter for waiter in pending
+                    if governor._poll(waiter[0], waiter[1], waiter[2], governor.weight_for(waiter[1]))]
+        # A single slot: exactly one waiter gets it per round
+        assert len(admitted) == 1
+        token = admitted[0][0]
+        order.append(token)
+        pending.remove(admitted[0])
+        governor._release(token)
+    return order
+
+def test_weighted_fair_order_across_users(governor):
+    # Finish tags: heavy 35, 70, 105; light 10, 20, 30, 40, 50, 60
+    waiters = [(f'heavy-{i}', 'heavy', 35) for i in range(3)] + \
+              [(f'light-{i}', 'light', 30) for i in range(6)]
+
+    assert admission_order(governor, waiters) == [
+        'light-0', 'light-1', 'light-2', 'heavy-0', 'light-3', 'light-4', 'light-5', 'heavy-1', 'heavy-2'
+    ]
+
+def test_backlog_does_not_starve_a_later_user(governor):
+    admission_order(governor, [(f'heavy-{i}', 'heavy', 100) for i in range(3)])
+
+    # Queued behind more of the heavy user's requests, the light user still goes first
+    waiters = [(f'heavy-{i}', 'heavy', 100) for i in range(3, 6)] + [('light-0', 'light', 100)]
+    assert admission_order(governor, waiters) == ['light-0', 'heavy-3', 'heavy-4', 'heavy-5']
+
+def test_slot_waits_for_the_holder(governor):
+    token = governor.acquire(10)
+    assert token
+
+    with pytest.raises(llm_governor.LLMCapacityError):
+        governor.acquire(10, max_wait=0.2)
+
+    governor._release(token)
+    with governor.slot(10):
+        assert governor.stats()['active'] == 1
+    assert governor.stats()['active'] == 0
@@ -0,0 +1,60 @@
+import pytest
+from app.services import chatbot_service
+from app.services.chatbot_service import OpenAIService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(chatbot_service, 'time', clock)
+    return clock
+
+@pytest.fixture
+def service(monkeypatch, clock):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setenv('OPENAI_HEALTH_TTL', '300')
+    monkeypatch.setenv('OPENAI_HEALTH_MIN_REFRESH', '30')
+    service = OpenAIService()
+    service.lookups = []
+    monkeypatch.setattr(service.client.models, 'retrieve', lambda model: service.lookups.append(model))
+    return service
+
+def test_result_is_cached_for_the_ttl(service, clock):
+    assert service.check_health()['healthy'] is True
+    clock.now += 299
+    service.check_health()
+    assert len(service.lookups) == 1
+
+    clock.now += 1
+    service.check_health()
+    assert len(service.lookups) == 2
+
+def test_forced_refresh_is_rate_limited(service, clock):
+    service.check_health()
+    clock.now += 10
+    service.check_health(force=True)
+    assert len(service.lookups) == 1
+
+    clock.now += 20
+    service.check_health(force=True)
+    assert len(service.lookups) == 2
+
+def test_check_in_progress_does_not_block_other_callers(service, monkeypatch):
+    seen = []
+
+    def slow_lookup(model):
+        # Another caller while the upstream call is running gets the cached state at once
+        seen.append(service.check_health(force=True))
+        raise RuntimeError('invalid key')
+
+    monkeypatch.setattr(service.client.models, 'retrieve', slow_lookup)
+    health = service.check_health()
+
+    assert seen == [{'healthy': None, 'error': None, 'model': service.model}]
+    assert (health['healthy'], health['error']) == (False, 'invalid key')
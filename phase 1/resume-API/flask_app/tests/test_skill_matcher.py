@@ -0,0 +1,75 @@
+import json
+import random
+import re
+import pytest
+from app.config.config import Config
+from app.services.skill_matcher import SkillMatcher
+
+with open(Config.SKILL_TAXONOMY_PATH) as taxonomy_file:
+    TAXONOMY = json.load(taxonomy_file)['categories']
+
+# Skills whose edges are not word characters, where \b behaves unusually
+EDGE_TAXONOMY = {
+    'technical_skills': ['C', 'C++', 'C#', '.NET', 'Node.js', 'R', 'Go', 'CI/CD', 'A+'],
+    'tools': ['Git', 'GitHub', 'Go', '@mentions'],
+}
+
+def regex_match(taxonomy, text):
+    """The per-skill regex matching SkillMatcher replaced"""
+    text_lower = text.lower()
+    skills = {category: set() for category in taxonomy}
+    for category, skill_list in taxonomy.items():
+        for skill in skill_list:
+            if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
+                skills[category].add(skill)
+    return {k: v for k, v in skills.items() if v}
+
+def as_sets(result):
+    return {category: set(skills) for category, skills in result.items()}
+
+TEXTS = [
+    '',
+    'Senior Python developer with AWS, Docker and Kubernetes experience.',
+    'PYTHON, javascript; Machine Learning and deep learning (NLP).',
+    'Pythonic code, JavaScripting and Javafx are not skills.',
+    'Built CI/CD pipelines with GitHub Actions and Git hooks.',
+    'Languages: C, C++, C#, R, Go. Frameworks: .NET, Node.js',
+    'Wrote C++17 and c#-based tools; used node.js_runtime and .NETCore',
+    'Grade A+ student; A+B testing; @mentions bot',
+    'Go-to person for golang and google cloud',
+    'Leadership, communication and teamwork across time zones',
+]
+
+@pytest.mark.parametrize('text', TEXTS)
+@pytest.mark.parametrize('taxonomy', [TAXONOMY, EDGE_TAXONOMY], ids=['taxonomy_file', 'edge_cases'])
+def test_matches_old_regexes(taxonomy, text):
+    assert as_sets(SkillMatcher(taxonomy).match(text)) == regex_match(taxonomy, text)
+
+def test_matches_old_regexes_on_random_text():
+    taxonomy = {category: skills + EDGE_TAXONOMY.get(category, []) for category, skills in TAXONOMY.items()}
+    words = [skill for skills in taxonomy.values() for skill in skills] + ['and', 'x', '1', '_', 'ing']
+    separators = [' ', '', ', ', '.', '/', '-', '_', '\n', '(', '+']
+    matcher = SkillMatcher(taxonomy)
+    rng = random.Random(1234)
+    for _ in range(300):
+        text = ''.join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(1, 25)))
+        assert as_sets(matcher.match(text)) == regex_match(taxonomy, text), text
+
+def test_skill_in_several_categories_is_reported_under_each():
+    assert as_sets(SkillMatcher(EDGE_TAXONOMY).match('Go and Git')) == {
+        'technical_skills': {'Go'}, 'tools': {'Go', 'Git'}
+    }
+
+def test_round_trip_through_json():
+    matcher = SkillMatcher(EDGE_TAXONOMY, version='v1')
+    restored = SkillMatcher.from_dict(json.loads(json.dumps(matcher.to_dict())))
+
+    assert restored.version == 'v1'
+    for text in TEXTS:
+        assert restored.match(text) == matcher.match(text)
+
+def test_inconsistent_tables_are_rejected():
+    data = SkillMatcher(EDGE_TAXONOMY).to_dict()
+    data['fail'] = data['fail'][:-1]
+    with pytest.raises(ValueError):
+        SkillMatcher.from_dict(data)
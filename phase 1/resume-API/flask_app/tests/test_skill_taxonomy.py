@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+from app.services.skill_taxonomy import SkillTaxonomy
+
+TAXONOMY = {'version': '2025.01', 'categories': {'technical_skills': ['Python', 'C++'], 'tools': ['Git']}}
+
+@pytest.fixture
+def taxonomy_path(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps(TAXONOMY))
+    return str(path)
+
+def cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+
+def test_compiled_matcher_is_cached_as_json(taxonomy_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    SkillTaxonomy(taxonomy_path, cache_dir=cache_dir)
+
+    [name] = cache_files(cache_dir)
+    assert name.endswith('.json')
+    with open(os.path.join(cache_dir, name)) as f:
+        assert json.load(f)['version'] == '2025.01'
+
+    matcher = SkillTaxonomy(taxonomy_path, cache_dir=cache_dir).get_matcher()
+    assert matcher.match('Python and Git') == {'technical_skills': ['Python'], 'tools': ['Git']}
+
+def test_tampered_cache_is_ignored(taxonomy_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    SkillTaxonomy(taxonomy_path, cache_dir=cache_dir)
+    [name] = cache_files(cache_dir)
+    cache_path = os.path.join(cache_dir, name)
+    with open(cache_path) as f:
+        data = json.load(f)
+    data['goto'] = [{'p': 999}]
+    with open(cache_path, 'w') as f:
+        json.dump(data, f)
+
+    matcher = SkillTaxonomy(taxonomy_path, cache_dir=cache_dir).get_matcher()
+    assert matcher.match('Git') == {'tools': ['Git']}
+
+def test_cache_for_other_taxonomy_content_is_ignored(taxonomy_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    SkillTaxonomy(taxonomy_path, cache_dir=cache_dir)
+    [name] = cache_files(cache_dir)
+    cache_path = os.path.join(cache_dir, name)
+    with open(cache_path) as f:
+        data = json.load(f)
+    data['taxonomy_digest'] = '0' * 64
+    data['patterns'] = ['rust', 'c++', 'git']
+    with open(cache_path, 'w') as f:
+        json.dump(data, f)
+
+    matcher = SkillTaxonomy(taxonomy_path, cache_dir=cache_dir).get_matcher()
+    assert matcher.match('Python') == {'technical_skills': ['Python']}
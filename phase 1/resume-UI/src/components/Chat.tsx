@@ -24,20 +24,22 @@ export const Chat = ({ resumeId }: ChatProps) => {
     setMessages((prev) => [...prev, { role: "user", content: userMessage }]);
     setIsLoading(true);
 
+    // Filled in token by token as the answer streams in
+    setMessages((prev) => [...prev, { role: "assistant", content: "" }]);
+    const updateAnswer = (update: (content: string) => string) =>
+      setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: update(last.content) }];
+      });
+
     try {
-      const response = await resumeService.askQuestion(resumeId, userMessage);
-      setMessages((prev) => [
-        ...prev,
-        { role: "assistant", content: response.answer },
-      ]);
+      await resumeService.askQuestionStream(resumeId, userMessage, (text) =>
+        updateAnswer((content) => content + text)
+      );
     } catch (error) {
-      setMessages((prev) => [
-        ...prev,
-        {
-          role: "assistant",
-          content: "Sorry, I couldn't process your question. Please try again.",
-        },
-      ]);
+      updateAnswer(
+        () => "Sorry, I couldn't process your question. Please try again."
+      );
     } finally {
       setIsLoading(false);
     }
@@ -46,7 +48,7 @@ export const Chat = ({ resumeId }: ChatProps) => {
   return (
     <div className="flex flex-col h-[500px]">
       <div className="flex-1 overflow-y-auto space-y-4 mb-4">
-        {messages.map((message, index) => (
+        {messages.map((message, index) => message.content && (
           <div
             key={index}
             className={`flex ${
@@ -64,7 +66,7 @@ export const Chat = ({ resumeId }: ChatProps) => {
             </div>
           </div>
         ))}
-        {isLoading && (
+        {isLoading && !messages[messages.length - 1]?.content && (
           <div className="flex justify-start">
             <div className="bg-dark-200/50 text-white/90 rounded-lg px-4 py-2">
               <div className="flex space-x-2">
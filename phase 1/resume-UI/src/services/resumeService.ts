@@ -1,4 +1,5 @@
 import { api } from "./api";
+import { auth } from "../config/firebase";
 import { isJobOrResumeRelated, DEFAULT_RESPONSES } from "../utils/chatUtils";
 
 export interface ResumeAnalysis {
@@ -19,6 +20,32 @@ export interface Resume {
   skills: string[];
 }
 
+export type UploadJobStatus = "pending" | "processing" | "completed" | "error";
+
+export interface UploadJob {
+  job_id: string;
+  status: UploadJobStatus;
+  stage: string | null;
+  file_name: string;
+  resume_id: number | null;
+  result: {
+    skills: {
+      [category: string]: string[];
+    };
+  } | null;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface Page<T> {
+  status?: string;
+  total?: number | null;
+  resumes: T[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
 export interface FilterCriteria {
   skills: string[];
   education_levels: string[];
@@ -50,27 +77,57 @@ export const resumeService = {
     formData.append("file", file);
 
     const response = await api.post<{
-      status: string;
       message: string;
-      resume_id: number;
-      skills: {
-        [category: string]: string[];
-      };
+      job_id: string;
+      status: UploadJobStatus;
     }>("/api/resumes/upload", formData, {
       headers: {
         "Content-Type": "multipart/form-data",
       },
     });
 
+    // Processing runs in the background; poll until the job settles
+    const job = await resumeService.waitForUploadJob(response.data.job_id);
+    return {
+      message: job.status,
+      resume_id: job.resume_id as number,
+      skills: job.result?.skills ?? {},
+    };
+  },
+
+  async getUploadJob(jobId: string) {
+    const response = await api.get<UploadJob>(`/api/resumes/jobs/${jobId}`);
     return response.data;
   },
 
+  async waitForUploadJob(jobId: string, intervalMs = 1500, timeoutMs = 180000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const job = await resumeService.getUploadJob(jobId);
+      if (job.status === "completed") {
+        return job;
+      }
+      if (job.status === "error") {
+        throw new Error(job.error || "Failed to process resume");
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+    throw new Error("Timed out waiting for resume processing");
+  },
+
   async getResumes() {
-    const response = await api.get<{
-      status: string;
-      resumes: Resume[];
-    }>("/api/resumes/list");
-    return response.data.resumes;
+    // Follow keyset cursors until every page has been fetched
+    const resumes: Resume[] = [];
+    let cursor: string | null = null;
+    do {
+      const response: { data: Page<Resume> } = await api.get<Page<Resume>>(
+        "/api/resumes/list",
+        { params: cursor ? { cursor } : {} }
+      );
+      resumes.push(...response.data.resumes);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return resumes;
   },
 
   async getResumeDetails(id: number) {
@@ -109,6 +166,59 @@ export const resumeService = {
     return response.data;
   },
 
+  async askQuestionStream(
+    resumeId: number,
+    question: string,
+    onToken: (text: string) => void
+  ) {
+    if (!isJobOrResumeRelated(question)) {
+      onToken(DEFAULT_RESPONSES.OUT_OF_SCOPE);
+      return { answer: DEFAULT_RESPONSES.OUT_OF_SCOPE };
+    }
+
+    // axios buffers the whole body, so the event stream is read with fetch
+    const token = await auth.currentUser?.getIdToken(false);
+    const response = await fetch(
+      `${import.meta.env.VITE_API_URL}/api/chat/ask/stream`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify({ resume_id: resumeId, question: question }),
+      }
+    );
+    if (!response.ok || !response.body) {
+      throw new Error(`Chat request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let answer = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split("\n\n");
+      buffer = frames.pop() ?? "";
+      for (const frame of frames) {
+        const event = frame.match(/^event: (.*)$/m)?.[1];
+        const data = frame.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+        const payload = JSON.parse(data);
+        if (event === "token") {
+          answer += payload.text;
+          onToken(payload.text);
+        } else if (event === "error") {
+          throw new Error(payload.error);
+        }
+      }
+    }
+    return { answer };
+  },
+
   async getAIResponse(question: string) {
     if (!isJobOrResumeRelated(question)) {
       return DEFAULT_RESPONSES.OUT_OF_SCOPE;
@@ -128,10 +238,20 @@ export const resumeService = {
   },
 
   async filterResumes(criteria: FilterCriteria) {
-    const response = await api.post<{
-      total: number;
-      resumes: FilteredResume[];
-    }>("/api/resumes/filter", criteria);
-    return response.data;
+    // The total is only reported on the first page
+    const resumes: FilteredResume[] = [];
+    let total = 0;
+    let cursor: string | null = null;
+    do {
+      const response: { data: Page<FilteredResume> } = await api.post<
+        Page<FilteredResume>
+      >("/api/resumes/filter", cursor ? { ...criteria, cursor } : criteria);
+      if (!cursor) {
+        total = response.data.total ?? 0;
+      }
+      resumes.push(...response.data.resumes);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return { total, resumes };
   },
 };